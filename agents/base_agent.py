@@ -2,11 +2,11 @@
 Base Agent Class
 All specialized agents inherit from this base class.
 """
+import asyncio
 from abc import ABC, abstractmethod
-from langchain_openai import ChatOpenAI
-from rag_engine_improved import get_retriever
+from vector_store_registry import get_vector_store_registry
 from blackboard.schema import BlackboardState, AgentOutput
-from config import get_agent_model, get_agent_temperature, get_openai_base_url
+from llm_clients import get_agent_llm
 
 class BaseAgent(ABC):
     """
@@ -20,7 +20,7 @@ class BaseAgent(ABC):
     
     def __init__(self, name: str, domain: str):
         """
-        Initialize agent with domain-specific RAG.
+        Initialize agent with domain-specific RAG (opened lazily).
         
         Args:
             name: Agent name (e.g., "programs_requirements")
@@ -29,30 +29,27 @@ class BaseAgent(ABC):
         self.name = name
         self.domain = domain
         
-        # Domain-specific RAG retriever
-        # This automatically loads the correct vector database
-        self.retriever = get_retriever(domain=domain, k=5)
+        # Domain-specific RAG retriever, shared with the other agents of the
+        # domain and opened on first use (see vector_store_registry.py)
+        self.retrieval_k = 5
         
-        # LLM for agent reasoning - uses faster, cost-effective model
-        model = get_agent_model()
-        temperature = get_agent_temperature()
-        base_url = get_openai_base_url()
-
-        # Configure HTTP client with SSL verification disabled and longer timeout
-        import httpx
-        http_client = httpx.Client(verify=False, timeout=180.0)  # 3 minutes
-
-        # Build ChatOpenAI with optional proxy support
-        llm_kwargs = {
-            "model": model,
-            "temperature": temperature,
-            "http_client": http_client,
-            "request_timeout": 180.0
-        }
-        if base_url:
-            llm_kwargs["base_url"] = base_url
-
-        self.llm = ChatOpenAI(**llm_kwargs)
+        # LLM for agent reasoning - uses faster, cost-effective model.
+        # Shares the process-wide HTTP connection pool (see llm_clients.py).
+        self.llm = get_agent_llm()
+    
+    @property
+    def retriever(self):
+        """This agent's domain retriever (from the shared registry)."""
+        return get_vector_store_registry().get(self.domain, self.retrieval_k)
+    
+    def reload_retriever(self):
+        """
+        Reopen the domain retriever (after a hot reload of the index).
+        
+        The new retriever replaces the old one in a single assignment;
+        requests already holding the old retriever finish against it.
+        """
+        get_vector_store_registry().reload(self.domain)
     
     def retrieve_context(self, query: str) -> str:
         """
@@ -62,6 +59,26 @@ class BaseAgent(ABC):
         """
         results = self.retriever.invoke(query)
         return "\n".join([doc.page_content for doc in results])
+
+    async def aretrieve_context(self, query: str) -> str:
+        """Async version of retrieve_context()."""
+        results = await self.retriever.ainvoke(query)
+        return "\n".join([doc.page_content for doc in results])
+
+    def lookup_course_context(self, course_codes: list) -> dict:
+        """
+        Context for known course codes, fetched in one lookup from the
+        domain's chunk index (no embedding or vector query).
+        
+        Returns {code: context}; codes without indexed chunks (or a retriever
+        without a lexical index) are left out, so callers fall back to
+        retrieve_context for them.
+        """
+        index = getattr(self.retriever, "lexical_index", None)
+        if index is None or not course_codes:
+            return {}
+        found = index.course_chunks(course_codes, limit=self.retrieval_k)
+        return {code: "\n".join(doc.page_content for doc in docs) for code, docs in found.items()}
     
     @abstractmethod
     def execute(self, state: BlackboardState) -> AgentOutput:
@@ -82,3 +99,11 @@ class BaseAgent(ABC):
         """
         pass
 
+    async def aexecute(self, state: BlackboardState) -> AgentOutput:
+        """
+        Async execution method (used by the async graph path).
+
+        Agents override this with a native ``ainvoke`` implementation; the
+        default runs execute() in a worker thread.
+        """
+        return await asyncio.to_thread(self.execute, state)
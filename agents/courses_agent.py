@@ -12,6 +12,10 @@ from agents.base_agent import BaseAgent
 from blackboard.schema import BlackboardState, AgentOutput, Risk
 from langchain_core.messages import SystemMessage
 from course_tools import look_up_course_info, find_course_codes_in_text
+from course_search import find_course_titles_in_text
+from prereq_graph import get_prereq_graph, completed_from_profile
+from timetable import check_time_conflicts
+import asyncio
 import json
 import re
 
@@ -28,68 +32,134 @@ class CourseSchedulingAgent(BaseAgent):
         plan_options = state.get("plan_options", [])
         agent_outputs = state.get("agent_outputs", {})
         messages = state.get("messages", [])
+        completed = completed_from_profile(state.get("student_profile"))
         
         # Extract courses from plan or query
         courses = self._extract_courses(plan_options, user_query, agent_outputs, messages)
         
         if not courses:
-            return self._answer_general_question(user_query, messages)
+            return self._answer_general_question(user_query, messages, completed)
         
         # Check each course
-        course_info = []
-        risks = []
-        
-        for course_code in courses:
-            # Get structured data
-            course_data = look_up_course_info(course_code)
-            
-            # Get RAG context - improved query to capture all course details
-            rag_query = f"course {course_code} prerequisites assessment structure content description"
-            context = self.retrieve_context(rag_query)
-            
-            course_info.append({
-                "code": course_code,
-                "data": course_data,
-                "context": context
-            })
+        risks, schedule_check = self._check_schedule(courses)
+        contexts = self._course_contexts(courses)
+        course_info = [self._course_entry(code, contexts[code], completed) for code in courses]
         
         # Build prompt and call LLM
-        prompt = self._build_prompt(user_query, course_info, risks)
+        prompt = self._build_prompt(user_query, course_info, risks, schedule_check)
         response = self.llm.invoke([SystemMessage(content=prompt)])
         
+        return self._course_output(response.content, risks)
+
+    async def aexecute(self, state: BlackboardState) -> AgentOutput:
+        """Async version of execute(); per-course retrievals run concurrently."""
+        user_query = state.get("user_query", "")
+        plan_options = state.get("plan_options", [])
+        agent_outputs = state.get("agent_outputs", {})
+        messages = state.get("messages", [])
+        completed = completed_from_profile(state.get("student_profile"))
+
+        courses = self._extract_courses(plan_options, user_query, agent_outputs, messages)
+
+        if not courses:
+            return await self._aanswer_general_question(user_query, messages, completed)
+
+        risks, schedule_check = self._check_schedule(courses)
+        contexts = await self._acourse_contexts(courses)
+        course_info = [self._course_entry(code, contexts[code], completed) for code in courses]
+
+        prompt = self._build_prompt(user_query, course_info, risks, schedule_check)
+        response = await self.llm.ainvoke([SystemMessage(content=prompt)])
+
+        return self._course_output(response.content, risks)
+
+    def _course_rag_query(self, course_code: str) -> str:
+        """RAG query used to fetch the details of one course."""
+        return f"course {course_code} prerequisites assessment structure content description"
+
+    def _course_contexts(self, courses: list) -> dict:
+        """
+        Context per course: one batched lookup of the courses' indexed chunks,
+        with vector retrieval only for codes the index has no chunks for.
+        """
+        contexts = self.lookup_course_context(courses)
+        for code in courses:
+            if code not in contexts:
+                contexts[code] = self.retrieve_context(self._course_rag_query(code))
+        return contexts
+
+    async def _acourse_contexts(self, courses: list) -> dict:
+        """Async version of _course_contexts(); fallback retrievals run concurrently."""
+        contexts = self.lookup_course_context(courses)
+        missing = [code for code in courses if code not in contexts]
+        retrieved = await asyncio.gather(
+            *(self.aretrieve_context(self._course_rag_query(code)) for code in missing)
+        )
+        contexts.update(zip(missing, retrieved))
+        return contexts
+
+    def _check_schedule(self, courses: list) -> tuple:
+        """Exact section-time conflict check for the courses (risks, summary for the prompt)."""
+        if len(courses) < 2:
+            return [], None
+        report = check_time_conflicts(courses)
+        if report is None:
+            return [], None
+        return report.risks, report.to_dict()
+
+    def _course_entry(self, course_code: str, context: str, completed: dict = None) -> dict:
+        """Combine structured course data, compiled requisites and retrieved context."""
+        entry = {
+            "code": course_code,
+            "data": look_up_course_info(course_code),
+            "context": context
+        }
+        
+        # Requisites and eligibility come from the compiled prerequisite graph,
+        # so the LLM reports them instead of reasoning about prereq text
+        graph = get_prereq_graph()
+        if course_code in graph.clauses:
+            entry["requisites"] = graph.describe(course_code)
+            if completed:
+                entry["eligibility"] = graph.check(course_code, completed).summary()
+        return entry
+
+    def _course_output(self, answer: str, risks: list, confidence: float = 0.9) -> AgentOutput:
+        """Wrap a course answer as AgentOutput."""
         return AgentOutput(
             agent_name=self.name,
-            answer=response.content,
-            confidence=0.9,
+            answer=answer,
+            confidence=confidence,
             relevant_policies=[],
             risks=risks,
             constraints=[]
         )
     
     def _extract_courses(self, plan_options: list, query: str, agent_outputs: dict, messages: list = None) -> list:
-        """Extract course codes from various sources."""
-        courses = set()
+        """Extract course codes from various sources, in the order they are first mentioned."""
+        # A dict keeps the order stable, so the prompt (and its cache key) is too
+        courses = {}
         
         # From query - improved extraction
-        courses.update(find_course_codes_in_text(query))
+        courses.update(dict.fromkeys(find_course_codes_in_text(query)))
         
         # Also check for course mentions in context (e.g., "this course", "67-364")
         # Look for patterns like "COURSE 67-364" or "course 67-364"
         course_mentions = re.findall(r'(?:course|COURSE)\s+(\d{2}-\d{3})', query, re.IGNORECASE)
-        courses.update(course_mentions)
+        courses.update(dict.fromkeys(course_mentions))
         
         # From plan options
         for plan in plan_options:
             if isinstance(plan, dict):
-                courses.update(plan.get("courses", []))
+                courses.update(dict.fromkeys(plan.get("courses", [])))
             elif hasattr(plan, "courses"):
-                courses.update(plan.courses)
+                courses.update(dict.fromkeys(plan.courses))
         
         # From Programs agent output
         programs_output = agent_outputs.get("programs_requirements")
         if programs_output and programs_output.plan_options:
             for plan_option in programs_output.plan_options:
-                courses.update(plan_option.courses)
+                courses.update(dict.fromkeys(plan_option.courses))
         
         # Also check previous messages/context for course codes
         # This helps when user says "this course" referring to a previously mentioned course
@@ -98,22 +168,60 @@ class CourseSchedulingAgent(BaseAgent):
             for msg in messages:
                 if hasattr(msg, 'content'):
                     content = msg.content if isinstance(msg.content, str) else str(msg.content)
-                    courses.update(find_course_codes_in_text(content))
+                    courses.update(dict.fromkeys(find_course_codes_in_text(content)))
                     # Also check for course mentions in messages
                     course_mentions = re.findall(r'(?:course|COURSE)\s+(\d{2}-\d{3})', content, re.IGNORECASE)
-                    courses.update(course_mentions)
+                    courses.update(dict.fromkeys(course_mentions))
         
         return list(courses)
     
-    def _answer_general_question(self, query: str, messages: list = None) -> AgentOutput:
+    def _answer_general_question(self, query: str, messages: list = None, completed: dict = None) -> AgentOutput:
         """Answer general course questions."""
         # Try to extract course codes even if not explicitly mentioned
+        course_codes = [c for c in self._general_course_codes(query, messages) if look_up_course_info(c)]
+        
+        if course_codes:
+            # If we found course codes, get their info in one batched lookup
+            contexts = self._course_contexts(course_codes)
+            course_info = [self._course_entry(code, contexts[code], completed) for code in course_codes]
+            prompt = self._build_prompt(query, course_info, [])
+            response = self.llm.invoke([SystemMessage(content=prompt)])
+            return self._course_output(response.content, [], confidence=0.85)
+        
+        # Fallback to general RAG search
+        context = self.retrieve_context(query)
+        prompt = self._build_general_prompt(query, context)
+        response = self.llm.invoke([SystemMessage(content=prompt)])
+        return self._course_output(response.content, [], confidence=0.7)
+
+    async def _aanswer_general_question(self, query: str, messages: list = None, completed: dict = None) -> AgentOutput:
+        """Async version of _answer_general_question()."""
+        course_codes = [c for c in self._general_course_codes(query, messages) if look_up_course_info(c)]
+
+        if course_codes:
+            contexts = await self._acourse_contexts(course_codes)
+            course_info = [self._course_entry(code, contexts[code], completed) for code in course_codes]
+            prompt = self._build_prompt(query, course_info, [])
+            response = await self.llm.ainvoke([SystemMessage(content=prompt)])
+            return self._course_output(response.content, [], confidence=0.85)
+
+        context = await self.aretrieve_context(query)
+        prompt = self._build_general_prompt(query, context)
+        response = await self.llm.ainvoke([SystemMessage(content=prompt)])
+        return self._course_output(response.content, [], confidence=0.7)
+
+    def _general_course_codes(self, query: str, messages: list = None) -> list:
+        """Find course codes for a general question (query first, then history)."""
         course_codes = find_course_codes_in_text(query)
         
         # Also check for course mentions
         course_mentions = re.findall(r'(?:course|COURSE)\s+(\d{2}-\d{3})', query, re.IGNORECASE)
         course_codes.extend(course_mentions)
         
+        # Courses named by title ("Principles of Imperative Computation")
+        if not course_codes:
+            course_codes.extend(find_course_titles_in_text(query))
+        
         # Check previous messages if no course found in current query
         if not course_codes and messages:
             for msg in messages:
@@ -123,34 +231,11 @@ class CourseSchedulingAgent(BaseAgent):
                     course_mentions = re.findall(r'(?:course|COURSE)\s+(\d{2}-\d{3})', content, re.IGNORECASE)
                     course_codes.extend(course_mentions)
         
-        if course_codes:
-            # If we found course codes, try to get their info
-            course_info = []
-            for course_code in course_codes:
-                course_data = look_up_course_info(course_code)
-                if course_data:
-                    context = self.retrieve_context(f"course {course_code} {query}")
-                    course_info.append({
-                        "code": course_code,
-                        "data": course_data,
-                        "context": context
-                    })
-            
-            if course_info:
-                prompt = self._build_prompt(query, course_info, [])
-                response = self.llm.invoke([SystemMessage(content=prompt)])
-                return AgentOutput(
-                    agent_name=self.name,
-                    answer=response.content,
-                    confidence=0.85,
-                    relevant_policies=[],
-                    risks=[],
-                    constraints=[]
-                )
-        
-        # Fallback to general RAG search
-        context = self.retrieve_context(query)
-        prompt = f"""You are the Course & Scheduling Agent for CMU-Q.
+        return list(dict.fromkeys(course_codes))
+
+    def _build_general_prompt(self, query: str, context: str) -> str:
+        """Build prompt for a course question with no identifiable course."""
+        return f"""You are the Course & Scheduling Agent for CMU-Q.
 
 Query: {query}
 Context: {context}
@@ -166,19 +251,17 @@ IMPORTANT - How to Use Retrieved Context:
 Answer questions about course offerings, schedules, availability, prerequisites, assessment structure, and course content.
 If the query mentions a specific course but no course code was found, try to infer which course is being discussed from the context and metadata.
 """
-        response = self.llm.invoke([SystemMessage(content=prompt)])
-        return AgentOutput(
-            agent_name=self.name,
-            answer=response.content,
-            confidence=0.7,
-            relevant_policies=[],
-            risks=[],
-            constraints=[]
-        )
     
-    def _build_prompt(self, query: str, course_info: list, risks: list) -> str:
+    def _build_prompt(self, query: str, course_info: list, risks: list, schedule_check: dict = None) -> str:
         """Build prompt for course checking."""
         courses_text = json.dumps(course_info, indent=2, default=str)
+        schedule_text = ""
+        if schedule_check:
+            schedule_text = f"""
+Schedule Check (computed from section meeting times - report it as-is):
+{json.dumps(schedule_check, indent=2)}
+Detected Conflicts: {'; '.join(r.description for r in risks) or 'None'}
+"""
         return f"""You are the Course & Scheduling Agent for CMU-Q.
 
 Your Responsibilities:
@@ -191,7 +274,7 @@ Query: {query}
 
 Course Information:
 {courses_text}
-
+{schedule_text}
 IMPORTANT: 
 - If course data is provided, use it directly to answer questions about prerequisites, assessment structure, course content, etc.
 - The "data" field contains structured course information including:
@@ -208,6 +291,12 @@ IMPORTANT:
   * Summary of what's in that course document
 - Use this metadata to understand the source of information
 - Be specific and accurate - cite exact information from the course data
+- The "requisites" field is compiled from prereqs.text, co_reqs and anti_reqs:
+  * prerequisite_options: each list is one complete way to satisfy the prerequisites
+  * unavoidable_prerequisites: courses required (directly or indirectly) on every path
+- The "eligibility" field (when present) is an exact check against the student's completed courses -
+  report it as-is; do not re-derive eligibility yourself
+- Time conflicts come only from the Schedule Check (when present); do not infer conflicts yourself
 - If asked about prerequisites, provide the exact text from prereqs.text
 - If asked about assessment structure, provide details from custom_fields.assessment_structure
 - If referencing information from context, you can mention it comes from the course's documentation
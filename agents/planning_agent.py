@@ -7,12 +7,20 @@ Responsibilities:
 - Balance workload across semesters
 - Consider course availability patterns
 
+Plans are generated by the constraint-search planner (course_planner.py) when
+the program has a requirement file; the LLM then only explains them.
+
 Knowledge Base: chroma_db_programs/ + chroma_db_courses/
 """
 from agents.base_agent import BaseAgent
 from blackboard.schema import BlackboardState, AgentOutput, PlanOption, Risk
+from config import is_native_planner_enabled
+from course_planner import plan_for_student
 from langchain_core.messages import SystemMessage
+from prereq_graph import get_prereq_graph, normalize_completed
+from schedule_repository import get_schedule_repository
 from typing import List, Dict, Set
+import asyncio
 import json
 import re
 
@@ -34,6 +42,13 @@ class AcademicPlanningAgent(BaseAgent):
             user_query, student_profile, agent_outputs
         )
 
+        # Native planner: the LLM only explains the generated plans
+        native_plans = self._native_plans(planning_params)
+        if native_plans:
+            prompt = self._build_explanation_prompt(planning_params, native_plans)
+            response = self.llm.invoke([SystemMessage(content=prompt)])
+            return self._native_output(response.content, native_plans, planning_params)
+
         # Get relevant data from other agents
         program_requirements = self._get_program_requirements(planning_params, agent_outputs)
         course_schedules = self._get_course_schedules(planning_params)
@@ -49,13 +64,47 @@ class AcademicPlanningAgent(BaseAgent):
         # Generate plan
         response = self.llm.invoke([SystemMessage(content=prompt)])
 
-        # Parse generated plans
-        plan_options = self._parse_plan_options(response.content)
+        return self._plan_output(response.content, planning_params)
+
+    async def aexecute(self, state: BlackboardState) -> AgentOutput:
+        """Async version of execute()."""
+        user_query = state.get("user_query", "")
+        student_profile = state.get("student_profile", {})
+        agent_outputs = state.get("agent_outputs", {})
+
+        planning_params = self._extract_planning_parameters(
+            user_query, student_profile, agent_outputs
+        )
+
+        # The constraint search is CPU-bound; keep it off the event loop
+        native_plans = await asyncio.to_thread(self._native_plans, planning_params)
+        if native_plans:
+            prompt = self._build_explanation_prompt(planning_params, native_plans)
+            response = await self.llm.ainvoke([SystemMessage(content=prompt)])
+            return self._native_output(response.content, native_plans, planning_params)
+
+        program_requirements = await self._aget_program_requirements(planning_params, agent_outputs)
+        course_schedules = self._get_course_schedules(planning_params)
+
+        prompt = self._build_planning_prompt(
+            planning_params,
+            program_requirements,
+            course_schedules,
+            student_profile
+        )
+
+        response = await self.llm.ainvoke([SystemMessage(content=prompt)])
+
+        return self._plan_output(response.content, planning_params)
+
+    def _plan_output(self, answer: str, planning_params: dict) -> AgentOutput:
+        """Parse the generated plans and wrap them as AgentOutput."""
+        plan_options = self._parse_plan_options(answer)
         risks = self._identify_risks(plan_options, planning_params)
 
         return AgentOutput(
             agent_name=self.name,
-            answer=response.content,
+            answer=answer,
             confidence=0.85,
             plan_options=plan_options,
             risks=risks,
@@ -63,6 +112,68 @@ class AcademicPlanningAgent(BaseAgent):
             constraints=planning_params.get("constraints", [])
         )
 
+    def _native_plans(self, params: dict) -> List[PlanOption]:
+        """Plans from the constraint-search planner ([] = fall back to the LLM)."""
+        if not is_native_planner_enabled():
+            return []
+        try:
+            return plan_for_student(
+                params.get("program"),
+                params.get("completed_courses", []),
+                current_semester=params.get("current_semester", ""),
+                minor=params.get("include_minor"),
+                workload=params.get("workload_preference", "balanced")
+            )
+        except Exception as e:
+            print(f"⚠️  Native planner failed, using LLM planning: {e}")
+            return []
+
+    def _native_output(self, answer: str, plan_options: List[PlanOption], planning_params: dict) -> AgentOutput:
+        """Wrap planner-generated plans (plus the LLM explanation) as AgentOutput."""
+        risks = [risk for plan in plan_options for risk in plan.risks]
+        risks.extend(self._identify_risks(plan_options, planning_params))
+
+        return AgentOutput(
+            agent_name=self.name,
+            answer=answer,
+            confidence=max(plan.confidence for plan in plan_options),
+            plan_options=plan_options,
+            risks=risks,
+            relevant_policies=["Course prerequisites", "Graduation requirements"],
+            constraints=planning_params.get("constraints", [])
+        )
+
+    def _build_explanation_prompt(self, params: dict, plan_options: List[PlanOption]) -> str:
+        """Prompt asking the LLM to present already-validated plans."""
+        plans = [
+            {
+                "plan": chr(ord("A") + i),
+                "summary": plan.justification,
+                "semesters": plan.semesters,
+                "risks": [risk.description for risk in plan.risks]
+            }
+            for i, plan in enumerate(plan_options)
+        ]
+
+        return f"""You are an expert academic advisor presenting semester-by-semester course plans.
+
+**Student Profile:**
+- Program: {params.get('program', 'N/A')}
+- Current Status: {params.get('current_semester', 'Starting')}
+- Minor Interest: {params.get('include_minor', 'None')}
+- Workload Preference: {params.get('workload_preference', 'balanced')}
+
+**Generated Plans (already checked against prerequisites, offering patterns and unit limits):**
+{json.dumps(plans, indent=2)}
+
+**Instructions:**
+1. Present each plan semester by semester exactly as given - do not add, drop or move courses
+2. Explain the sequencing (which courses unlock which) and the workload balance
+3. Entries ending in "elective" are open slots; suggest what kinds of courses fit them
+4. Call out every listed risk and what the student can do about it
+5. Keep it concise
+"""
+
     def _extract_planning_parameters(self, query: str, profile: dict, outputs: dict) -> dict:
         """Extract planning parameters from query and context."""
         params = {
@@ -122,43 +233,23 @@ class AcademicPlanningAgent(BaseAgent):
             "requirements_context": context
         }
 
-    def _get_course_schedules(self, params: dict) -> dict:
-        """Load course schedule data for planning."""
-        # Load schedule JSONs
-        schedules = {}
+    async def _aget_program_requirements(self, params: dict, outputs: dict) -> dict:
+        """Async version of _get_program_requirements()."""
+        if "programs_requirements" in outputs:
+            return self._get_program_requirements(params, outputs)
 
-        try:
-            # Load available schedules
-            import os
-            schedule_dir = "./data/schedules"
-
-            if os.path.exists(schedule_dir):
-                for filename in os.listdir(schedule_dir):
-                    if filename.endswith('.json') and 'schedule_' in filename:
-                        filepath = os.path.join(schedule_dir, filename)
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            data = json.load(f)
-                            term = data.get("semester", {})
-                            key = f"{term.get('year', '')}_{term.get('term', '')}".lower()
-                            schedules[key] = data
-
-            # Also check the Schedule folder for existing JSON
-            alt_schedule_dir = "./data/courses/Schedule"
-            if os.path.exists(alt_schedule_dir):
-                for filename in os.listdir(alt_schedule_dir):
-                    if filename.endswith('.json') and 'schedule_' in filename:
-                        filepath = os.path.join(alt_schedule_dir, filename)
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            data = json.load(f)
-                            if "semester" in data:
-                                term = data.get("semester", {})
-                                key = f"{term.get('year', '')}_{term.get('term', '')}".lower()
-                                schedules[key] = data
+        program = params.get("program", "Computer Science")
+        rag_query = f"{program} major requirements core courses electives sample curriculum"
+        context = await self.aretrieve_context(rag_query)
 
-        except Exception as e:
-            print(f"Warning: Could not load schedules: {e}")
+        return {
+            "program": program,
+            "requirements_context": context
+        }
 
-        return schedules
+    def _get_course_schedules(self, params: dict) -> dict:
+        """Course schedule data for planning (shared, cached repository)."""
+        return get_schedule_repository().schedules_by_key()
 
     def _build_planning_prompt(self, params: dict, requirements: dict,
                                schedules: dict, profile: dict) -> str:
@@ -299,28 +390,47 @@ RATIONALE FOR PLAN A:
     def _identify_risks(self, plan_options: List[PlanOption], params: dict) -> List[Risk]:
         """Identify potential risks in the generated plans."""
         risks = []
-
-        # This would need more sophisticated logic
-        # For now, placeholder for common risks
+        graph = get_prereq_graph()
 
         for plan in plan_options:
+            # Check for prerequisite violations: every course must be
+            # unlocked by completed courses plus earlier semesters
+            taken = dict(normalize_completed(params.get("completed_courses", [])))
+            for semester in plan.semesters:
+                courses = semester.get("courses", [])
+                for code in courses:
+                    if code not in graph.clauses:
+                        continue
+                    result = graph.check(code, taken, concurrent=courses)
+                    if not result.prereqs_met or result.missing_coreqs:
+                        risks.append(Risk(
+                            type="prerequisite_violation",
+                            severity="high",
+                            description=f"{semester.get('term', 'Semester')}: {result.summary()}"
+                        ))
+                taken.update({code: None for code in courses})
+
             # Check for overload semesters (would need unit counting)
-            # Check for prerequisite violations
             # Check for course availability issues
-            pass
 
         return risks
 
     def handle_critique(self, state: BlackboardState, critique: str) -> str:
         """Handle critiques from other agents (e.g., Policy agent flags overload)."""
+        response = self.llm.invoke([SystemMessage(content=self._build_critique_prompt(critique))])
+        return response.content
+
+    async def ahandle_critique(self, state: BlackboardState, critique: str) -> str:
+        """Async version of handle_critique()."""
+        response = await self.llm.ainvoke([SystemMessage(content=self._build_critique_prompt(critique))])
+        return response.content
 
-        prompt = f"""You previously generated an academic plan. Another agent has provided feedback:
+    def _build_critique_prompt(self, critique: str) -> str:
+        """Build the plan-revision prompt for a critique."""
+        return f"""You previously generated an academic plan. Another agent has provided feedback:
 
 CRITIQUE: {critique}
 
 Please revise your plan to address this feedback while maintaining the overall structure and goals.
 Provide the REVISED PLAN with explanations of what changed.
 """
-
-        response = self.llm.invoke([SystemMessage(content=prompt)])
-        return response.content
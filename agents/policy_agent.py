@@ -14,6 +14,9 @@ from langchain_core.messages import SystemMessage
 import json
 import re
 
+# Fixed retrieval query used when critiquing a proposed plan
+CRITIQUE_RAG_QUERY = "overload limits probation rules course repeat policies registration deadlines"
+
 class PolicyComplianceAgent(BaseAgent):
     def __init__(self):
         super().__init__(
@@ -43,14 +46,36 @@ class PolicyComplianceAgent(BaseAgent):
             return self._critique_plan(programs_output.plan_options[0], student_profile)
         else:
             return self._answer_policy_question(user_query)
+
+    async def aexecute(self, state: BlackboardState) -> AgentOutput:
+        """Async version of execute()."""
+        user_query = state.get("user_query", "")
+        agent_outputs = state.get("agent_outputs", {})
+        student_profile = state.get("student_profile", {})
+
+        programs_output = agent_outputs.get("programs_requirements")
+        if programs_output and programs_output.plan_options:
+            plan_option = programs_output.plan_options[0]
+            context = await self.aretrieve_context(CRITIQUE_RAG_QUERY)
+            prompt = self._build_critique_prompt(plan_option, student_profile, context)
+            response = await self.llm.ainvoke([SystemMessage(content=prompt)])
+            return self._parse_response(response.content)
+
+        context = await self.aretrieve_context(user_query)
+        prompt = self._build_question_prompt(user_query, context)
+        response = await self.llm.ainvoke([SystemMessage(content=prompt)])
+        return self._question_output(response.content)
     
     def _critique_plan(self, plan_option, student_profile: dict) -> AgentOutput:
         """Critique a proposed plan for policy compliance."""
-        context = self.retrieve_context(
-            "overload limits probation rules course repeat policies registration deadlines"
-        )
-        
-        prompt = f"""You are the Policy & Compliance Agent for CMU-Q.
+        context = self.retrieve_context(CRITIQUE_RAG_QUERY)
+        prompt = self._build_critique_prompt(plan_option, student_profile, context)
+        response = self.llm.invoke([SystemMessage(content=prompt)])
+        return self._parse_response(response.content)
+
+    def _build_critique_prompt(self, plan_option, student_profile: dict, context: str) -> str:
+        """Build prompt for critiquing a proposed plan."""
+        return f"""You are the Policy & Compliance Agent for CMU-Q.
 
 Your role: CRITIQUE proposed plans for policy compliance.
 
@@ -99,14 +124,17 @@ Format as JSON:
     ]
 }}
 """
-        
-        response = self.llm.invoke([SystemMessage(content=prompt)])
-        return self._parse_response(response.content)
     
     def _answer_policy_question(self, query: str) -> AgentOutput:
         """Answer general policy questions."""
         context = self.retrieve_context(query)
-        prompt = f"""You are the Policy & Compliance Agent.
+        prompt = self._build_question_prompt(query, context)
+        response = self.llm.invoke([SystemMessage(content=prompt)])
+        return self._question_output(response.content)
+
+    def _build_question_prompt(self, query: str, context: str) -> str:
+        """Build prompt for a general policy question."""
+        return f"""You are the Policy & Compliance Agent.
 
 Query: {query}
 
@@ -123,10 +151,12 @@ IMPORTANT - How to Use Retrieved Context:
 Answer questions about university policies, compliance, and regulations.
 Cite the specific policy documents (from [DOCUMENT CONTEXT]) in your answer.
 """
-        response = self.llm.invoke([SystemMessage(content=prompt)])
+
+    def _question_output(self, answer: str) -> AgentOutput:
+        """Wrap a general policy answer as AgentOutput."""
         return AgentOutput(
             agent_name=self.name,
-            answer=response.content,
+            answer=answer,
             confidence=0.9,
             relevant_policies=[],
             risks=[],
@@ -46,6 +46,19 @@ class ProgramsRequirementsAgent(BaseAgent):
         
         # 5. Parse and return structured output
         return self._parse_response(response.content)
+
+    async def aexecute(self, state: BlackboardState) -> AgentOutput:
+        """Async version of execute()."""
+        user_query = state.get("user_query", "")
+        user_goal = state.get("user_goal", "")
+        student_profile = state.get("student_profile", {})
+        constraints = state.get("constraints", [])
+
+        context = await self.aretrieve_context(f"{user_query} {user_goal}")
+        prompt = self._build_prompt(user_query, user_goal, student_profile, context, constraints)
+        response = await self.llm.ainvoke([SystemMessage(content=prompt)])
+
+        return self._parse_response(response.content)
     
     def _build_prompt(self, query: str, goal: str, profile: dict, context: str, constraints: list) -> str:
         """Build detailed prompt for Programs agent."""
@@ -0,0 +1,290 @@
+"""
+Semantic Answer Cache
+Serves a previous workflow result for a near-identical question, so repeated
+questions ("can I overload next semester?") skip the 3-6 LLM calls of a full
+multi-agent run.
+
+Lookup is by cosine similarity of the query embedding (at least
+ANSWER_CACHE_SIMILARITY), within a scope: a hash of the profile fields the
+answer depends on (major, minors, standing, GPA, completed courses), so
+students with different records never share answers. Two guards keep
+similar-but-different questions apart:
+
+- Tokens with digits (course codes, unit counts, years) must match exactly:
+  "prereqs for 15-213" and "prereqs for 15-214" embed almost identically
+- Only self-contained questions are cached and served: a question asked
+  after an assistant turn may depend on that context ("what about its
+  prereqs?")
+
+Entries expire after ANSWER_CACHE_TTL seconds and are dropped when an index
+their agents read is rebuilt or hot-reloaded (retrieval_cache.invalidate_domain
+calls invalidate_answers). Cached results carry answer_cached=True; the chat
+endpoints report it as ChatResponse.cached.
+
+Hit/miss counters: answer_cache_stats() (GET /api/v1/admin/answer-cache).
+"""
+import hashlib
+import json
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+from langchain_core.messages import AIMessage
+
+from blackboard.schema import WorkflowStep
+from config import is_answer_cache_enabled, get_answer_cache_limits, get_answer_cache_similarity
+
+# Profile fields that change answers
+PROFILE_FIELDS = (
+    "major", "minors", "academic_standing", "gpa", "completed_courses", "current_courses", "flags",
+    # Planning answers depend on where the student is in their degree
+    "current_semester", "semester", "year", "class_standing",
+)
+# Index each agent reads (see vector_store_registry.py)
+AGENT_DOMAINS = {
+    "programs_requirements": "programs",
+    "academic_planning": "programs",
+    "course_scheduling": "courses",
+    "policy_compliance": "policies",
+}
+# Parts of a workflow result that belong to the original asker
+PRIVATE_STATE = ("messages", "student_profile", "user_query")
+
+
+def profile_fingerprint(student_profile: Optional[Dict[str, Any]]) -> str:
+    """Hash of the answer-relevant profile fields (order and case insensitive)."""
+    fields = {}
+    for name in PROFILE_FIELDS:
+        value = (student_profile or {}).get(name)
+        if isinstance(value, (list, tuple, set)):
+            value = sorted(str(item).strip().lower() for item in value if item)
+        elif isinstance(value, str):
+            value = value.strip().lower()
+        fields[name] = value or None
+    return hashlib.sha256(json.dumps(fields, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def exact_tokens(query: str) -> FrozenSet[str]:
+    """Tokens that must match exactly: anything containing a digit."""
+    return frozenset(token for token in re.findall(r"[\w-]+", query.lower()) if any(c.isdigit() for c in token))
+
+
+def is_self_contained(conversation_history: Optional[Sequence[Dict]]) -> bool:
+    """No assistant turn yet, so the answer cannot depend on earlier answers."""
+    return not any((msg.get("role") in ("assistant", "agent")) for msg in conversation_history or [])
+
+
+@dataclass
+class CachedAnswer:
+    query: str
+    vector: np.ndarray
+    result: Dict[str, Any]
+    tokens: FrozenSet[str]
+    domains: Set[str]
+    stored_at: float
+    last_used: float
+    hits: int = 0
+
+
+class SemanticAnswerCache:
+    """Thread-safe nearest-neighbour cache of workflow results, partitioned by profile scope."""
+
+    def __init__(self, maxsize: int, ttl: float, threshold: float,
+                 clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.threshold = threshold
+        self._clock = clock
+        self._scopes: Dict[str, List[CachedAnswer]] = {}
+        # scope -> stacked entry vectors (rebuilt after the scope changes)
+        self._matrices: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return sum(len(entries) for entries in self._scopes.values())
+
+    @staticmethod
+    def _normalize(vector: Sequence[float]) -> np.ndarray:
+        vector = np.asarray(vector, dtype=np.float32)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+    def _remove(self, scope: str, stale: List[CachedAnswer]):
+        ids = {id(entry) for entry in stale}
+        self._scopes[scope] = [entry for entry in self._scopes[scope] if id(entry) not in ids]
+        if not self._scopes[scope]:
+            del self._scopes[scope]
+        self._matrices.pop(scope, None)
+
+    def lookup(self, vector: Sequence[float], scope: str, query: str) -> Optional[Tuple[CachedAnswer, float]]:
+        """Most similar live entry of the scope above the threshold, with its similarity."""
+        query_vector = self._normalize(vector)
+        tokens = exact_tokens(query)
+        now = self._clock()
+        with self._lock:
+            entries = self._scopes.get(scope, [])
+            expired = [entry for entry in entries if now - entry.stored_at > self.ttl]
+            if expired:
+                self.expirations += len(expired)
+                self._remove(scope, expired)
+                entries = self._scopes.get(scope, [])
+            if entries:
+                matrix = self._matrices.get(scope)
+                if matrix is None:
+                    matrix = self._matrices[scope] = np.stack([entry.vector for entry in entries])
+                similarities = matrix @ query_vector
+                for i in np.argsort(-similarities):
+                    if similarities[i] < self.threshold:
+                        break
+                    if entries[i].tokens == tokens:
+                        entry = entries[i]
+                        entry.hits += 1
+                        entry.last_used = now
+                        self.hits += 1
+                        return entry, float(similarities[i])
+            self.misses += 1
+            return None
+
+    def store(self, vector: Sequence[float], scope: str, query: str,
+              result: Dict[str, Any], domains: Set[str]):
+        if self.maxsize <= 0:
+            return
+        now = self._clock()
+        entry = CachedAnswer(query=query, vector=self._normalize(vector), result=result,
+                             tokens=exact_tokens(query), domains=set(domains),
+                             stored_at=now, last_used=now)
+        with self._lock:
+            self._scopes.setdefault(scope, []).append(entry)
+            self._matrices.pop(scope, None)
+            while len(self) > self.maxsize:
+                # Least recently used across all scopes
+                lru_scope, lru = min(((s, e) for s, entries in self._scopes.items() for e in entries),
+                                     key=lambda item: item[1].last_used)
+                self._remove(lru_scope, [lru])
+                self.evictions += 1
+
+    def invalidate_domain(self, domain: str) -> int:
+        """Drop every answer built from a domain's index; returns the number removed."""
+        removed = 0
+        with self._lock:
+            for scope in list(self._scopes):
+                stale = [entry for entry in self._scopes[scope] if domain in entry.domains]
+                if stale:
+                    self._remove(scope, stale)
+                    removed += len(stale)
+            self.invalidations += removed
+        return removed
+
+    def clear(self):
+        with self._lock:
+            self._scopes.clear()
+            self._matrices.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self),
+                "scopes": len(self._scopes),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "similarity_threshold": self.threshold,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations
+            }
+
+
+_answer_cache = SemanticAnswerCache(*get_answer_cache_limits(), get_answer_cache_similarity())
+
+
+async def _aembed(query: str) -> List[float]:
+    # Same cached query embeddings the retrievers use: the workflow's own
+    # retrievals for this query then skip the embedding call
+    from rag_engine_improved import QUERY_EMBEDDINGS
+    return await QUERY_EMBEDDINGS.aembed_query(query)
+
+
+async def alookup_answer(query: str, student_profile: Optional[Dict[str, Any]] = None,
+                         conversation_history: Optional[Sequence[Dict]] = None) -> Optional[Dict[str, Any]]:
+    """
+    A cached workflow result for the question, or None.
+
+    The result has the workflow's final state minus the original asker's
+    messages and profile; messages holds only the final answer.
+    """
+    if not is_answer_cache_enabled() or not is_self_contained(conversation_history):
+        return None
+    try:
+        vector = await _aembed(query)
+    except Exception as e:
+        print(f"⚠️  Answer cache lookup skipped: {e}")
+        return None
+    match = _answer_cache.lookup(vector, profile_fingerprint(student_profile), query)
+    if match is None:
+        return None
+
+    entry, similarity = match
+    print(f"💾 Cached answer (similarity {similarity:.3f}) for: {entry.query[:60]}")
+    result = dict(entry.result)
+    result["answer_cached"] = True
+    result["answer_cache"] = {
+        "similarity": round(similarity, 4),
+        "cached_query": entry.query,
+        "age_seconds": round(_answer_cache._clock() - entry.stored_at, 1)
+    }
+    return result
+
+
+async def astore_answer(query: str, student_profile: Optional[Dict[str, Any]],
+                        conversation_history: Optional[Sequence[Dict]], result: Dict[str, Any]):
+    """
+    Cache a finished workflow result (self-contained questions with an answer only).
+
+    Only runs that reached synthesis count: a run that stopped for user input
+    (clarification) ends with the user's own message, not an answer.
+    """
+    if not is_answer_cache_enabled() or not is_self_contained(conversation_history):
+        return
+    if result.get("workflow_step") != WorkflowStep.COMPLETE:
+        return
+    messages = result.get("messages") or []
+    if not messages or not isinstance(messages[-1], AIMessage) or not messages[-1].content:
+        return
+    try:
+        vector = await _aembed(query)
+    except Exception as e:
+        print(f"⚠️  Answer not cached: {e}")
+        return
+
+    shared = {key: value for key, value in result.items() if key not in PRIVATE_STATE}
+    shared["messages"] = [messages[-1]]
+    domains = {AGENT_DOMAINS[agent] for agent in result.get("agent_outputs", {}) if agent in AGENT_DOMAINS}
+    _answer_cache.store(vector, profile_fingerprint(student_profile), query, shared, domains)
+
+
+def invalidate_answers(domain: str) -> int:
+    """Drop cached answers that used a domain's index (after it changed)."""
+    removed = _answer_cache.invalidate_domain(domain)
+    if removed:
+        print(f"🧹 Dropped {removed} cached answer(s) for domain '{domain}'")
+    return removed
+
+
+def clear_answer_cache():
+    _answer_cache.clear()
+
+
+def answer_cache_stats() -> Dict[str, float]:
+    """Hit/miss/eviction counters of the answer cache."""
+    return _answer_cache.stats()
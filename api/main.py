@@ -25,7 +25,9 @@ from api.routes import (
     users_router,
     profiles_router,
     conversations_router,
-    health_router
+    health_router,
+    admin_router,
+    courses_router
 )
 
 # Configure logging
@@ -53,13 +55,29 @@ async def lifespan(app: FastAPI):
         logger.error(f"Failed to connect to MongoDB: {e}")
         raise
 
+    # Watch data/ for changes and hot-reload indexes (DATA_WATCH_INTERVAL)
+    from data_reload import start_data_watcher, stop_data_watcher
+    if start_data_watcher():
+        logger.info("Data watcher started")
+
+    # Build the course search index now so the first autocomplete is fast
+    from course_search import get_course_search_index
+    logger.info(f"Course search index ready ({len(get_course_search_index())} courses)")
+
     yield
 
+    stop_data_watcher()
+
     # Shutdown
     logger.info("Shutting down API...")
     await MongoDB.disconnect()
     logger.info("MongoDB connection closed")
 
+    # Close the shared LLM connection pools
+    from llm_clients import aclose_http_clients
+    await aclose_http_clients()
+    logger.info("LLM connection pools closed")
+
 
 # Create FastAPI application
 app = FastAPI(
@@ -149,6 +167,8 @@ app.include_router(users_router, prefix=API_PREFIX)
 app.include_router(profiles_router, prefix=API_PREFIX)
 app.include_router(conversations_router, prefix=API_PREFIX)
 app.include_router(chat_router, prefix=API_PREFIX)
+app.include_router(admin_router, prefix=API_PREFIX)
+app.include_router(courses_router, prefix=API_PREFIX)
 
 
 # Root endpoint
@@ -195,7 +215,8 @@ def custom_openapi():
         {"name": "Users", "description": "User management"},
         {"name": "Student Profiles", "description": "Academic profile management"},
         {"name": "Conversations", "description": "Chat history management"},
-        {"name": "Chat", "description": "Multi-agent advising interface"}
+        {"name": "Chat", "description": "Multi-agent advising interface"},
+        {"name": "Admin", "description": "Data and index hot reload"}
     ]
 
     app.openapi_schema = openapi_schema
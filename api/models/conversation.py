@@ -73,6 +73,7 @@ class WorkflowState(BaseModel):
     agent_outputs: Dict[str, AgentOutput] = Field(default_factory=dict)
     conflicts: List[ConflictInfo] = Field(default_factory=list)
     iteration_count: int = 0
+    execution_metrics: Dict[str, Any] = Field(default_factory=dict)  # Parallel stage timing / speedup
     started_at: Optional[datetime] = None
     completed_at: Optional[datetime] = None
 
@@ -177,10 +178,11 @@ class ChatResponse(BaseModel):
 
     # Performance
     total_time_ms: int = 0
+    cached: bool = False  # Served from the semantic answer cache
 
 
 class StreamingChunk(BaseModel):
     """Chunk for streaming responses."""
-    type: str  # "status", "agent_start", "agent_complete", "content", "done"
+    type: str  # "status", "agent_start", "agent_complete", "token", "content", "done"
     data: Dict[str, Any]
     timestamp: datetime = Field(default_factory=datetime.utcnow)
@@ -5,6 +5,8 @@ from .users import router as users_router
 from .profiles import router as profiles_router
 from .conversations import router as conversations_router
 from .health import router as health_router
+from .admin import router as admin_router
+from .courses import router as courses_router
 
 __all__ = [
     "auth_router",
@@ -12,5 +14,7 @@ __all__ = [
     "users_router",
     "profiles_router",
     "conversations_router",
-    "health_router"
+    "health_router",
+    "admin_router",
+    "courses_router"
 ]
@@ -0,0 +1,102 @@
+"""
+Admin endpoints for operating the advising system.
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+
+from api.models.user import User
+from api.routes.auth import require_role
+
+
+router = APIRouter(prefix="/admin", tags=["Admin"])
+
+
+class ReloadRequest(BaseModel):
+    """Domains to reload (all domains when omitted)."""
+    domains: Optional[List[str]] = None
+
+
+class ReloadResponse(BaseModel):
+    """Reload trigger result and current reload status."""
+    started: bool
+    status: Dict[str, Any]
+
+
+@router.post("/reload", response_model=ReloadResponse, status_code=status.HTTP_202_ACCEPTED)
+async def reload_data(
+    request: Optional[ReloadRequest] = None,
+    current_user: User = Depends(require_role(["admin"]))
+):
+    """
+    Rebuild the changed domain indexes and the course catalog in the
+    background and swap them in (admin only).
+
+    Requests already running finish against the old data.
+    """
+    from data_reload import data_reloader
+
+    try:
+        started = data_reloader.trigger(request.domains if request else None)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+    return ReloadResponse(started=started, status=data_reloader.status)
+
+
+@router.get("/reload", response_model=Dict[str, Any])
+async def reload_status(
+    current_user: User = Depends(require_role(["admin"]))
+):
+    """
+    Status of the last (or running) data reload (admin only).
+    """
+    from data_reload import data_reloader
+    return data_reloader.status
+
+
+@router.get("/retrieval-cache", response_model=Dict[str, Any])
+async def retrieval_cache_stats(
+    current_user: User = Depends(require_role(["admin"]))
+):
+    """
+    Hit/miss counters of the query embedding and retrieval result caches (admin only).
+    """
+    from retrieval_cache import cache_stats
+    return cache_stats()
+
+
+@router.get("/answer-cache", response_model=Dict[str, Any])
+async def answer_cache_stats(
+    current_user: User = Depends(require_role(["admin"]))
+):
+    """
+    Hit/miss counters of the semantic answer cache (admin only).
+    """
+    from answer_cache import answer_cache_stats as stats
+    return stats()
+
+
+@router.get("/fast-router", response_model=Dict[str, Any])
+async def fast_router_stats(
+    current_user: User = Depends(require_role(["admin"]))
+):
+    """
+    Share of queries routed by the rule-based fast path instead of the LLM coordinator (admin only).
+    """
+    from coordinator.fast_router import get_fast_router
+    return get_fast_router().stats()
+
+
+@router.get("/vector-stores", response_model=Dict[str, Any])
+async def vector_store_stats(
+    current_user: User = Depends(require_role(["admin"]))
+):
+    """
+    Opened domain stores with their index path and load time (admin only).
+    """
+    from vector_store_registry import get_vector_store_registry
+    return get_vector_store_registry().stats()
@@ -62,10 +62,16 @@ class MultiAgentRunner:
             conversation_history: Previous messages for context
 
         Returns:
-            The final state from the workflow
+            The final state from the workflow (answer_cached=True when it
+            was served from the semantic answer cache)
         """
         from langchain_core.messages import HumanMessage, AIMessage
         from blackboard.schema import WorkflowStep
+        from answer_cache import alookup_answer, astore_answer
+
+        cached = await alookup_answer(user_query, student_profile, conversation_history)
+        if cached is not None:
+            return cached
 
         app, _ = self._get_app()
 
@@ -98,10 +104,10 @@ class MultiAgentRunner:
             "user_goal": None
         }
 
-        # Run workflow in thread pool to not block
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(None, app.invoke, initial_state)
+        # Run workflow on the event loop; LLM calls await the shared async pool
+        result = await app.ainvoke(initial_state)
 
+        await astore_answer(user_query, student_profile, conversation_history, result)
         return result
 
     async def run_streaming(
@@ -113,7 +119,9 @@ class MultiAgentRunner:
         """
         Run the multi-agent workflow with streaming updates.
 
-        Yields status updates as the workflow progresses.
+        Yields status updates as each node finishes, then the synthesized
+        answer token by token ("token" events) followed by the full answer
+        ("content" event).
         """
         from langchain_core.messages import HumanMessage, AIMessage
         from blackboard.schema import WorkflowStep
@@ -154,55 +162,97 @@ class MultiAgentRunner:
             "data": {"step": "starting", "message": "Analyzing your question..."}
         }
 
-        # Stream through the workflow using LangGraph's stream method
-        loop = asyncio.get_event_loop()
-
-        def run_stream():
-            results = []
-            for chunk in app.stream(initial_state):
-                results.append(chunk)
-            return results
-
-        chunks = await loop.run_in_executor(None, run_stream)
-
-        for chunk in chunks:
-            # Parse chunk and yield appropriate updates
-            for node_name, node_output in chunk.items():
-                if node_name == "coordinator":
-                    workflow_step = node_output.get("workflow_step")
-                    if workflow_step:
-                        yield {
-                            "type": "status",
-                            "data": {
-                                "step": workflow_step.value if hasattr(workflow_step, 'value') else str(workflow_step),
-                                "active_agents": node_output.get("active_agents", [])
-                            }
-                        }
+        # The graph runs as a background task and pushes events onto an
+        # asyncio queue as they happen: one per finished node, plus one per
+        # answer token while the coordinator synthesizes. Events are yielded
+        # as soon as they arrive instead of after the whole run completes.
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        def on_token(token: str):
+            queue.put_nowait({"type": "token", "data": {"token": token}})
+
+        async def run_stream():
+            try:
+                config = {"configurable": {"on_token": on_token}}
+                async for chunk in app.astream(initial_state, config=config):
+                    for event in self._chunk_events(chunk):
+                        queue.put_nowait(event)
+            except Exception as e:
+                queue.put_nowait(e)
+            finally:
+                queue.put_nowait(done)
+
+        worker = asyncio.create_task(run_stream())
 
-                elif node_name in ["programs", "courses", "policy", "planning"]:
-                    agent_outputs = node_output.get("agent_outputs", {})
-                    for agent_name, output in agent_outputs.items():
-                        yield {
-                            "type": "agent_complete",
-                            "data": {
-                                "agent": agent_name,
-                                "confidence": output.confidence if hasattr(output, 'confidence') else 0,
-                                "has_risks": len(output.risks) > 0 if hasattr(output, 'risks') else False
-                            }
-                        }
-
-                elif node_name == "synthesize":
-                    # Final answer
-                    messages = node_output.get("messages", [])
-                    if messages:
-                        final_answer = messages[-1].content if hasattr(messages[-1], 'content') else str(messages[-1])
-                        yield {
-                            "type": "content",
-                            "data": {"answer": final_answer}
-                        }
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Client disconnected or error: stop the graph run
+            if not worker.done():
+                worker.cancel()
 
         yield {"type": "done", "data": {}}
 
+    @staticmethod
+    def _chunk_events(chunk: dict) -> list:
+        """Translate one LangGraph node update into streaming events."""
+        events = []
+        for node_name, node_output in chunk.items():
+            if not node_output:
+                continue
+
+            if node_name == "coordinator":
+                workflow_step = node_output.get("workflow_step")
+                if workflow_step:
+                    events.append({
+                        "type": "status",
+                        "data": {
+                            "step": workflow_step.value if hasattr(workflow_step, 'value') else str(workflow_step),
+                            "active_agents": node_output.get("active_agents", [])
+                        }
+                    })
+                for agent_name in node_output.get("current_stage") or []:
+                    events.append({
+                        "type": "agent_start",
+                        "data": {"agent": agent_name}
+                    })
+
+            elif node_name in ["programs", "courses", "policy", "planning", "parallel_stage"]:
+                # Agent nodes return only their own outputs (reducer deltas)
+                agent_outputs = node_output.get("agent_outputs", {})
+                agent_timings = node_output.get("agent_timings", {})
+                for agent_name, output in agent_outputs.items():
+                    events.append({
+                        "type": "agent_complete",
+                        "data": {
+                            "agent": agent_name,
+                            "confidence": output.confidence if hasattr(output, 'confidence') else 0,
+                            "has_risks": len(output.risks) > 0 if hasattr(output, 'risks') else False,
+                            "execution_time_ms": int(agent_timings.get(agent_name, 0))
+                        }
+                    })
+
+            elif node_name == "synthesize":
+                # Final answer (tokens have already been streamed)
+                messages = node_output.get("messages", [])
+                if messages:
+                    final_answer = messages[-1].content if hasattr(messages[-1], 'content') else str(messages[-1])
+                    events.append({
+                        "type": "content",
+                        "data": {
+                            "answer": final_answer,
+                            "execution_metrics": node_output.get("execution_metrics", {})
+                        }
+                    })
+        return events
+
 
 # Global runner instance
 agent_runner = MultiAgentRunner()
@@ -319,6 +369,7 @@ async def chat(
                                    for p in (output.relevant_policies if hasattr(output, 'relevant_policies') else [])],
                 risks=[{"type": r.type, "severity": r.severity, "description": r.description}
                        for r in (output.risks if hasattr(output, 'risks') else [])],
+                execution_time_ms=int(result.get("agent_timings", {}).get(agent_name, 0)),
                 status=AgentStatus.COMPLETE
             )
 
@@ -330,7 +381,8 @@ async def chat(
             completed_agents=list(result.get("agent_outputs", {}).keys()),
             agent_outputs=agent_outputs_dict,
             conflicts=[],  # Would extract from result
-            iteration_count=result.get("iteration_count", 0)
+            iteration_count=result.get("iteration_count", 0),
+            execution_metrics=result.get("execution_metrics", {})
         )
 
     # Add assistant message to conversation
@@ -361,7 +413,8 @@ async def chat(
         agents_used=list(result.get("agent_outputs", {}).keys()),
         conflicts_detected=len(result.get("conflicts", [])),
         sources=list(set(sources))[:10],  # Dedupe and limit
-        total_time_ms=total_time_ms
+        total_time_ms=total_time_ms,
+        cached=result.get("answer_cached", False)
     )
 
 
@@ -423,15 +476,23 @@ async def chat_stream(
     async def generate():
         """Generate SSE stream."""
         try:
+            final_answer = ""
             async for chunk in agent_runner.run_streaming(
                 user_query=request.message,
                 student_profile=student_profile,
                 conversation_history=conv_history
             ):
+                if chunk["type"] == "content":
+                    final_answer = chunk["data"].get("answer", "")
                 yield f"data: {json.dumps(chunk)}\n\n"
 
-            # Store final answer
-            # Note: In a real implementation, you'd capture the answer from the stream
+            # Store final answer captured from the stream
+            if final_answer:
+                await conv_service.add_message(
+                    conversation_id=conversation_id,
+                    role=MessageRole.ASSISTANT,
+                    content=final_answer
+                )
 
         except Exception as e:
             yield f"data: {json.dumps({'type': 'error', 'data': {'message': str(e)}})}\n\n"
@@ -442,6 +503,7 @@ async def chat_stream(
         headers={
             "Cache-Control": "no-cache",
             "Connection": "keep-alive",
+            "X-Accel-Buffering": "no",  # Disable proxy buffering so tokens flush immediately
         }
     )
 
@@ -479,5 +541,6 @@ async def quick_chat(
 
     return {
         "response": final_answer,
-        "agents_used": list(result.get("agent_outputs", {}).keys())
+        "agents_used": list(result.get("agent_outputs", {}).keys()),
+        "cached": result.get("answer_cached", False)
     }
@@ -0,0 +1,39 @@
+"""
+Course catalog search endpoints.
+"""
+from fastapi import APIRouter, Query
+from pydantic import BaseModel
+from typing import List, Optional
+
+
+router = APIRouter(prefix="/courses", tags=["Courses"])
+
+
+class CourseSearchResult(BaseModel):
+    """One catalog match."""
+    code: str
+    name: str
+    department: str
+    units: Optional[float] = None
+    score: float
+    matched_on: str
+
+
+@router.get("/search", response_model=List[CourseSearchResult])
+async def search_courses(
+    q: str = Query("", max_length=200, description="Code prefix (\"15-1\") or title words (\"comp sys\")"),
+    department: Optional[str] = Query(None, max_length=3, description="Department code prefix, e.g. \"15\""),
+    min_units: Optional[float] = Query(None, ge=0),
+    max_units: Optional[float] = Query(None, ge=0),
+    limit: int = Query(10, ge=1, le=50)
+):
+    """
+    Autocomplete over the course catalog.
+
+    Served from the in-memory index in course_search.py, so it needs no
+    authentication or database round trip (the catalog is public).
+    """
+    from course_search import search_courses as search
+
+    matches = search(q, department=department, min_units=min_units, max_units=max_units, limit=limit)
+    return [CourseSearchResult(**match.to_dict()) for match in matches]
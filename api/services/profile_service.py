@@ -1,6 +1,7 @@
 """
 Student Profile service for academic data management.
 """
+import asyncio
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 from bson import ObjectId
@@ -12,6 +13,7 @@ from api.models.student_profile import (
     DegreeProgress, AcademicStanding
 )
 from api.database import PROFILES_COLLECTION
+from degree_audit import audit_student
 
 
 class ProfileService:
@@ -185,25 +187,32 @@ class ProfileService:
         self,
         user_id: str
     ) -> List[DegreeProgress]:
-        """Calculate and update degree progress."""
+        """Calculate and update degree progress (degree audit, see degree_audit.py)."""
         profile = await self.get_profile_by_user_id(user_id)
         if not profile:
             return []
 
-        # This would integrate with your program requirements
-        # For now, return placeholder
-        progress_list = []
-
-        # Primary major progress
-        progress_list.append(DegreeProgress(
-            program_name=f"B.S. {profile.primary_major}",
-            program_type="major",
-            required_credits=360.0,  # Example
-            completed_credits=profile.cumulative_credits,
-            remaining_credits=max(0, 360.0 - profile.cumulative_credits),
-            completion_percentage=min(100, (profile.cumulative_credits / 360.0) * 100),
-            remaining_requirements=[]  # Would be populated by programs agent
-        ))
+        # Sync and CPU-bound (the first call also compiles the catalog and
+        # prerequisite graph): keep it off the event loop
+        audits = await asyncio.to_thread(audit_student, {
+            "primary_major": profile.primary_major,
+            "additional_majors": profile.additional_majors,
+            "minors": profile.minors,
+            "completed_courses": [c.model_dump() for c in profile.completed_courses]
+        })
+        progress_list = [DegreeProgress(**audit.to_degree_progress()) for audit in audits]
+
+        if not any(audit.kind == "major" for audit in audits):
+            # No requirement file for the major - estimate from units only
+            progress_list.insert(0, DegreeProgress(
+                program_name=f"B.S. {profile.primary_major}",
+                program_type="major",
+                required_credits=360.0,
+                completed_credits=profile.cumulative_credits,
+                remaining_credits=max(0, 360.0 - profile.cumulative_credits),
+                completion_percentage=min(100, (profile.cumulative_credits / 360.0) * 100),
+                remaining_requirements=[]
+            ))
 
         # Update in database
         await self.collection.update_one(
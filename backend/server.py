@@ -4,7 +4,6 @@ Connects to MongoDB Atlas and serves the Next.js frontend.
 """
 import os
 import sys
-import asyncio
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List
 from contextlib import asynccontextmanager
@@ -79,6 +78,7 @@ class ChatResponse(BaseModel):
     response: str
     agents_used: List[str] = []
     workflow_details: Optional[Dict[str, Any]] = None
+    cached: bool = False  # Served from the semantic answer cache
 
 
 class ConversationCreate(BaseModel):
@@ -146,9 +146,14 @@ class AgentRunner:
         user_profile: Optional[Dict] = None,
         history: Optional[List[Dict]] = None
     ) -> Dict[str, Any]:
-        """Run the multi-agent workflow."""
+        """Run the multi-agent workflow (or serve a cached answer, see answer_cache.py)."""
         from langchain_core.messages import HumanMessage, AIMessage
         from blackboard.schema import WorkflowStep
+        from answer_cache import alookup_answer, astore_answer
+
+        cached = await alookup_answer(query, user_profile, history)
+        if cached is not None:
+            return cached
 
         app = self._get_app()
 
@@ -180,10 +185,10 @@ class AgentRunner:
             "user_goal": None
         }
 
-        # Run in thread pool
-        loop = asyncio.get_event_loop()
-        result = await loop.run_in_executor(None, app.invoke, state)
+        # Run on the event loop (LLM calls use the shared async connection pool)
+        result = await app.ainvoke(state)
 
+        await astore_answer(query, user_profile, history, result)
         return result
 
 
@@ -199,8 +204,13 @@ async def lifespan(app: FastAPI):
     """Startup and shutdown."""
     logger.info("Starting server...")
     await MongoDB.connect()
+    # Watch data/ for changes and hot-reload indexes (DATA_WATCH_INTERVAL)
+    from data_reload import start_data_watcher, stop_data_watcher
+    if start_data_watcher():
+        logger.info("Data watcher started")
     yield
     logger.info("Shutting down...")
+    stop_data_watcher()
     await MongoDB.disconnect()
 
 
@@ -461,6 +471,7 @@ async def chat(data: ChatMessage, user: dict = Depends(get_current_user)):
         "iteration_count": result.get("iteration_count", 0),
         "active_agents": result.get("active_agents", []),
         "user_goal": result.get("user_goal", ""),
+        "answer_cached": result.get("answer_cached", False),
     }
 
     await add_message(
@@ -479,7 +490,8 @@ async def chat(data: ChatMessage, user: dict = Depends(get_current_user)):
             "risks": len(risks_data),
             "workflow_step": str(result.get("workflow_step", "unknown")),
             "iteration_count": result.get("iteration_count", 0)
-        }
+        },
+        cached=result.get("answer_cached", False)
     )
 
 
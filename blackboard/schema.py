@@ -2,7 +2,8 @@
 Structured Blackboard Schema
 Based on General Feedback Section 3.1: Shared State as structured data
 """
-from typing import TypedDict, List, Optional, Dict, Any
+import operator
+from typing import TypedDict, List, Optional, Dict, Any, Annotated
 from pydantic import BaseModel, Field
 from enum import Enum
 
@@ -74,6 +75,25 @@ class Conflict(BaseModel):
     description: str
     options: List[Dict[str, Any]] = Field(default_factory=list, description="Resolution options")
 
+# ============================================================================
+# REDUCERS (how concurrent node updates are merged into the Blackboard)
+# ============================================================================
+
+def merge_dicts(left: Optional[Dict[str, Any]], right: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Reducer for keyed fields (e.g. agent_outputs).
+
+    Nodes return only the entries they produced; entries are merged by key,
+    with the newer value winning for the same key.
+    """
+    if not left:
+        return dict(right or {})
+    if not right:
+        return left
+    merged = dict(left)
+    merged.update(right)
+    return merged
+
 # ============================================================================
 # BLACKBOARD STATE (TypedDict for LangGraph)
 # ============================================================================
@@ -91,14 +111,19 @@ class BlackboardState(TypedDict):
     user_goal: Optional[str]  # e.g., "add CS minor" or "graduate in 4 years"
     user_query: str
     
+    # Fields annotated with a reducer are append/merge-only: nodes return just
+    # their delta, and LangGraph merges deltas (including from nodes that run
+    # in the same superstep) instead of each node rewriting the whole value.
+
     # Agent Outputs (Structured - Key: agent_name, Value: AgentOutput)
-    agent_outputs: Dict[str, AgentOutput]
+    agent_outputs: Annotated[Dict[str, AgentOutput], merge_dicts]
     
     # Constraints & Risks (Aggregated from all agents)
-    constraints: List[Constraint]
-    risks: List[Risk]
+    constraints: Annotated[List[Constraint], operator.add]
+    risks: Annotated[List[Risk], operator.add]
     
-    # Plans & Options
+    # Plans & Options (replaced, not merged: each planning run's options
+    # supersede the previous ones, e.g. on negotiation reruns)
     plan_options: List[PlanOption]
     
     # Conflict Resolution (from feedback Section 5)
@@ -112,4 +137,11 @@ class BlackboardState(TypedDict):
     active_agents: List[str]  # Which agents are currently active
     workflow_step: WorkflowStep  # Current step in workflow
     iteration_count: int  # For negotiation loops (max 3, from feedback)
-    next_agent: Optional[str]  # Next agent to execute
\ No newline at end of file
+    next_agent: Optional[str]  # Next agent to execute
+
+    # Parallel Execution (fan-out / fan-in)
+    parallel_stages: List[List[str]]  # Stages of independent agents, run in order
+    current_stage: List[str]  # Agents scheduled for the current stage
+    agent_timings: Annotated[Dict[str, float], merge_dicts]  # Agent name → execution time (ms)
+    stage_timings: Annotated[List[Dict[str, Any]], operator.add]  # Per-stage {"agents", "wall_ms", "agent_ms"}
+    execution_metrics: Dict[str, Any]  # Wall-clock vs. sequential time and speedup
\ No newline at end of file
@@ -7,7 +7,7 @@ Strategy:
 - Agents: Use faster, cost-effective model for domain-specific tasks
 """
 import os
-from typing import Optional
+from typing import Optional, Tuple
 
 # ============================================================================
 # OPENAI API CONFIGURATION
@@ -19,6 +19,52 @@ def get_openai_base_url() -> Optional[str]:
     """Get OpenAI API base URL (for proxy support)."""
     return OPENAI_API_BASE
 
+# ============================================================================
+# HTTP CONNECTION POOL (shared by all LLM and embedding clients)
+# ============================================================================
+
+# Request timeout for LLM / embedding calls (seconds)
+LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "180"))
+
+# Bounds for the process-wide connection pool
+LLM_MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LLM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+
+def get_llm_request_timeout() -> float:
+    """Timeout (seconds) for a single LLM or embedding request."""
+    return LLM_REQUEST_TIMEOUT
+
+def get_llm_pool_limits() -> Tuple[int, int]:
+    """(max connections, max keep-alive connections) for the shared HTTP pool."""
+    return LLM_MAX_CONNECTIONS, LLM_MAX_KEEPALIVE_CONNECTIONS
+
+# ============================================================================
+# LLM RECORD / REPLAY (see llm_record_replay.py)
+# ============================================================================
+
+# passthrough: call OpenAI as usual; record: call OpenAI and store every chat
+# response and query embedding, keyed by hash(model, temperature, messages);
+# replay: answer only from the store, never touching the network.
+# LLM_REPLAY_LATENCY=recorded makes replayed calls take their recorded time.
+LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "passthrough").lower()
+LLM_CACHE_PATH = os.getenv(
+    "LLM_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "llm_cache", "llm_cache.sqlite")
+)
+LLM_REPLAY_LATENCY = os.getenv("LLM_REPLAY_LATENCY", "none").lower()
+
+def get_llm_cache_mode() -> str:
+    """passthrough, record or replay."""
+    return LLM_CACHE_MODE
+
+def get_llm_cache_path() -> str:
+    """SQLite file holding recorded LLM responses."""
+    return LLM_CACHE_PATH
+
+def get_llm_replay_latency() -> str:
+    """none (replay instantly) or recorded (sleep the recorded latency)."""
+    return LLM_REPLAY_LATENCY
+
 # ============================================================================
 # MODEL CONFIGURATION
 # ============================================================================
@@ -52,6 +98,221 @@ def get_agent_temperature() -> float:
     """Get temperature for Agents."""
     return AGENT_TEMPERATURE
 
+# ============================================================================
+# WORKFLOW EXECUTION
+# ============================================================================
+
+# Run agents that the coordinator places in the same parallel stage concurrently.
+# Set PARALLEL_AGENT_EXECUTION=false to fall back to one-agent-at-a-time execution.
+PARALLEL_AGENT_EXECUTION = os.getenv("PARALLEL_AGENT_EXECUTION", "true").lower() == "true"
+
+# Upper bound on worker threads used for a single parallel stage
+MAX_PARALLEL_AGENTS = int(os.getenv("MAX_PARALLEL_AGENTS", "4"))
+
+def is_parallel_execution_enabled() -> bool:
+    """Whether independent agents in a stage should run concurrently."""
+    return PARALLEL_AGENT_EXECUTION
+
+def get_max_parallel_agents() -> int:
+    """Maximum number of agents executed concurrently within one stage."""
+    return MAX_PARALLEL_AGENTS
+
+# Start workflow planning while the clarification check is still running
+# (both are coordinator-model calls). The plan is discarded when the query
+# needs clarification, so those queries cost one wasted planning call.
+SPECULATIVE_PLANNING = os.getenv("SPECULATIVE_PLANNING", "true").lower() == "true"
+
+def is_speculative_planning_enabled() -> bool:
+    """Whether the coordinator plans concurrently with the clarification check."""
+    return SPECULATIVE_PLANNING
+
+# Rule-based fast path (coordinator/fast_router.py): simple course-info and
+# policy questions are routed without the LLM coordinator when the matching
+# rule's confidence reaches FAST_ROUTER_MIN_CONFIDENCE.
+FAST_ROUTER_ENABLED = os.getenv("FAST_ROUTER_ENABLED", "true").lower() == "true"
+FAST_ROUTER_MIN_CONFIDENCE = float(os.getenv("FAST_ROUTER_MIN_CONFIDENCE", "0.85"))
+
+def is_fast_router_enabled() -> bool:
+    """Whether simple queries may skip the LLM coordinator."""
+    return FAST_ROUTER_ENABLED
+
+def get_fast_router_min_confidence() -> float:
+    """Lowest rule confidence the fast path acts on."""
+    return FAST_ROUTER_MIN_CONFIDENCE
+
+# Local intent classification (coordinator/knn_intent_classifier.py):
+# EnhancedIntentClassifier asks the LLM only when the kNN classifier's
+# calibrated confidence is below INTENT_KNN_MIN_CONFIDENCE. LLM labels are
+# logged to INTENT_LOG_PATH to grow the example bank.
+INTENT_KNN_ENABLED = os.getenv("INTENT_KNN_ENABLED", "true").lower() == "true"
+INTENT_KNN_K = int(os.getenv("INTENT_KNN_K", "7"))
+INTENT_KNN_MIN_CONFIDENCE = float(os.getenv("INTENT_KNN_MIN_CONFIDENCE", "0.8"))
+INTENT_EXAMPLES_PATH = os.getenv(
+    "INTENT_EXAMPLES_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "coordinator", "intent_examples.json")
+)
+INTENT_LOG_PATH = os.getenv(
+    "INTENT_LOG_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "logs", "intent_labels.jsonl")
+)
+
+def is_intent_knn_enabled() -> bool:
+    """Whether intents are classified locally before asking the LLM."""
+    return INTENT_KNN_ENABLED
+
+def get_intent_knn_k() -> int:
+    """Neighbours voting on an intent."""
+    return INTENT_KNN_K
+
+def get_intent_knn_min_confidence() -> float:
+    """Lowest calibrated confidence answered without the LLM."""
+    return INTENT_KNN_MIN_CONFIDENCE
+
+def get_intent_examples_path() -> str:
+    """JSON file holding the labelled intent examples."""
+    return INTENT_EXAMPLES_PATH
+
+def get_intent_log_path() -> str:
+    """JSONL file collecting LLM-labelled queries."""
+    return INTENT_LOG_PATH
+
+# Build semester plans with the constraint-search planner (course_planner.py)
+# and use the LLM only to explain them. Programs without a requirement file
+# still go through the LLM planning prompt.
+NATIVE_PLANNER_ENABLED = os.getenv("NATIVE_PLANNER_ENABLED", "true").lower() == "true"
+
+def is_native_planner_enabled() -> bool:
+    """Whether the planning agent should generate plans without the LLM."""
+    return NATIVE_PLANNER_ENABLED
+
+# Worker processes for batch degree audits (degree_audit.audit_batch)
+AUDIT_WORKERS = int(os.getenv("AUDIT_WORKERS", str(os.cpu_count() or 1)))
+
+def get_audit_workers() -> int:
+    """Number of processes used for cohort degree audits."""
+    return AUDIT_WORKERS
+
+# ============================================================================
+# RAG INDEXING
+# ============================================================================
+
+# Persistent embedding cache used by every index build, keyed by
+# hash(embedding model + chunk text), so unchanged chunks are never re-embedded.
+EMBEDDING_CACHE_ENABLED = os.getenv("EMBEDDING_CACHE_ENABLED", "true").lower() == "true"
+EMBEDDING_CACHE_PATH = os.getenv(
+    "EMBEDDING_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "embedding_cache", "embeddings.sqlite")
+)
+
+def is_embedding_cache_enabled() -> bool:
+    """Whether index builds should reuse cached chunk embeddings."""
+    return EMBEDDING_CACHE_ENABLED
+
+def get_embedding_cache_path() -> str:
+    """SQLite file holding cached chunk embeddings."""
+    return EMBEDDING_CACHE_PATH
+
+# Index builds parse source files in a process pool, INGEST_BATCH_SIZE files
+# per batch handed to the splitter/embedder (see iter_documents_from_path)
+INGEST_WORKERS = int(os.getenv("INGEST_WORKERS", str(os.cpu_count() or 1)))
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "256"))
+
+def get_ingest_workers() -> int:
+    """Worker processes used to parse documents during index builds."""
+    return INGEST_WORKERS
+
+def get_ingest_batch_size() -> int:
+    """Files per ingestion batch."""
+    return INGEST_BATCH_SIZE
+
+# Hybrid retrieval: every domain retriever fuses Chroma vector search with a
+# BM25 index over the same chunks (see lexical_index.py). Each side returns
+# HYBRID_FETCH_K chunks; reciprocal rank fusion (constant RRF_K) keeps k.
+HYBRID_RETRIEVAL_ENABLED = os.getenv("HYBRID_RETRIEVAL_ENABLED", "true").lower() == "true"
+HYBRID_FETCH_K = int(os.getenv("HYBRID_FETCH_K", "20"))
+RRF_K = int(os.getenv("RRF_K", "60"))
+
+def is_hybrid_retrieval_enabled() -> bool:
+    """Whether retrievers combine BM25 with vector search."""
+    return HYBRID_RETRIEVAL_ENABLED
+
+def get_hybrid_fetch_k() -> int:
+    """Candidates taken from each of the vector and BM25 rankings before fusion."""
+    return HYBRID_FETCH_K
+
+def get_rrf_k() -> int:
+    """Reciprocal rank fusion constant (higher = flatter weighting of ranks)."""
+    return RRF_K
+
+# Vector search backend per domain: "chroma" (default) or "numpy", an exact
+# search over a memory-mapped embedding matrix exported from the Chroma store
+# (see numpy_vector_index.py). Format: VECTOR_BACKENDS=courses=numpy,policies=numpy
+# NUMPY_INDEX_DTYPE=int8 stores the matrix quantized (4x smaller).
+VECTOR_BACKENDS = dict(
+    entry.split("=", 1) for entry in os.getenv("VECTOR_BACKENDS", "").replace(" ", "").split(",") if "=" in entry
+)
+NUMPY_INDEX_DTYPE = os.getenv("NUMPY_INDEX_DTYPE", "float32")
+
+def get_vector_backend(domain: str) -> str:
+    """Vector search backend of a domain ("chroma" or "numpy")."""
+    return VECTOR_BACKENDS.get(domain, "chroma")
+
+def get_numpy_index_dtype() -> str:
+    """Storage type of numpy vector indexes ("float32" or "int8")."""
+    return NUMPY_INDEX_DTYPE
+
+# In-memory retrieval caches (see retrieval_cache.py): query text -> embedding,
+# and (domain, normalized query, k) -> retrieved chunks. Sizes are entry
+# counts, TTLs seconds; result entries are also dropped when an index is rebuilt.
+RETRIEVAL_CACHE_ENABLED = os.getenv("RETRIEVAL_CACHE_ENABLED", "true").lower() == "true"
+QUERY_EMBEDDING_CACHE_SIZE = int(os.getenv("QUERY_EMBEDDING_CACHE_SIZE", "2048"))
+QUERY_EMBEDDING_CACHE_TTL = float(os.getenv("QUERY_EMBEDDING_CACHE_TTL", "86400"))
+RETRIEVAL_CACHE_SIZE = int(os.getenv("RETRIEVAL_CACHE_SIZE", "1024"))
+RETRIEVAL_CACHE_TTL = float(os.getenv("RETRIEVAL_CACHE_TTL", "3600"))
+
+def is_retrieval_cache_enabled() -> bool:
+    """Whether retrievers cache query embeddings and results."""
+    return RETRIEVAL_CACHE_ENABLED
+
+def get_query_embedding_cache_limits() -> Tuple[int, float]:
+    """(max entries, TTL seconds) of the query embedding cache."""
+    return QUERY_EMBEDDING_CACHE_SIZE, QUERY_EMBEDDING_CACHE_TTL
+
+def get_retrieval_cache_limits() -> Tuple[int, float]:
+    """(max entries, TTL seconds) of the retrieval result cache."""
+    return RETRIEVAL_CACHE_SIZE, RETRIEVAL_CACHE_TTL
+
+# Semantic answer cache in front of the chat workflow (see answer_cache.py):
+# a question whose embedding is at least ANSWER_CACHE_SIMILARITY similar to
+# a cached one from a student with the same answer-relevant profile gets the
+# cached answer. Size in entries, TTL in seconds; entries are also dropped
+# when an index their agents read is rebuilt.
+ANSWER_CACHE_ENABLED = os.getenv("ANSWER_CACHE_ENABLED", "true").lower() == "true"
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "512"))
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "21600"))
+ANSWER_CACHE_SIMILARITY = float(os.getenv("ANSWER_CACHE_SIMILARITY", "0.95"))
+
+def is_answer_cache_enabled() -> bool:
+    """Whether chat answers may be served from the semantic answer cache."""
+    return ANSWER_CACHE_ENABLED
+
+def get_answer_cache_limits() -> Tuple[int, float]:
+    """(max entries, TTL seconds) of the answer cache."""
+    return ANSWER_CACHE_SIZE, ANSWER_CACHE_TTL
+
+def get_answer_cache_similarity() -> float:
+    """Lowest cosine similarity that counts as the same question."""
+    return ANSWER_CACHE_SIMILARITY
+
+# Hot reload of data/ (see data_reload.py). A background watcher polls the
+# data folders every DATA_WATCH_INTERVAL seconds and rebuilds the affected
+# indexes and the course catalog; 0 disables it (the admin endpoint still works).
+DATA_WATCH_INTERVAL = float(os.getenv("DATA_WATCH_INTERVAL", "0"))
+
+def get_data_watch_interval() -> float:
+    """Seconds between data/ change checks (0 = watcher disabled)."""
+    return DATA_WATCH_INTERVAL
+
 # ============================================================================
 # MODEL INFORMATION
 # ============================================================================
@@ -83,6 +344,8 @@ def print_model_config():
     print(f"\n🤖 Agent Model: {AGENT_MODEL}")
     print(f"   Temperature: {AGENT_TEMPERATURE}")
     print(f"   Purpose: {MODEL_INFO['agents']['purpose']}")
+    mode = "parallel stages" if PARALLEL_AGENT_EXECUTION else "sequential"
+    print(f"\n⚡ Agent Execution: {mode} (max {MAX_PARALLEL_AGENTS} concurrent)")
     print("=" * 70)
 
 if __name__ == "__main__":
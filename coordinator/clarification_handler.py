@@ -7,7 +7,7 @@ and interactive clarification with users.
 Research Contribution: Coordinator knows when to ask for clarification
 """
 
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage
 import json
@@ -47,9 +47,77 @@ class ClarificationHandler:
             - questions: List[Dict]
             - reasoning: str
         """
-        # Extract what we know from profile
+        precheck = self.precheck(query, student_profile)
+        if precheck:
+            return precheck
+        
+        return self.check_with_llm(query, conversation_history, student_profile)
+    
+    async def acheck_for_clarification(
+        self,
+        query: str,
+        conversation_history: List[Dict[str, str]],
+        student_profile: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Async version of check_for_clarification()."""
+        precheck = self.precheck(query, student_profile)
+        if precheck:
+            return precheck
+        
+        return await self.acheck_with_llm(query, conversation_history, student_profile)
+    
+    def check_with_llm(
+        self,
+        query: str,
+        conversation_history: List[Dict[str, str]],
+        student_profile: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """
+        The LLM part of check_for_clarification() (no precheck).
+        
+        The coordinator calls this directly when it has already run precheck()
+        and plans speculatively in parallel.
+        """
+        prompt = self._build_prompt(query, conversation_history, student_profile)
+        
+        try:
+            response = self.llm.invoke([SystemMessage(content=prompt)])
+            result = self._parse_response(response.content)
+            if result:
+                return result
+            
+        except Exception as e:
+            print(f"⚠️  Clarification check error: {e}")
+        
+        return self._default_result()
+    
+    async def acheck_with_llm(
+        self,
+        query: str,
+        conversation_history: List[Dict[str, str]],
+        student_profile: Dict[str, Any]
+    ) -> Dict[str, Any]:
+        """Async version of check_with_llm()."""
+        prompt = self._build_prompt(query, conversation_history, student_profile)
+        
+        try:
+            response = await self.llm.ainvoke([SystemMessage(content=prompt)])
+            result = self._parse_response(response.content)
+            if result:
+                return result
+            
+        except Exception as e:
+            print(f"⚠️  Clarification check error: {e}")
+        
+        return self._default_result()
+    
+    def precheck(self, query: str, student_profile: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Resolve the query without the LLM when the major is stated or inferable.
+        
+        Returns a clarification result, or None if the LLM check is needed.
+        """
         known_major = student_profile.get('major') or student_profile.get('program')
-        known_semester = student_profile.get('semester') or student_profile.get('current_semester')
         
         # PRE-CHECK: Extract major from query if explicitly mentioned
         query_lower = query.lower()
@@ -94,13 +162,25 @@ class ClarificationHandler:
                     'inferred_major': inferred_major  # Pass this to coordinator
                 }
         
+        return None
+    
+    def _build_prompt(
+        self,
+        query: str,
+        conversation_history: List[Dict[str, str]],
+        student_profile: Dict[str, Any]
+    ) -> str:
+        """Build the LLM ambiguity-analysis prompt."""
+        known_major = student_profile.get('major') or student_profile.get('program')
+        known_semester = student_profile.get('semester') or student_profile.get('current_semester')
+        
         # Build context
         history_text = "\n".join([
             f"{msg.get('role', 'user')}: {msg.get('content', '')}" 
             for msg in conversation_history[-4:]  # Last 2 turns
         ]) if conversation_history else "No previous conversation"
         
-        prompt = f"""You are an academic advisor analyzing a student's query for ambiguity.
+        return f"""You are an academic advisor analyzing a student's query for ambiguity.
 
 Query: "{query}"
 
@@ -208,20 +288,16 @@ DECISION RULES (FOLLOW STRICTLY):
 
 BE CONSERVATIVE: Default to NOT asking unless answer CRITICALLY depends on major
 """
-        
-        try:
-            response = self.llm.invoke([SystemMessage(content=prompt)])
-            
-            # Parse JSON response
-            json_match = re.search(r'\{.*\}', response.content, re.DOTALL)
-            if json_match:
-                result = json.loads(json_match.group())
-                return result
-            
-        except Exception as e:
-            print(f"⚠️  Clarification check error: {e}")
-        
-        # Default: proceed without clarification
+    
+    def _parse_response(self, content: str) -> Optional[Dict[str, Any]]:
+        """Parse the JSON object out of the LLM response."""
+        json_match = re.search(r'\{.*\}', content, re.DOTALL)
+        if json_match:
+            return json.loads(json_match.group())
+        return None
+    
+    def _default_result(self) -> Dict[str, Any]:
+        """Default: proceed without clarification."""
         return {
             'needs_clarification': False,
             'confidence': 0.8,
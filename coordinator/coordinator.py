@@ -8,26 +8,40 @@ Key Responsibilities:
 - Negotiation management
 - Answer synthesis
 """
-from typing import Dict, List, Any, Tuple
-from langchain_openai import ChatOpenAI
+from typing import Dict, List, Any, Tuple, Callable, Optional
 from langchain_core.messages import SystemMessage
 from blackboard.schema import (
     BlackboardState, Conflict, ConflictType, WorkflowStep, AgentOutput
 )
+import asyncio
 import json
 import re
 import sys
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 # Add parent directory to path to import config
 parent_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 if parent_dir not in sys.path:
     sys.path.insert(0, parent_dir)
-from config import get_coordinator_model, get_coordinator_temperature, get_openai_base_url
+from llm_clients import get_coordinator_llm
+from config import is_speculative_planning_enabled, is_fast_router_enabled
 
 # Import LLM-driven coordinator
 from coordinator.llm_driven_coordinator import LLMDrivenCoordinator
 from coordinator.clarification_handler import ClarificationHandler
+from coordinator.fast_router import get_fast_router, is_simple_query
+from coordinator.knn_intent_classifier import get_knn_intent_classifier_or_none
+
+# Agent -> agents whose output it reads from the blackboard; never run in
+# the same stage as them
+AGENT_DEPENDENCIES = {
+    "course_scheduling": ("programs_requirements",),
+    "policy_compliance": ("programs_requirements",),
+    "academic_planning": ("programs_requirements",),
+}
+
 
 class Coordinator:
     """Main orchestrator for multi-agent system."""
@@ -41,26 +55,9 @@ class Coordinator:
         - Dynamic workflow planning
         - Adaptive coordination based on context
         """
-        # Use more powerful model for coordinator (complex reasoning tasks)
-        model = get_coordinator_model()
-        temperature = get_coordinator_temperature()
-        base_url = get_openai_base_url()
-
-        # Configure HTTP client with SSL verification disabled and longer timeout
-        import httpx
-        http_client = httpx.Client(verify=False, timeout=180.0)  # 3 minutes
-
-        # Build ChatOpenAI with optional proxy support
-        llm_kwargs = {
-            "model": model,
-            "temperature": temperature,
-            "http_client": http_client,
-            "request_timeout": 180.0
-        }
-        if base_url:
-            llm_kwargs["base_url"] = base_url
-
-        self.llm = ChatOpenAI(**llm_kwargs)
+        # Use more powerful model for coordinator (complex reasoning tasks).
+        # Shares the process-wide HTTP connection pool (see llm_clients.py).
+        self.llm = get_coordinator_llm()
         self.available_agents = [
             "programs_requirements",
             "course_scheduling",
@@ -71,24 +68,23 @@ class Coordinator:
         # Initialize LLM-driven coordinator
         self.llm_coordinator = LLMDrivenCoordinator(self.llm)
         
-        # Initialize clarification handler with longer timeout
-        # Clarification checks can take longer due to complex prompts
-        clarification_http_client = httpx.Client(verify=False, timeout=180.0)  # 3 minutes
-        clarification_llm_kwargs = {
-            "model": model,
-            "temperature": temperature,
-            "http_client": clarification_http_client,
-            "request_timeout": 180.0
-        }
-        if base_url:
-            clarification_llm_kwargs["base_url"] = base_url
-        clarification_llm = ChatOpenAI(**clarification_llm_kwargs)
-        self.clarification_handler = ClarificationHandler(clarification_llm)
+        # Initialize clarification handler (same model and pool)
+        self.clarification_handler = ClarificationHandler(self.llm)
+        
+        # Plan while the clarification check runs (see classify_intent)
+        self.speculative_planning = is_speculative_planning_enabled()
+        
+        # Rule-based routing for simple queries (no LLM call at all)
+        self.fast_router = get_fast_router() if is_fast_router_enabled() else None
         print("✅ Using LLM-Driven Coordinator")
         print("   • Full LLM reasoning for workflow planning")
         print("   • Dynamic agent coordination")
         print("   • Context-aware decision making")
         print("   • Interactive clarification support")
+        if self.speculative_planning:
+            print("   • Speculative planning (clarification check and planning in parallel)")
+        if self.fast_router:
+            print("   • Fast-path routing for simple course and policy questions")
     
     def classify_intent(self, query: str, conversation_history: List[Dict] = None, 
                        student_profile: Dict = None) -> Dict[str, Any]:
@@ -98,7 +94,11 @@ class Coordinator:
         The LLM analyzes the query, understands the student's goal, evaluates
         agent capabilities, and plans the optimal workflow dynamically.
         
-        Enhanced with clarification detection.
+        Enhanced with clarification detection. With speculative planning the
+        clarification LLM check and the planning call run at the same time;
+        the plan is dropped if the query needs clarification. Simple course
+        and policy questions are routed by rules (fast_router.py), or by a
+        confident kNN intent prediction (knn_intent_classifier.py), instead.
         
         Args:
             query: User's query
@@ -109,83 +109,254 @@ class Coordinator:
             Intent dictionary with agents, confidence, reasoning, workflow plan, etc.
         """
         try:
-            # Step 0: Check if clarification is needed
-            clarification_check = self.clarification_handler.check_for_clarification(
+            fast_plan = self._fast_path(query) or self._knn_path(query)
+            if fast_plan is not None:
+                return self._plan_to_intent(fast_plan, mode="fast_path")
+            
+            # Step 0: Check if clarification is needed (rule-based part first)
+            clarification_check = self.clarification_handler.precheck(query, student_profile or {})
+            if clarification_check is None and self.speculative_planning:
+                return self._speculative_intent(query, conversation_history, student_profile)
+            if clarification_check is None:
+                clarification_check = self.clarification_handler.check_with_llm(
+                    query,
+                    conversation_history or [],
+                    student_profile or {}
+                )
+            
+            student_profile = self._apply_extracted_major(clarification_check, student_profile)
+            if clarification_check.get('needs_clarification', False):
+                return self._clarification_intent(clarification_check)
+            
+            # Normal workflow planning
+            plan = self.llm_coordinator.understand_and_plan(
                 query,
                 conversation_history or [],
                 student_profile or {}
             )
             
-            # Check if major was extracted or inferred
-            if clarification_check.get('extracted_major'):
-                # Update student profile with extracted major from query
-                student_profile = student_profile or {}
-                student_profile['major'] = clarification_check['extracted_major']
-                print(f"   💡 Extracted major from query: {clarification_check['extracted_major']}")
-            elif clarification_check.get('inferred_major'):
-                # Update student profile with inferred major
-                student_profile = student_profile or {}
-                student_profile['major'] = clarification_check['inferred_major']
-                print(f"   💡 Inferred major from course context: {clarification_check['inferred_major']}")
+            return self._plan_to_intent(plan)
+            
+        except Exception as e:
+            return self._fallback_intent(e)
+    
+    async def aclassify_intent(self, query: str, conversation_history: List[Dict] = None,
+                               student_profile: Dict = None) -> Dict[str, Any]:
+        """Async version of classify_intent()."""
+        try:
+            fast_plan = self._fast_path(query) or await self._aknn_path(query)
+            if fast_plan is not None:
+                return self._plan_to_intent(fast_plan, mode="fast_path")
+            
+            clarification_check = self.clarification_handler.precheck(query, student_profile or {})
+            if clarification_check is None and self.speculative_planning:
+                return await self._aspeculative_intent(query, conversation_history, student_profile)
+            if clarification_check is None:
+                clarification_check = await self.clarification_handler.acheck_with_llm(
+                    query,
+                    conversation_history or [],
+                    student_profile or {}
+                )
             
+            student_profile = self._apply_extracted_major(clarification_check, student_profile)
             if clarification_check.get('needs_clarification', False):
-                # Return special intent that requests clarification
-                return {
-                    "intent_type": "needs_clarification",
-                    "required_agents": [],
-                    "confidence": clarification_check.get('confidence', 0.3),
-                    "reasoning": clarification_check.get('reasoning', ''),
-                    "priority": "high",
-                    "understanding": {
-                        "requires_clarification": True,
-                        "clarification_questions": clarification_check.get('questions', []),
-                        "clarification_reasoning": clarification_check.get('reasoning', ''),
-                        "missing_information": clarification_check.get('missing_info', []),
-                    },
-                    "mode": "llm_driven"
-                }
+                return self._clarification_intent(clarification_check)
             
-            # Normal workflow planning
-            plan = self.llm_coordinator.understand_and_plan(
+            plan = await self.llm_coordinator.aunderstand_and_plan(
                 query,
                 conversation_history or [],
                 student_profile or {}
             )
             
-            # Convert WorkflowPlan to intent dictionary format for compatibility
-            result = {
-                "intent_type": "llm_planned",
-                "required_agents": plan.agents,
-                "confidence": plan.full_analysis.get('confidence', 0.9) if hasattr(plan, 'full_analysis') else 0.9,
-                "reasoning": plan.reasoning,
-                "priority": "high",
-                # LLM-driven specific fields
-                "goal": plan.goal,
-                "execution_order": plan.execution_order,
-                "parallel_stages": plan.parallel_stages,
-                "decision_points": plan.decision_points,
-                "expected_challenges": plan.expected_challenges,
-                "success_criteria": plan.success_criteria,
-                "understanding": plan.full_analysis.get('understanding', {}) if hasattr(plan, 'full_analysis') else {},
-                "agent_analysis": plan.full_analysis.get('agent_analysis', {}) if hasattr(plan, 'full_analysis') else {},
-                "mode": "llm_driven"
-            }
+            return self._plan_to_intent(plan)
+            
+        except Exception as e:
+            return self._fallback_intent(e)
+    
+    def _speculative_intent(self, query: str, conversation_history: Optional[List[Dict]],
+                            student_profile: Optional[Dict]) -> Dict[str, Any]:
+        """
+        Run the clarification LLM check and workflow planning concurrently.
+        
+        The plan is built from the same profile the check sees. It is thrown
+        away when clarification is needed, and redone in the rare case the
+        check adds a major to the profile.
+        """
+        start = time.perf_counter()
+        major = (student_profile or {}).get('major')
+        pool = ThreadPoolExecutor(max_workers=1)
+        try:
+            plan_future = pool.submit(
+                self.llm_coordinator.understand_and_plan,
+                query,
+                conversation_history or [],
+                dict(student_profile or {})
+            )
+            clarification_check = self.clarification_handler.check_with_llm(
+                query,
+                conversation_history or [],
+                student_profile or {}
+            )
             
-            return result
+            student_profile = self._apply_extracted_major(clarification_check, student_profile)
+            if clarification_check.get('needs_clarification', False):
+                print("   🗑️  Clarification needed; discarding speculative plan")
+                return self._clarification_intent(clarification_check)
+            
+            if (student_profile or {}).get('major') != major:
+                plan = self.llm_coordinator.understand_and_plan(
+                    query,
+                    conversation_history or [],
+                    student_profile or {}
+                )
+            else:
+                plan = plan_future.result()
+            print(f"⏱️  Coordinator planned in {(time.perf_counter() - start) * 1000:.0f} ms (speculative)")
+            return self._plan_to_intent(plan)
+        finally:
+            # Never block on a plan that is no longer needed
+            pool.shutdown(wait=False)
+    
+    async def _aspeculative_intent(self, query: str, conversation_history: Optional[List[Dict]],
+                                   student_profile: Optional[Dict]) -> Dict[str, Any]:
+        """Async version of _speculative_intent(); an unneeded plan is cancelled."""
+        start = time.perf_counter()
+        major = (student_profile or {}).get('major')
+        plan_task = asyncio.ensure_future(self.llm_coordinator.aunderstand_and_plan(
+            query,
+            conversation_history or [],
+            dict(student_profile or {})
+        ))
+        try:
+            clarification_check = await self.clarification_handler.acheck_with_llm(
+                query,
+                conversation_history or [],
+                student_profile or {}
+            )
             
+            student_profile = self._apply_extracted_major(clarification_check, student_profile)
+            if clarification_check.get('needs_clarification', False):
+                print("   🗑️  Clarification needed; cancelling speculative plan")
+                return self._clarification_intent(clarification_check)
+            
+            if (student_profile or {}).get('major') != major:
+                plan = await self.llm_coordinator.aunderstand_and_plan(
+                    query,
+                    conversation_history or [],
+                    student_profile or {}
+                )
+            else:
+                plan = await plan_task
+            print(f"⏱️  Coordinator planned in {(time.perf_counter() - start) * 1000:.0f} ms (speculative)")
+            return self._plan_to_intent(plan)
+        finally:
+            # Stop an unneeded plan; a failed one counts as handled
+            if not plan_task.cancel() and not plan_task.cancelled():
+                plan_task.exception()
+    
+    def _fast_path(self, query: str):
+        """Rule-based WorkflowPlan for a simple query, or None to use the LLM."""
+        if self.fast_router is None:
+            return None
+        return self.fast_router.route(query)
+    
+    def _knn_path(self, query: str):
+        """WorkflowPlan from a confident kNN intent prediction, or None to use the LLM."""
+        classifier = self._knn_classifier(query)
+        if classifier is None:
+            return None
+        try:
+            prediction = classifier.predict(query)
         except Exception as e:
-            print(f"⚠️  LLM-driven coordinator error: {e}")
-            import traceback
-            traceback.print_exc()
-            # Return a minimal fallback
-            return {
-                "intent_type": "general",
-                "required_agents": ["programs_requirements"],
-                "confidence": 0.5,
-                "reasoning": f"Error in LLM coordination: {str(e)}",
-                "priority": "medium",
-                "mode": "fallback"
-            }
+            print(f"⚠️  kNN intent prediction failed: {e}")
+            return None
+        return self.fast_router.route_prediction(query, prediction)
+    
+    async def _aknn_path(self, query: str):
+        """Async version of _knn_path()."""
+        classifier = self._knn_classifier(query)
+        if classifier is None:
+            return None
+        try:
+            prediction = await classifier.apredict(query)
+        except Exception as e:
+            print(f"⚠️  kNN intent prediction failed: {e}")
+            return None
+        return self.fast_router.route_prediction(query, prediction)
+    
+    def _knn_classifier(self, query: str):
+        """The kNN classifier when the query is a fast-path candidate, else None."""
+        if self.fast_router is None or not is_simple_query(query):
+            return None
+        return get_knn_intent_classifier_or_none()
+    
+    def _apply_extracted_major(self, clarification_check: Dict[str, Any],
+                               student_profile: Optional[Dict]) -> Optional[Dict]:
+        """Update the student profile with a major extracted or inferred from the query."""
+        # Check if major was extracted or inferred
+        if clarification_check.get('extracted_major'):
+            # Update student profile with extracted major from query
+            student_profile = student_profile or {}
+            student_profile['major'] = clarification_check['extracted_major']
+            print(f"   💡 Extracted major from query: {clarification_check['extracted_major']}")
+        elif clarification_check.get('inferred_major'):
+            # Update student profile with inferred major
+            student_profile = student_profile or {}
+            student_profile['major'] = clarification_check['inferred_major']
+            print(f"   💡 Inferred major from course context: {clarification_check['inferred_major']}")
+        return student_profile
+    
+    def _clarification_intent(self, clarification_check: Dict[str, Any]) -> Dict[str, Any]:
+        """Special intent that requests clarification from the user."""
+        return {
+            "intent_type": "needs_clarification",
+            "required_agents": [],
+            "confidence": clarification_check.get('confidence', 0.3),
+            "reasoning": clarification_check.get('reasoning', ''),
+            "priority": "high",
+            "understanding": {
+                "requires_clarification": True,
+                "clarification_questions": clarification_check.get('questions', []),
+                "clarification_reasoning": clarification_check.get('reasoning', ''),
+                "missing_information": clarification_check.get('missing_info', []),
+            },
+            "mode": "llm_driven"
+        }
+    
+    def _plan_to_intent(self, plan, mode: str = "llm_driven") -> Dict[str, Any]:
+        """Convert WorkflowPlan to intent dictionary format for compatibility."""
+        full_analysis = getattr(plan, 'full_analysis', {})
+        return {
+            "intent_type": full_analysis.get('intent_type', "llm_planned"),
+            "required_agents": plan.agents,
+            "confidence": plan.full_analysis.get('confidence', 0.9) if hasattr(plan, 'full_analysis') else 0.9,
+            "reasoning": plan.reasoning,
+            "priority": "high",
+            # LLM-driven specific fields
+            "goal": plan.goal,
+            "execution_order": plan.execution_order,
+            "parallel_stages": plan.parallel_stages,
+            "decision_points": plan.decision_points,
+            "expected_challenges": plan.expected_challenges,
+            "success_criteria": plan.success_criteria,
+            "understanding": plan.full_analysis.get('understanding', {}) if hasattr(plan, 'full_analysis') else {},
+            "agent_analysis": plan.full_analysis.get('agent_analysis', {}) if hasattr(plan, 'full_analysis') else {},
+            "mode": mode
+        }
+    
+    def _fallback_intent(self, error: Exception) -> Dict[str, Any]:
+        """Minimal intent used when LLM coordination fails."""
+        print(f"⚠️  LLM-driven coordinator error: {error}")
+        import traceback
+        traceback.print_exc()
+        return {
+            "intent_type": "general",
+            "required_agents": ["programs_requirements"],
+            "confidence": 0.5,
+            "reasoning": f"Error in LLM coordination: {str(error)}",
+            "priority": "medium",
+            "mode": "fallback"
+        }
     
     def plan_workflow(self, intent: Dict[str, Any]) -> List[str]:
         """
@@ -215,7 +386,51 @@ class Coordinator:
             return [a for a in required_agents if a in ["programs_requirements", "policy_compliance"]]
         else:
             return required_agents
-    
+
+    def plan_stages(self, intent: Dict[str, Any], workflow: List[str],
+                    parallel: bool = True) -> List[List[str]]:
+        """
+        Group the planned workflow into execution stages.
+
+        Agents in the same stage are independent and may run concurrently;
+        stages run in order. The validated ``workflow`` order decides the
+        order: consecutive workflow agents share a stage only if the LLM's
+        ``parallel_stages`` put them together and none of them reads another's
+        output (AGENT_DEPENDENCIES). Every other agent gets its own stage.
+
+        Args:
+            intent: Intent dictionary from classify_intent()
+            workflow: Ordered agent list from plan_workflow()
+            parallel: If False, every agent gets its own stage (sequential mode)
+
+        Returns:
+            List of stages, each a list of agent names
+        """
+        if not parallel:
+            return [[agent] for agent in workflow]
+
+        # Agent -> index of the LLM stage it was planned in
+        llm_stage = {}
+        for i, stage in enumerate(intent.get("parallel_stages") or []):
+            if isinstance(stage, list):
+                for agent in stage:
+                    llm_stage.setdefault(agent, i)
+
+        stages = []
+        for agent in workflow:
+            current = stages[-1] if stages else []
+            joins = (
+                agent in llm_stage
+                and all(llm_stage.get(other) == llm_stage[agent] for other in current)
+                and not any(producer in current for producer in AGENT_DEPENDENCIES.get(agent, ()))
+            )
+            if current and joins:
+                current.append(agent)
+            elif agent not in current:
+                stages.append([agent])
+
+        return stages
+
     def detect_conflicts(self, state: BlackboardState) -> List[Conflict]:
         """
         Detect conflicts between agent outputs.
@@ -257,8 +472,49 @@ class Coordinator:
         
         return conflicts
     
-    def synthesize_answer(self, state: BlackboardState) -> str:
-        """Synthesize final answer from all agent outputs."""
+    def synthesize_answer(self, state: BlackboardState,
+                          on_token: Optional[Callable[[str], None]] = None) -> str:
+        """
+        Synthesize final answer from all agent outputs.
+
+        Args:
+            state: Current Blackboard state
+            on_token: Optional callback invoked with each token as the LLM
+                produces it (used by the streaming API). The full answer is
+                still returned.
+        """
+        prompt = self._build_synthesis_prompt(state)
+        
+        if on_token is None:
+            response = self.llm.invoke([SystemMessage(content=prompt)])
+            return response.content
+
+        # Stream tokens to the caller as they arrive
+        parts = []
+        for chunk in self.llm.stream([SystemMessage(content=prompt)]):
+            if chunk.content:
+                parts.append(chunk.content)
+                on_token(chunk.content)
+        return "".join(parts)
+
+    async def asynthesize_answer(self, state: BlackboardState,
+                                 on_token: Optional[Callable[[str], None]] = None) -> str:
+        """Async version of synthesize_answer()."""
+        prompt = self._build_synthesis_prompt(state)
+
+        if on_token is None:
+            response = await self.llm.ainvoke([SystemMessage(content=prompt)])
+            return response.content
+
+        parts = []
+        async for chunk in self.llm.astream([SystemMessage(content=prompt)]):
+            if chunk.content:
+                parts.append(chunk.content)
+                on_token(chunk.content)
+        return "".join(parts)
+
+    def _build_synthesis_prompt(self, state: BlackboardState) -> str:
+        """Build the answer-synthesis prompt from all agent outputs."""
         agent_outputs = state.get("agent_outputs", {})
         user_query = state.get("user_query", "")
         conflicts = state.get("conflicts", [])
@@ -280,7 +536,7 @@ Risks: {len(output.risks)}
             for conflict in conflicts:
                 conflicts_text += f"- {conflict.conflict_type.value}: {conflict.description}\n"
         
-        prompt = f"""You are an academic advisor helping a student. Synthesize information from specialized agents into a clear, well-formatted answer.
+        return f"""You are an academic advisor helping a student. Synthesize information from specialized agents into a clear, well-formatted answer.
 
 User Query: {user_query}
 
@@ -316,9 +572,6 @@ FORMATTING REQUIREMENTS:
 
 Remember: Students want the answer FIRST, details SECOND. Make it easy to scan quickly.
 """
-        
-        response = self.llm.invoke([SystemMessage(content=prompt)])
-        return response.content
     
     def manage_negotiation(self, state: BlackboardState) -> Dict[str, Any]:
         """
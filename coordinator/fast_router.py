@@ -0,0 +1,302 @@
+"""
+Fast-Path Router
+
+Deterministic pre-router that sends queries with an obvious workflow
+straight to their agent, skipping the LLM coordinator (clarification
+check + understand_and_plan).
+
+Rules (first match wins):
+- Course question: one to three course codes (or one course named by its
+  full title) plus course-info wording ("prereqs", "offered", "units"),
+  or a bare course code → course_scheduling
+- Policy question: a university-policy term ("overload", "probation",
+  "pass/fail", ...) with no course or program → policy_compliance
+
+Queries no rule matches can still be routed by a confident kNN intent
+prediction (course-info or policy only, see route_prediction).
+
+Queries that mention a program, depend on the student's major ("required",
+"degree", "graduate"), ask for planning, mix courses with policies, or are
+long are never fast-pathed: they need the LLM's reasoning and possibly a
+clarification question. A match below FAST_ROUTER_MIN_CONFIDENCE also
+falls back to the LLM.
+
+The hit rate and per-rule counts are kept in stats()
+(GET /api/v1/admin/fast-router).
+
+    python coordinator/fast_router.py     # routes sample queries
+"""
+
+from typing import Dict, List, Optional
+from dataclasses import dataclass, field
+import re
+import sys
+import os
+import threading
+
+# Add parent directory to path to import config and the course catalog
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import get_fast_router_min_confidence
+from coordinator.intent_classifier_enhanced import EnhancedIntentClassifier, IntentType
+from coordinator.llm_driven_coordinator import WorkflowPlan
+
+
+def _terms(*terms: str) -> re.Pattern:
+    """Whole-word (or whole-phrase) matcher for a list of terms."""
+    return re.compile(r"\b(?:" + "|".join(terms) + r")\b", re.IGNORECASE)
+
+
+COURSE_INFO_TERMS = _terms(
+    r"pre-?reqs?", r"pre-?requisites?", r"co-?reqs?", r"co-?requisites?", r"anti-?requisites?",
+    r"offered", r"offering", r"units?", r"credits?", r"descriptions?", r"about", r"taught",
+    r"teach(?:es)?", r"instructors?", r"professor", r"content", r"syllabus", r"assessments?",
+    r"workload", r"covers?", r"topics?", r"what is", r"tell me"
+)
+POLICY_TERMS = _terms(
+    r"overload", r"probation", r"pass/fail", r"pass-fail", r"pass fail", r"academic integrity",
+    r"plagiarism", r"cheating", r"leave of absence", r"transcripts?", r"qpa", r"gpa",
+    r"dean'?s list", r"withdraw(?:al)?", r"drop deadline", r"add/drop", r"drop/add",
+    r"incomplete grade", r"grade appeal", r"tuition", r"refund", r"unit limit", r"maximum units",
+    r"cross-?registration", r"audit a course", r"academic actions?"
+)
+# The answer depends on the student's program: leave it to the LLM (and
+# the clarification check)
+MAJOR_DEPENDENT_TERMS = _terms(
+    r"required", r"requirements?", r"need to take", r"must take", r"have to take", r"retake",
+    r"degree", r"majors?", r"minors?", r"concentrations?", r"graduat\w*", r"count (?:for|towards?)",
+    r"fulfill\w*", r"electives?", r"on track"
+)
+PLANNING_TERMS = _terms(
+    r"plan", r"planning", r"should i take", r"can i take", r"next semester", r"this semester",
+    r"schedule my", r"together", r"conflicts?", r"recommend\w*", r"which courses", r"what courses",
+    r"sequence", r"roadmap"
+)
+# Longer queries usually carry more than one question
+MAX_QUERY_WORDS = 30
+MAX_COURSES = 3
+# kNN predictions that may skip the LLM coordinator (the same scope as the rules)
+KNN_ROUTED_INTENTS = (IntentType.COURSE_INFO, IntentType.POLICY_QUESTION)
+
+
+def is_simple_query(query: str) -> bool:
+    """Short, and neither major-dependent nor a planning request."""
+    if len(query.split()) > MAX_QUERY_WORDS:
+        return False
+    return not (MAJOR_DEPENDENT_TERMS.search(query) or PLANNING_TERMS.search(query))
+
+
+@dataclass
+class RouteDecision:
+    """A rule match: where the query goes and how sure the rule is."""
+    rule: str
+    intent_type: IntentType
+    agents: List[str]
+    confidence: float
+    goal: str
+    signals: List[str] = field(default_factory=list)
+
+
+class FastPathRouter:
+    """
+    Rule-based router producing WorkflowPlans without an LLM call.
+
+    Entities come from EnhancedIntentClassifier.extract_entities (query
+    only: codes from earlier turns do not make a follow-up a course question).
+    """
+
+    def __init__(self, min_confidence: Optional[float] = None):
+        self.min_confidence = get_fast_router_min_confidence() if min_confidence is None else min_confidence
+        # Entity extraction is pure pattern matching; no LLM needed
+        self.entity_extractor = EnhancedIntentClassifier(llm=None)
+        self._lock = threading.Lock()
+        self.queries = 0
+        self.routed = 0
+        self.below_threshold = 0
+        self.by_rule: Dict[str, int] = {}
+
+    def route(self, query: str) -> Optional[WorkflowPlan]:
+        """A WorkflowPlan for the query, or None if it should go to the LLM coordinator."""
+        decision = self.match(query)
+        routed = decision is not None and decision.confidence >= self.min_confidence
+        with self._lock:
+            self.queries += 1
+            if routed:
+                self.routed += 1
+                self.by_rule[decision.rule] = self.by_rule.get(decision.rule, 0) + 1
+            elif decision is not None:
+                self.below_threshold += 1
+        if not routed:
+            return None
+        print(f"   ⚡ Fast path ({decision.rule}, confidence {decision.confidence:.2f}) → {', '.join(decision.agents)}")
+        return self._plan(decision)
+
+    def route_prediction(self, query: str, prediction) -> Optional[WorkflowPlan]:
+        """
+        A WorkflowPlan from a confident kNN intent prediction (see
+        knn_intent_classifier.py) for a query the rules missed, or None.
+
+        Only course-info and policy predictions are routed, under the same
+        guards as the rules; everything else goes to the LLM coordinator.
+        """
+        routed = (prediction.intent_type in KNN_ROUTED_INTENTS
+                  and is_simple_query(query)
+                  and prediction.confidence >= self.min_confidence
+                  and bool(prediction.required_agents))
+        if not routed:
+            return None
+        decision = RouteDecision(
+            rule="knn_intent",
+            intent_type=prediction.intent_type,
+            agents=list(prediction.required_agents),
+            confidence=prediction.confidence,
+            goal=f"Answer a {prediction.intent_type.value.replace('_', ' ')}: {query.strip()}",
+            signals=[f"nearest example: '{text}' ({intent}, {similarity:.2f})"
+                     for text, intent, similarity in prediction.neighbours[:3]]
+        )
+        with self._lock:
+            self.routed += 1
+            self.by_rule[decision.rule] = self.by_rule.get(decision.rule, 0) + 1
+        print(f"   ⚡ Fast path (kNN {prediction.intent_type.value}, confidence {decision.confidence:.2f}) "
+              f"→ {', '.join(decision.agents)}")
+        return self._plan(decision)
+
+    def match(self, query: str) -> Optional[RouteDecision]:
+        """The matching rule's decision (regardless of the threshold), or None."""
+        if not is_simple_query(query):
+            return None
+
+        entities = self.entity_extractor.extract_entities(query, [])
+        if entities.programs:
+            return None
+
+        return self._match_course(query, entities.courses) or self._match_policy(query, entities.courses)
+
+    def _match_course(self, query: str, codes: List[str]) -> Optional[RouteDecision]:
+        info = COURSE_INFO_TERMS.search(query)
+        matched_on = "course code"
+        if not codes and info:
+            # Courses named by title ("prereqs for Principles of Imperative Computation")
+            from course_search import find_course_titles_in_text
+            codes = find_course_titles_in_text(query)
+            matched_on = "course title"
+        if not codes or len(codes) > MAX_COURSES or POLICY_TERMS.search(query):
+            return None
+
+        # A bare code ("15-213?") asks about the course itself
+        bare = not info and re.fullmatch(r"\W*\d{2}-\d{3}\W*", query) is not None
+        if not info and not bare:
+            return None
+
+        from course_tools import DB
+        unknown = [code for code in codes if code not in DB["courses"]]
+
+        confidence = 0.95
+        if matched_on == "course title" or len(codes) > 1:
+            confidence -= 0.05
+        if bare:
+            confidence -= 0.05
+        if unknown:
+            confidence -= 0.15
+
+        signals = [f"{matched_on}: {', '.join(codes)}"]
+        signals.append(f"course-info wording: '{info.group()}'" if info else "bare course code")
+        if unknown:
+            signals.append(f"not in catalog: {', '.join(unknown)}")
+        return RouteDecision(
+            rule="course_info",
+            intent_type=IntentType.COURSE_INFO,
+            agents=["course_scheduling"],
+            confidence=round(confidence, 2),
+            goal=f"Answer a question about {', '.join(codes)}",
+            signals=signals
+        )
+
+    def _match_policy(self, query: str, codes: List[str]) -> Optional[RouteDecision]:
+        term = POLICY_TERMS.search(query)
+        if not term or codes:
+            return None
+        return RouteDecision(
+            rule="policy_question",
+            intent_type=IntentType.POLICY_QUESTION,
+            agents=["policy_compliance"],
+            confidence=0.9,
+            goal=f"Explain the university policy on {term.group().lower()}",
+            signals=[f"policy term: '{term.group()}'"]
+        )
+
+    def _plan(self, decision: RouteDecision) -> WorkflowPlan:
+        """WorkflowPlan in the same shape the LLM coordinator produces."""
+        plan = WorkflowPlan(
+            goal=decision.goal,
+            reasoning=f"Fast path ({decision.rule}): {'; '.join(decision.signals)}",
+            agents=list(decision.agents),
+            execution_order=list(decision.agents),
+            parallel_stages=[list(decision.agents)],
+            decision_points=[],
+            expected_challenges=[],
+            success_criteria="Answer the question from the agent's knowledge base"
+        )
+        plan.full_analysis = {
+            "understanding": {
+                "student_goal": decision.goal,
+                "information_needed": decision.signals
+            },
+            "agent_analysis": {},
+            "confidence": decision.confidence,
+            "needs_clarification": False,
+            "intent_type": decision.intent_type.value,
+            "router": {"rule": decision.rule, "signals": decision.signals}
+        }
+        return plan
+
+    def stats(self) -> Dict[str, float]:
+        """How many queries were routed without the LLM, overall and per rule."""
+        with self._lock:
+            return {
+                "queries": self.queries,
+                "routed": self.routed,
+                "hit_rate": round(self.routed / self.queries, 4) if self.queries else 0.0,
+                "below_threshold": self.below_threshold,
+                "min_confidence": self.min_confidence,
+                "by_rule": dict(self.by_rule)
+            }
+
+
+_router: Optional[FastPathRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_fast_router() -> FastPathRouter:
+    """The shared router (created on first use)."""
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = FastPathRouter()
+    return _router
+
+
+if __name__ == "__main__":
+    import time
+
+    samples = [
+        "What are the prereqs for 15-213?",
+        "15-112",
+        "When is 67-364 offered?",
+        "How many units is Principles of Imperative Computation?",
+        "What is the overload policy?",
+        "What happens if I go on academic probation?",
+        "Can I take 15-213 pass/fail?",
+        "Do I need to take 15-213 for my major?",
+        "Help me plan next semester",
+        "How do I declare a CS minor?",
+        "What should I do after graduation?",
+    ]
+    router = get_fast_router()
+    for sample in samples:
+        start = time.perf_counter()
+        plan = router.route(sample)
+        elapsed = (time.perf_counter() - start) * 1000
+        target = ", ".join(plan.agents) if plan else "LLM coordinator"
+        print(f"{elapsed:6.2f} ms  {sample!r} → {target}")
+    print(router.stats())
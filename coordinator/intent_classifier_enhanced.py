@@ -9,13 +9,19 @@ Key Improvements:
 5. Reasoning traces
 """
 
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
 from langchain_openai import ChatOpenAI
 from langchain_core.messages import SystemMessage, HumanMessage
 import json
 import re
 from dataclasses import dataclass, asdict
 from enum import Enum
+import sys
+import os
+
+# Add parent directory to path to import config
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import is_intent_knn_enabled
 
 
 class IntentType(Enum):
@@ -92,8 +98,18 @@ class EnhancedIntentClassifier:
     - Ambiguity detection
     """
     
-    def __init__(self, llm: ChatOpenAI):
+    def __init__(self, llm: ChatOpenAI, local_classifier=None):
         self.llm = llm
+        # kNN classifier tried before the LLM (see knn_intent_classifier.py);
+        # the shared one is used when none is given and it is enabled in config.py
+        self._local_classifier = local_classifier
+    
+    def _get_local_classifier(self):
+        """The kNN classifier, or None (disabled, or its example bank failed to build)."""
+        if self._local_classifier is None and is_intent_knn_enabled():
+            from coordinator.knn_intent_classifier import get_knn_intent_classifier_or_none
+            return get_knn_intent_classifier_or_none()
+        return self._local_classifier
     
     def classify(self, 
                 query: str, 
@@ -109,7 +125,7 @@ class EnhancedIntentClassifier:
         trace = ReasoningTrace()
         
         # Step 1: Entity Extraction
-        entities = self._extract_entities(query, conversation_history or [])
+        entities = self.extract_entities(query, conversation_history or [])
         trace.add_step(
             "Entity Extraction",
             {"query": query},
@@ -126,8 +142,14 @@ class EnhancedIntentClassifier:
             "Analyzed conversation history and student context"
         )
         
-        # Step 3: Intent Classification
-        intent_result = self._classify_with_llm(query, entities, context_signals)
+        # Step 3: Intent Classification (example bank first, LLM if unsure)
+        local_classifier = self._get_local_classifier()
+        intent_result = self._classify_locally(local_classifier, query)
+        if intent_result is None:
+            intent_result = self._classify_with_llm(query, entities, context_signals)
+            if local_classifier is not None:
+                from coordinator.knn_intent_classifier import log_labelled_query
+                log_labelled_query(query, intent_result)
         trace.add_step(
             "Intent Classification",
             {"query": query, "entities": asdict(entities), "context": context_signals},
@@ -172,7 +194,7 @@ class EnhancedIntentClassifier:
         
         return intent, trace
     
-    def _extract_entities(self, query: str, conversation_history: List[Dict]) -> ExtractedEntities:
+    def extract_entities(self, query: str, conversation_history: List[Dict]) -> ExtractedEntities:
         """
         Extract entities from query and conversation history.
         """
@@ -263,6 +285,16 @@ class EnhancedIntentClassifier:
         
         return signals
     
+    def _classify_locally(self, local_classifier, query: str) -> Optional[Dict[str, Any]]:
+        """kNN classification, or None when disabled or not confident enough."""
+        if local_classifier is None:
+            return None
+        try:
+            return local_classifier.classify(query)
+        except Exception as e:
+            print(f"Warning: Local intent classification failed: {e}")
+            return None
+    
     def _classify_with_llm(self, query: str, entities: ExtractedEntities, 
                           context_signals: Dict) -> Dict[str, Any]:
         """
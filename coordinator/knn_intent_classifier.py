@@ -0,0 +1,369 @@
+"""
+Embedding kNN Intent Classifier
+
+Local replacement for EnhancedIntentClassifier's LLM classification step.
+The query is embedded and compared (cosine) with a labelled example bank
+held as a NumPy matrix; the k nearest examples vote, weighted by
+similarity, for an IntentType.
+
+The vote share is turned into a calibrated confidence with leave-one-out
+over the bank itself: every example is classified against the others, and
+the observed accuracy per vote-share bin (smoothed, made monotone) is the
+confidence reported for that vote share. Below INTENT_KNN_MIN_CONFIDENCE
+the classifier abstains and the caller asks the LLM.
+
+Example bank: coordinator/intent_examples.json (INTENT_EXAMPLES_PATH).
+Bank vectors come from the persistent embedding cache, so only new
+examples are ever embedded. Queries the LLM classifies are appended to
+INTENT_LOG_PATH; after review they can be merged into the bank:
+
+    python coordinator/knn_intent_classifier.py extend logs/intent_labels.jsonl
+    python coordinator/knn_intent_classifier.py benchmark [labelled.jsonl]
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+from dataclasses import dataclass, asdict, field
+from datetime import datetime
+import json
+import sys
+import os
+import threading
+
+import numpy as np
+
+# Add parent directory to path to import config and the RAG engine
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import (
+    is_intent_knn_enabled, get_intent_examples_path, get_intent_log_path,
+    get_intent_knn_k, get_intent_knn_min_confidence
+)
+from coordinator.intent_classifier_enhanced import IntentType
+
+# Softmax temperature over neighbour similarities: smaller trusts the
+# nearest neighbours more
+VOTE_TEMPERATURE = 0.05
+CALIBRATION_BINS = 5
+
+
+@dataclass
+class IntentExample:
+    """One labelled query in the example bank."""
+    text: str
+    intent_type: str
+    required_agents: List[str]
+    source: str = "seed"
+
+
+@dataclass
+class IntentPrediction:
+    """kNN classification of one query."""
+    intent_type: IntentType
+    required_agents: List[str]
+    confidence: float  # calibrated (estimated accuracy)
+    vote_share: float  # raw similarity-weighted vote of the winning intent
+    neighbours: List[Tuple[str, str, float]] = field(default_factory=list)  # (text, intent, similarity)
+
+    def to_result(self) -> Dict:
+        """Same shape as EnhancedIntentClassifier._classify_with_llm's result."""
+        return {
+            "intent_type": self.intent_type.value,
+            "sub_intents": [],
+            "required_agents": list(self.required_agents),
+            "confidence": self.confidence,
+            "reasoning": (f"Nearest labelled examples vote {self.vote_share:.0%} for {self.intent_type.value} "
+                          f"(closest: \"{self.neighbours[0][0]}\")") if self.neighbours else "",
+            "key_signals": [f"{text} ({intent}, {sim:.2f})" for text, intent, sim in self.neighbours[:3]],
+            "classifier": "knn"
+        }
+
+
+def load_examples(path: str) -> List[IntentExample]:
+    with open(path, 'r', encoding='utf-8') as f:
+        return [IntentExample(**example) for example in json.load(f)["examples"]]
+
+
+def save_examples(examples: Sequence[IntentExample], path: str):
+    """Write the example bank (atomic)."""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump({"examples": [asdict(example) for example in examples]}, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+class KNNIntentClassifier:
+    """Cosine kNN over a labelled example bank with a leave-one-out calibrated confidence."""
+
+    def __init__(self, examples: Sequence[IntentExample], embeddings=None, query_embeddings=None,
+                 k: Optional[int] = None, min_confidence: Optional[float] = None):
+        if embeddings is None or query_embeddings is None:
+            from rag_engine_improved import QUERY_EMBEDDINGS, get_index_embeddings
+            embeddings = embeddings or get_index_embeddings()
+            query_embeddings = query_embeddings or QUERY_EMBEDDINGS
+        self.embeddings = embeddings
+        self.query_embeddings = query_embeddings
+        self.k = k or get_intent_knn_k()
+        self.min_confidence = get_intent_knn_min_confidence() if min_confidence is None else min_confidence
+        self._build(list(examples))
+
+    def _build(self, examples: List[IntentExample]):
+        self.examples = examples
+        self.intents: List[str] = sorted({example.intent_type for example in examples})
+        self._labels = np.array([self.intents.index(example.intent_type) for example in examples])
+        vectors = self.embeddings.embed_documents([example.text for example in examples])
+        self._matrix = _normalize_rows(np.asarray(vectors, dtype=np.float32))
+        self._calibrate()
+
+    def __len__(self) -> int:
+        return len(self.examples)
+
+    # ------------------------------------------------------------------
+    # Voting and calibration
+    # ------------------------------------------------------------------
+
+    def _vote(self, similarities: np.ndarray) -> Tuple[int, float, np.ndarray]:
+        """(winning label, its vote share, neighbour rows by similarity)."""
+        k = min(self.k, len(similarities))
+        top = np.argpartition(-similarities, k - 1)[:k]
+        top = top[np.argsort(-similarities[top])]
+        weights = np.exp((similarities[top] - similarities[top[0]]) / VOTE_TEMPERATURE)
+        votes = np.bincount(self._labels[top], weights=weights, minlength=len(self.intents))
+        label = int(np.argmax(votes))
+        return label, float(votes[label] / votes.sum()), top
+
+    def _calibrate(self):
+        """Vote share -> accuracy, measured by leave-one-out over the bank."""
+        similarities = self._matrix @ self._matrix.T
+        np.fill_diagonal(similarities, -np.inf)
+        shares, correct = [], []
+        for i, row in enumerate(similarities):
+            label, share, _ = self._vote(row)
+            shares.append(share)
+            correct.append(label == self._labels[i])
+        order = np.argsort(shares)
+        shares = np.asarray(shares)[order]
+        correct = np.asarray(correct, dtype=np.float64)[order]
+
+        # Equal-count bins; bins with the same mean share (typically 1.0) are merged
+        bins = []  # [share sum, correct, count]
+        for chunk in np.array_split(np.arange(len(shares)), min(CALIBRATION_BINS, len(shares))):
+            if not len(chunk):
+                continue
+            if bins and np.isclose(bins[-1][0] / bins[-1][2], shares[chunk].mean()):
+                bins[-1][0] += shares[chunk].sum()
+                bins[-1][1] += correct[chunk].sum()
+                bins[-1][2] += len(chunk)
+            else:
+                bins.append([shares[chunk].sum(), correct[chunk].sum(), len(chunk)])
+        xs = [share_sum / count for share_sum, _, count in bins]
+        # Laplace smoothing keeps small bins away from 0 and 1
+        ys = [(hits + 1) / (count + 2) for _, hits, count in bins]
+        self._calibration_x = np.asarray(xs)
+        # A higher vote share never means lower confidence
+        self._calibration_y = np.maximum.accumulate(np.asarray(ys))
+        self.loo_accuracy = float(correct.mean()) if len(correct) else 0.0
+
+    def _confidence(self, share: float) -> float:
+        return round(float(np.interp(share, self._calibration_x, self._calibration_y)), 3)
+
+    # ------------------------------------------------------------------
+    # Classification
+    # ------------------------------------------------------------------
+
+    def _predict_vector(self, vector: Sequence[float], exclude: Optional[int] = None) -> IntentPrediction:
+        query = np.asarray(vector, dtype=np.float32)
+        query = query / max(float(np.linalg.norm(query)), 1e-12)
+        similarities = self._matrix @ query
+        if exclude is not None:
+            # Leave-one-out: the example must not vote for itself
+            similarities[exclude] = -np.inf
+        label, share, top = self._vote(similarities)
+        intent = self.intents[label]
+        # Agents of the closest example with the winning intent
+        agents = next(self.examples[i].required_agents for i in top if self._labels[i] == label)
+        return IntentPrediction(
+            intent_type=IntentType(intent),
+            required_agents=list(agents),
+            confidence=self._confidence(share),
+            vote_share=round(share, 3),
+            neighbours=[(self.examples[i].text, self.examples[i].intent_type, round(float(similarities[i]), 3))
+                        for i in top]
+        )
+
+    def predict(self, query: str) -> IntentPrediction:
+        return self._predict_vector(self.query_embeddings.embed_query(query))
+
+    async def apredict(self, query: str) -> IntentPrediction:
+        return self._predict_vector(await self.query_embeddings.aembed_query(query))
+
+    def is_confident(self, prediction: IntentPrediction) -> bool:
+        if prediction.confidence < self.min_confidence:
+            print(f"   ↗️  kNN intent {prediction.intent_type.value} ({prediction.confidence:.2f}) "
+                  f"below {self.min_confidence:.2f}; asking the LLM")
+            return False
+        return True
+
+    def classify(self, query: str) -> Optional[Dict]:
+        """Classification result, or None when not confident enough (ask the LLM)."""
+        prediction = self.predict(query)
+        return prediction.to_result() if self.is_confident(prediction) else None
+
+    async def aclassify(self, query: str) -> Optional[Dict]:
+        """Async version of classify()."""
+        prediction = await self.apredict(query)
+        return prediction.to_result() if self.is_confident(prediction) else None
+
+    # ------------------------------------------------------------------
+    # Growing the bank
+    # ------------------------------------------------------------------
+
+    def add_examples(self, examples: Sequence[IntentExample]) -> int:
+        """Add examples whose text is not in the bank yet; returns how many were added."""
+        known = {" ".join(example.text.lower().split()) for example in self.examples}
+        new = []
+        for example in examples:
+            key = " ".join(example.text.lower().split())
+            if key not in known and example.intent_type in IntentType._value2member_map_:
+                known.add(key)
+                new.append(example)
+        if new:
+            self._build(self.examples + new)
+        return len(new)
+
+
+_log_lock = threading.Lock()
+
+
+def log_labelled_query(query: str, result: Dict, path: Optional[str] = None):
+    """Append an LLM-labelled query to the log that feeds the example bank."""
+    path = path or get_intent_log_path()
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    entry = {
+        "text": query,
+        "intent_type": result.get("intent_type"),
+        "required_agents": result.get("required_agents", []),
+        "confidence": result.get("confidence"),
+        "logged_at": datetime.utcnow().isoformat()
+    }
+    with _log_lock, open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+def read_labelled_log(path: str, min_confidence: float = 0.8) -> List[IntentExample]:
+    """Logged queries labelled with at least min_confidence, as bank examples."""
+    examples = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if float(entry.get("confidence") or 0) >= min_confidence and entry.get("text"):
+                examples.append(IntentExample(
+                    text=entry["text"],
+                    intent_type=entry["intent_type"],
+                    required_agents=entry.get("required_agents", []),
+                    source="log"
+                ))
+    return examples
+
+
+_classifier: Optional[KNNIntentClassifier] = None
+_classifier_lock = threading.Lock()
+# Set when the bank could not be built (e.g. embedding calls failed); the
+# build is not retried on every query
+_build_error: Optional[Exception] = None
+
+
+def get_knn_intent_classifier() -> KNNIntentClassifier:
+    """The shared classifier over the configured example bank (built on first use)."""
+    global _classifier
+    if _classifier is None:
+        with _classifier_lock:
+            if _classifier is None:
+                _classifier = KNNIntentClassifier(load_examples(get_intent_examples_path()))
+    return _classifier
+
+
+def get_knn_intent_classifier_or_none() -> Optional[KNNIntentClassifier]:
+    """
+    The shared classifier, or None when disabled in config.py or when
+    building it failed (remembered: callers just use the LLM from then on).
+    """
+    global _build_error
+    if not is_intent_knn_enabled() or _build_error is not None:
+        return None
+    try:
+        return get_knn_intent_classifier()
+    except Exception as e:
+        _build_error = e
+        print(f"⚠️  kNN intent classifier unavailable, using the LLM only: {e}")
+        return None
+
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+
+def benchmark(classifier: KNNIntentClassifier, labelled: Optional[Sequence[IntentExample]] = None) -> Dict:
+    """
+    Accuracy, coverage and latency.
+
+    With labelled queries (e.g. a reviewed log) those are embedded and
+    classified; otherwise every bank example is classified against the rest
+    (leave-one-out, no embedding calls). Coverage is the share of queries
+    the classifier answers without the LLM at its threshold.
+    """
+    import time
+
+    examples = list(labelled) if labelled else classifier.examples
+    predictions, timings = [], []
+    for i, example in enumerate(examples):
+        start = time.perf_counter()
+        if labelled:
+            predictions.append(classifier.predict(example.text))
+        else:
+            predictions.append(classifier._predict_vector(classifier._matrix[i], exclude=i))
+        timings.append((time.perf_counter() - start) * 1000)
+
+    hits = [p.intent_type.value == e.intent_type for p, e in zip(predictions, examples)]
+    local = [p.confidence >= classifier.min_confidence for p in predictions]
+    answered = [hit for hit, is_local in zip(hits, local) if is_local]
+    timings.sort()
+    report = {
+        "queries": len(examples),
+        "mode": "labelled" if labelled else "leave_one_out",
+        "accuracy": round(sum(hits) / len(hits), 4) if hits else 0.0,
+        "coverage": round(sum(local) / len(local), 4) if local else 0.0,
+        "local_accuracy": round(sum(answered) / len(answered), 4) if answered else 0.0,
+        "mean_confidence": round(float(np.mean([p.confidence for p in predictions])), 4) if predictions else 0.0,
+        "p50_ms": round(timings[len(timings) // 2], 3) if timings else 0.0,
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3) if timings else 0.0
+    }
+    print(f"   {report['mode']}: {report['queries']} queries, accuracy {report['accuracy']:.2%}, "
+          f"coverage {report['coverage']:.2%} (accuracy {report['local_accuracy']:.2%} when answered locally), "
+          f"p50 {report['p50_ms']:.2f} ms, p95 {report['p95_ms']:.2f} ms")
+    return report
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else "benchmark"
+    classifier = get_knn_intent_classifier()
+    print(f"Example bank: {len(classifier)} examples, {len(classifier.intents)} intents, "
+          f"k={classifier.k}, threshold {classifier.min_confidence:.2f}")
+
+    if command == "extend":
+        log_path = sys.argv[2] if len(sys.argv) > 2 else get_intent_log_path()
+        added = classifier.add_examples(read_labelled_log(log_path))
+        save_examples(classifier.examples, get_intent_examples_path())
+        print(f"✅ Added {added} example(s) from {log_path}")
+    elif command == "benchmark":
+        labelled = read_labelled_log(sys.argv[2], min_confidence=0.0) if len(sys.argv) > 2 else None
+        benchmark(classifier, labelled)
+    else:
+        classifier.min_confidence = 0.0
+        prediction = classifier.predict(" ".join(sys.argv[1:]))
+        print(json.dumps(prediction.to_result(), indent=2))
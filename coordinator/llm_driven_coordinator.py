@@ -187,7 +187,37 @@ class LLMDrivenCoordinator:
         
         This is where the LLM does the reasoning, not rule matching.
         """
+        prompt = self._build_planning_prompt(user_query, conversation_history, student_profile)
+        response = self.llm.invoke([SystemMessage(content=prompt)])
+        
+        try:
+            return self._parse_plan(response.content)
+        
+        except Exception as e:
+            print(f"Error parsing LLM response: {e}")
+            # Fallback to simple plan
+            return self._create_fallback_plan(user_query)
+    
+    async def aunderstand_and_plan(self,
+                                   user_query: str,
+                                   conversation_history: List[Dict] = None,
+                                   student_profile: Dict = None) -> WorkflowPlan:
+        """Async version of understand_and_plan()."""
+        prompt = self._build_planning_prompt(user_query, conversation_history, student_profile)
+        response = await self.llm.ainvoke([SystemMessage(content=prompt)])
+        
+        try:
+            return self._parse_plan(response.content)
         
+        except Exception as e:
+            print(f"Error parsing LLM response: {e}")
+            return self._create_fallback_plan(user_query)
+    
+    def _build_planning_prompt(self,
+                               user_query: str,
+                               conversation_history: List[Dict] = None,
+                               student_profile: Dict = None) -> str:
+        """Build the understand-and-plan prompt."""
         # Build a rich context for the LLM
         agent_descriptions = self._format_agent_capabilities()
         advisor_role = self._get_advisor_role_description()
@@ -195,7 +225,7 @@ class LLMDrivenCoordinator:
         student_context = self._format_student_profile(student_profile or {})
         
         # The prompt: Let LLM understand and plan
-        prompt = f"""{advisor_role}
+        return f"""{advisor_role}
 
 AVAILABLE AGENTS AND THEIR CAPABILITIES:
 
@@ -274,37 +304,31 @@ IMPORTANT:
 - Plan dynamically based on the specific situation
 - Explain your reasoning clearly
 """
-        
-        response = self.llm.invoke([SystemMessage(content=prompt)])
-        
-        try:
-            # Parse LLM response
-            json_match = re.search(r'\{.*\}', response.content, re.DOTALL)
-            if json_match:
-                result = json.loads(json_match.group())
-                
-                # Convert to WorkflowPlan
-                workflow_data = result.get('workflow_plan', {})
-                plan = WorkflowPlan(
-                    goal=workflow_data.get('goal', ''),
-                    reasoning=workflow_data.get('reasoning', ''),
-                    agents=self._extract_unique_agents(workflow_data),
-                    execution_order=workflow_data.get('execution_order', []),
-                    parallel_stages=workflow_data.get('parallel_stages', []),
-                    decision_points=workflow_data.get('decision_points', []),
-                    expected_challenges=workflow_data.get('expected_challenges', []),
-                    success_criteria=workflow_data.get('success_criteria', '')
-                )
-                
-                # Store full result for debugging
-                plan.full_analysis = result
-                
-                return plan
-        
-        except Exception as e:
-            print(f"Error parsing LLM response: {e}")
-            # Fallback to simple plan
-            return self._create_fallback_plan(user_query)
+    
+    def _parse_plan(self, content: str) -> Optional[WorkflowPlan]:
+        """Parse the LLM's JSON analysis into a WorkflowPlan."""
+        json_match = re.search(r'\{.*\}', content, re.DOTALL)
+        if json_match:
+            result = json.loads(json_match.group())
+            
+            # Convert to WorkflowPlan
+            workflow_data = result.get('workflow_plan', {})
+            plan = WorkflowPlan(
+                goal=workflow_data.get('goal', ''),
+                reasoning=workflow_data.get('reasoning', ''),
+                agents=self._extract_unique_agents(workflow_data),
+                execution_order=workflow_data.get('execution_order', []),
+                parallel_stages=workflow_data.get('parallel_stages', []),
+                decision_points=workflow_data.get('decision_points', []),
+                expected_challenges=workflow_data.get('expected_challenges', []),
+                success_criteria=workflow_data.get('success_criteria', '')
+            )
+            
+            # Store full result for debugging
+            plan.full_analysis = result
+            
+            return plan
+        return None
     
     def adapt_workflow(self, 
                       current_plan: WorkflowPlan,
@@ -446,15 +470,15 @@ COORDINATION PRINCIPLES:
         return json.dumps(profile, indent=2)
     
     def _extract_unique_agents(self, workflow_data: Dict) -> List[str]:
-        """Extract unique agent names from workflow plan."""
-        agents = set()
+        """Extract unique agent names from workflow plan, in execution order."""
+        agents = {}
         
         # From execution order
-        agents.update(workflow_data.get('execution_order', []))
+        agents.update(dict.fromkeys(workflow_data.get('execution_order', [])))
         
         # From parallel stages
         for stage in workflow_data.get('parallel_stages', []):
-            agents.update(stage)
+            agents.update(dict.fromkeys(stage))
         
         return list(agents)
     
@@ -0,0 +1,168 @@
+"""
+Packed Course Catalog
+Compiles the ~2,500 course JSON files under data/courses into one file that
+is memory-mapped and decoded lazily, one course at a time.
+
+File layout (all integers little-endian):
+
+    magic    b"CCATPK1\\n"
+    u32      header length
+    header   JSON: {"source": <signature of data/courses>, "index": {code: [offset, length]}}
+    body     compact JSON document of every course, at the offsets above
+
+Opening the catalog reads only the header; a course is parsed on first
+access (and kept in a small LRU cache). Because the body is an mmap of a
+read-only file, forked API workers share its pages instead of each holding
+a dict of 2,500 parsed courses.
+
+Build (also done automatically by course_tools.load_data when stale):
+
+    python course_catalog.py
+"""
+import json
+import mmap
+import os
+import struct
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional
+
+MAGIC = b"CCATPK1\n"
+DEFAULT_PACK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "course_catalog.pack")
+# Parsed courses kept in memory per process
+DECODE_CACHE_SIZE = 512
+
+
+def source_signature(data_path: str) -> List:
+    """(file count, newest mtime, total size) of the course JSON files."""
+    count, newest, total = 0, 0, 0
+    with os.scandir(data_path) as entries:
+        for entry in entries:
+            if entry.name.endswith(".json") and entry.is_file():
+                stat = entry.stat()
+                count += 1
+                newest = max(newest, stat.st_mtime_ns)
+                total += stat.st_size
+    return [count, newest, total]
+
+
+def read_course_files(data_path: str) -> Dict[str, dict]:
+    """Parse every course JSON file (the slow path the pack replaces)."""
+    courses = {}
+    for filename in sorted(os.listdir(data_path)):
+        if not filename.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(data_path, filename), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except Exception as e:
+            # Continue loading other files even if one fails
+            print(f"⚠️  Error loading {filename}: {e}")
+            continue
+        # Each JSON file is a single course object with a "code" field;
+        # legacy files hold a list of them
+        items = data if isinstance(data, list) else [data]
+        for item in items:
+            if isinstance(item, dict) and "code" in item:
+                courses[item["code"]] = item
+    return courses
+
+
+def build_packed_catalog(data_path: str, pack_path: str = DEFAULT_PACK_PATH) -> int:
+    """Compile data_path/*.json into pack_path; returns the number of courses."""
+    signature = source_signature(data_path)
+    courses = read_course_files(data_path)
+
+    index, blobs, offset = {}, [], 0
+    for code in sorted(courses):
+        blob = json.dumps(courses[code], ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        index[code] = [offset, len(blob)]
+        blobs.append(blob)
+        offset += len(blob)
+
+    header = json.dumps({"source": signature, "index": index}, separators=(",", ":")).encode("utf-8")
+    tmp_path = f"{pack_path}.tmp-{os.getpid()}"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        for blob in blobs:
+            f.write(blob)
+    # Readers that already mapped the old file keep their (unlinked) copy
+    os.replace(tmp_path, pack_path)
+    return len(courses)
+
+
+class PackedCatalog(Mapping):
+    """Read-only {code: course dict} view over a packed catalog file."""
+
+    def __init__(self, pack_path: str = DEFAULT_PACK_PATH):
+        self.path = pack_path
+        with open(pack_path, "rb") as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{pack_path} is not a packed course catalog")
+            (header_len,) = struct.unpack("<I", f.read(4))
+            header = json.loads(f.read(header_len).decode("utf-8"))
+            self._body_start = len(MAGIC) + 4 + header_len
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.source = header["source"]
+        self._index: Dict[str, List[int]] = header["index"]
+        self._decode = lru_cache(maxsize=DECODE_CACHE_SIZE)(self._decode_uncached)
+
+    def _decode_uncached(self, code: str) -> dict:
+        offset, length = self._index[code]
+        start = self._body_start + offset
+        return json.loads(self._mmap[start:start + length].decode("utf-8"))
+
+    def __getitem__(self, code: str) -> dict:
+        if code not in self._index:
+            raise KeyError(code)
+        return self._decode(code)
+
+    def __contains__(self, code) -> bool:
+        return code in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def is_current(self, data_path: str) -> bool:
+        """Whether the pack was built from the current course files."""
+        return self.source == source_signature(data_path)
+
+
+def open_packed_catalog(data_path: str, pack_path: str = DEFAULT_PACK_PATH,
+                        rebuild: bool = True) -> Optional[PackedCatalog]:
+    """
+    Open the packed catalog, (re)building it first when missing or stale.
+
+    Returns None if no usable pack exists and it cannot be built (e.g. a
+    read-only checkout); callers then fall back to parsing the JSON files.
+    """
+    try:
+        catalog = PackedCatalog(pack_path) if os.path.exists(pack_path) else None
+        if catalog is not None and catalog.is_current(data_path):
+            return catalog
+    except (OSError, ValueError, KeyError) as e:
+        print(f"⚠️  Ignoring unreadable course pack {pack_path}: {e}")
+
+    if not rebuild:
+        return None
+    try:
+        count = build_packed_catalog(data_path, pack_path)
+        print(f"📦 Packed {count} courses into {pack_path}")
+        return PackedCatalog(pack_path)
+    except OSError as e:
+        print(f"⚠️  Could not build course pack: {e}")
+        return None
+
+
+if __name__ == "__main__":
+    import time
+    from course_tools import DATA_PATH
+
+    start = time.perf_counter()
+    total = build_packed_catalog(DATA_PATH)
+    print(f"📦 Packed {total} courses into {DEFAULT_PACK_PATH} in {time.perf_counter() - start:.2f}s")
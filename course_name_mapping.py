@@ -51,6 +51,10 @@ def get_course_code(course_name: str) -> str:
     """
     Get course code from course name.
     
+    The hand-written aliases above win, exact or partial (nicknames like
+    "calc", "intro to cell biology"); only names no alias covers are looked
+    up in the course catalog search index (course_search.py).
+    
     Args:
         course_name: Course name (case insensitive)
     
@@ -69,6 +73,12 @@ def get_course_code(course_name: str) -> str:
         if name in normalized or normalized in name:
             return code
     
+    # Catalog titles (only close title matches, see CourseSearchIndex.resolve)
+    from course_search import resolve_course_name
+    code = resolve_course_name(normalized)
+    if code:
+        return code
+    
     # No match found
     return course_name
 
@@ -0,0 +1,441 @@
+"""
+Native Semester Planner
+Builds multi-semester plans directly from the compiled program requirements
+(degree_requirements.py), the prerequisite graph (prereq_graph.py) and the
+course offering patterns - no LLM involved. The planning agent only asks
+the LLM to explain the resulting plans.
+
+Steps:
+1. Pick target courses for every unmet requirement (cheapest option first,
+   reusing courses that already count elsewhere); rule-based elective pools
+   become "elective slots"
+2. Add the missing prerequisites of every target (cheapest prerequisite option)
+3. Beam search over semester assignments: each semester takes courses whose
+   prerequisites are done, that are offered that term, within the unit limit
+   (recommend_workload). States are pruned with a lower bound on the
+   semesters still needed (remaining units and remaining prerequisite chain).
+"""
+import math
+import re
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional, Set, Tuple
+
+from blackboard.schema import PlanOption, Risk
+from degree_requirements import ProgramRequirements, Requirement, find_program
+from planning_tools import generate_semester_sequence, recommend_workload, is_overload
+from prereq_graph import PrereqGraph, StudentState, get_prereq_graph, normalize_completed
+from schedule_repository import get_schedule_repository
+
+DEFAULT_COURSE_UNITS = 9.0
+STANDARD_SEMESTERS = 8
+BEAM_WIDTH = 12
+BUNDLE_VARIANTS = 4
+# Semesters the search may run past the requested horizon before giving up
+EXTRA_SEMESTERS = 4
+
+
+@dataclass(frozen=True)
+class PlanItem:
+    """A course (or an elective slot) to place in some semester."""
+    key: str                   # course code, or "elective:<requirement>#<n>"
+    label: str
+    units: float
+    course_code: Optional[str] = None
+
+
+@dataclass
+class _State:
+    scheduled: frozenset
+    semesters: List[List[PlanItem]] = field(default_factory=list)
+
+
+# ============================================================================
+# Offering patterns
+# ============================================================================
+
+def is_offered(code: str, term: str) -> bool:
+    """Whether a course is offered in a "Fall 2026" / "Spring 2027" term."""
+    pattern = get_schedule_repository().published_patterns().get(code)
+    if not pattern:
+        return True
+    season = "fall" if term.lower().startswith("fall") else "spring"
+    return bool(pattern.get(season, True))
+
+
+# ============================================================================
+# Planner
+# ============================================================================
+
+class SemesterPlanner:
+    """Plans one student's remaining semesters for a program (and optional minor)."""
+
+    def __init__(self, programs: List[ProgramRequirements], completed,
+                 workload: str = "balanced", graph: Optional[PrereqGraph] = None):
+        self.programs = programs
+        self.graph = graph or get_prereq_graph()
+        self.completed = normalize_completed(completed)
+        self.student = self.graph.student_state(self.completed)
+        self.min_units, self.max_units = recommend_workload(preference=workload)
+        self.workload = workload
+
+        self.targets: List[str] = []
+        self.electives: List[PlanItem] = []
+        self.unmet: List[str] = []
+        # Courses already counted toward a listed-course requirement (pools skip them)
+        self.used: Set[str] = set()
+
+    # ------------------------------------------------------------------
+    # 1. Target selection
+    # ------------------------------------------------------------------
+
+    def _units(self, code: str) -> float:
+        data = self.graph.courses.get(code) or {}
+        return float(data.get("units") or DEFAULT_COURSE_UNITS)
+
+    def _done(self, code: str) -> bool:
+        return self.graph.check(code, self.student).already_completed
+
+    def _cost(self, code: str) -> Tuple[int, int, int]:
+        """Cheapest-first ordering: unknown course, missing prerequisites, depth."""
+        if code in self.targets:
+            return (0, 0, 0)
+        known = 0 if code in self.graph.courses else 1
+        missing = self.graph.check(code, self.student).missing
+        return (known, len(missing), self.graph.level(code))
+
+    def _select(self, node: Requirement, dry_run: bool = False) -> float:
+        """Choose courses for a requirement; returns the added cost (units)."""
+        if node.kind == "all":
+            return sum(self._select(child, dry_run) for child in node.children)
+
+        if node.kind == "any":
+            # Satisfy the cheapest `count` children
+            costs = sorted(
+                (self._dry_cost(child), i) for i, child in enumerate(node.children)
+            )
+            chosen = [node.children[i] for _, i in costs[:node.count]]
+            return sum(self._select(child, dry_run) for child in chosen)
+
+        if node.kind == "courses":
+            have = [c for c in node.courses if self._done(c) or c in self.targets]
+            if not dry_run:
+                self.used.update(have)
+            needed = node.count - len(have)
+            if needed <= 0:
+                return 0.0
+            options = sorted((c for c in node.courses if c not in have), key=self._cost)[:needed]
+            if not dry_run:
+                self.targets.extend(options)
+                self.used.update(options)
+                if len(options) < needed:
+                    self.unmet.append(node.label)
+            return sum(self._units(c) * (1 + self._cost(c)[1]) for c in options)
+
+        # Pool: count matching courses already taken/planned, the rest become slots
+        have = [
+            code for code in list(self.completed) + self.targets
+            if code not in self.used and node.matches(code, self._units(code))
+        ][:node.count]
+        if not dry_run:
+            self.used.update(have)
+        needed = max(0, node.count - len(have))
+        if not dry_run:
+            for n in range(needed):
+                self.electives.append(PlanItem(
+                    key=f"elective:{node.name}#{n}", label=f"{node.label} elective", units=node.units
+                ))
+        return needed * node.units
+
+    def _dry_cost(self, node: Requirement) -> float:
+        return self._select(node, dry_run=True)
+
+    def _add_prerequisites(self):
+        """Close the target set under (cheapest-option) prerequisites and co-requisites."""
+        queue = list(self.targets)
+        while queue:
+            code = queue.pop()
+            planned = dict(self.completed)
+            planned.update({c: None for c in self.targets})
+            check = self.graph.check(code, planned)
+            needed = list(check.missing)
+            if check.missing_coreqs:
+                needed.append(min(check.missing_coreqs, key=self._cost))
+            for req in needed:
+                if req not in self.targets and not self._done(req):
+                    self.targets.append(req)
+                    queue.append(req)
+
+    # ------------------------------------------------------------------
+    # 2. Scheduling search
+    # ------------------------------------------------------------------
+
+    def _items(self) -> List[PlanItem]:
+        # Drop targets already credited by an equivalent planned course
+        # (e.g. 76-101 once 76-106 and 76-107 are in the plan)
+        targets = [code for code in dict.fromkeys(self.targets) if not self._done(code)]
+        for code in list(targets):
+            if any(code in self.graph.all_prerequisites(other) for other in targets):
+                continue
+            others = dict(self.completed)
+            others.update({c: None for c in targets if c != code})
+            if self.graph.check(code, others).already_completed:
+                targets.remove(code)
+
+        courses = [
+            PlanItem(key=code, label=code, units=self._units(code), course_code=code)
+            for code in targets
+        ]
+        return courses + self.electives
+
+    def _chain_lengths(self, items: List[PlanItem]) -> Dict[str, int]:
+        """Semesters in the longest planned prerequisite chain starting at each item."""
+        planned = {item.key for item in items if item.course_code}
+        unlocks: Dict[str, List[str]] = {}
+        for code in planned:
+            for req in self.graph.direct_prerequisites(code) & planned:
+                unlocks.setdefault(req, []).append(code)
+
+        memo: Dict[str, int] = {}
+
+        def chain(code: str, visiting: Set[str]) -> int:
+            if code in memo:
+                return memo[code]
+            if code in visiting:
+                return 0
+            visiting.add(code)
+            memo[code] = 1 + max((chain(d, visiting) for d in unlocks.get(code, ())), default=0)
+            visiting.discard(code)
+            return memo[code]
+
+        return {item.key: chain(item.key, set()) if item.course_code else 1 for item in items}
+
+    def _available(self, item: PlanItem, student: StudentState, term: str) -> bool:
+        """Prerequisites done and offered this term (co-requisites are checked per bundle)."""
+        if not item.course_code:
+            return True
+        return is_offered(item.course_code, term) and self.graph.prereqs_met(item.course_code, student)
+
+    def _bundles(self, state: _State, items: List[PlanItem], term: str,
+                 chains: Dict[str, int]) -> List[List[PlanItem]]:
+        """Candidate course sets for one semester (greedy fill plus variants)."""
+        done = dict(self.completed)
+        done.update({key: None for key in state.scheduled if not key.startswith("elective:")})
+        student = self.graph.student_state(done)
+        ready = [
+            item for item in items
+            if item.key not in state.scheduled and self._available(item, student, term)
+        ]
+
+        # Critical-path first; term-restricted courses before flexible ones
+        def priority(item: PlanItem):
+            pattern = get_schedule_repository().published_patterns().get(item.course_code or "", {})
+            restricted = bool(pattern) and not (pattern.get("fall") and pattern.get("spring"))
+            return (-chains.get(item.key, 1), not restricted, item.course_code is None, item.key)
+
+        ready.sort(key=priority)
+
+        bundles = []
+        for skip in [None] + ready[:BUNDLE_VARIANTS - 1]:
+            bundle, units = [], 0.0
+            # Second pass picks up courses whose co-requisite joined the bundle later
+            for _ in range(2):
+                for item in ready:
+                    if item is skip or item in bundle or units + item.units > self.max_units:
+                        continue
+                    concurrent = [i.course_code for i in bundle if i.course_code]
+                    if item.course_code and not self.graph.can_take(item.course_code, student, concurrent):
+                        continue
+                    bundle.append(item)
+                    units += item.units
+            if bundle and bundle not in bundles:
+                bundles.append(bundle)
+        return bundles
+
+    def _lower_bound(self, state: _State, items: List[PlanItem], chains: Dict[str, int]) -> int:
+        remaining = [item for item in items if item.key not in state.scheduled]
+        if not remaining:
+            return len(state.semesters)
+        units = sum(item.units for item in remaining)
+        chain = max(chains.get(item.key, 1) for item in remaining)
+        return len(state.semesters) + max(math.ceil(units / self.max_units), chain)
+
+    def _search(self, items: List[PlanItem], terms: List[str], max_options: int) -> List[_State]:
+        chains = self._chain_lengths(items)
+        beam = [_State(scheduled=frozenset())]
+        complete: List[_State] = []
+        best = math.inf
+
+        for term in terms:
+            next_beam = []
+            for state in beam:
+                for bundle in self._bundles(state, items, term, chains):
+                    child = _State(
+                        scheduled=state.scheduled | {item.key for item in bundle},
+                        semesters=state.semesters + [bundle]
+                    )
+                    bound = self._lower_bound(child, items, chains)
+                    if bound > best:
+                        continue
+                    if len(child.scheduled) == len(items):
+                        complete.append(child)
+                        best = min(best, len(child.semesters))
+                    else:
+                        next_beam.append((bound, self._imbalance(child), child))
+            if not next_beam:
+                break
+            next_beam.sort(key=lambda entry: (entry[0], entry[1]))
+            beam = [entry[2] for entry in next_beam[:BEAM_WIDTH]]
+
+        if not complete:
+            # Nothing finished within the horizon - return the most advanced plans
+            complete = sorted(beam, key=lambda s: -len(s.scheduled))
+
+        complete.sort(key=lambda s: (len(s.semesters), self._imbalance(s)))
+        unique, seen = [], set()
+        for state in complete:
+            # Elective slots of one requirement are interchangeable ("#1" vs "#2"),
+            # so plans are compared by course code or elective label
+            signature = tuple(
+                tuple(sorted(i.course_code or i.label for i in semester)) for semester in state.semesters
+            )
+            if signature not in seen:
+                seen.add(signature)
+                unique.append(state)
+            if len(unique) == max_options:
+                break
+        return unique
+
+    @staticmethod
+    def _imbalance(state: _State) -> float:
+        loads = [sum(item.units for item in semester) for semester in state.semesters]
+        if len(loads) < 2:
+            return 0.0
+        mean = sum(loads) / len(loads)
+        return sum((load - mean) ** 2 for load in loads) / len(loads)
+
+    # ------------------------------------------------------------------
+    # 3. Output
+    # ------------------------------------------------------------------
+
+    def plan(self, start_term: str, num_semesters: int, max_options: int = 2) -> List[PlanOption]:
+        """Generate up to max_options PlanOptions starting at start_term."""
+        for program in self.programs:
+            self._select(program.root)
+        self._add_prerequisites()
+
+        items = self._items()
+        if not items:
+            return []
+
+        terms = generate_semester_sequence(start_term, max(1, num_semesters) + EXTRA_SEMESTERS)
+        states = self._search(items, terms, max_options)
+        return [self._to_plan_option(state, items, terms, num_semesters, rank)
+                for rank, state in enumerate(states)]
+
+    def _to_plan_option(self, state: _State, items: List[PlanItem], terms: List[str],
+                        num_semesters: int, rank: int) -> PlanOption:
+        semesters, risks = [], []
+        for term, bundle in zip(terms, state.semesters):
+            total = sum(item.units for item in bundle)
+            semesters.append({
+                "term": term,
+                "courses": [item.label for item in bundle],
+                "total_units": int(total) if float(total).is_integer() else total
+            })
+            if is_overload(int(total)):
+                risks.append(Risk(type="overload_risk", severity="medium",
+                                  description=f"{term}: {total:g} units is an overload"))
+            elif total < self.min_units and len(semesters) < len(state.semesters):
+                risks.append(Risk(type="underload", severity="low",
+                                  description=f"{term}: only {total:g} units planned"))
+
+        missing = [item.label for item in items if item.key not in state.scheduled]
+        if missing:
+            risks.append(Risk(type="unscheduled_courses", severity="high",
+                              description=f"Could not schedule: {', '.join(missing)}"))
+        if len(state.semesters) > num_semesters:
+            risks.append(Risk(type="delayed_graduation", severity="high",
+                              description=f"Plan needs {len(state.semesters)} semesters "
+                                          f"({num_semesters} remaining in a standard timeline)"))
+        for requirement in self.unmet:
+            risks.append(Risk(type="requirement_gap", severity="medium",
+                              description=f"Not enough listed courses to satisfy {requirement}"))
+
+        courses = [item.course_code for semester in state.semesters for item in semester if item.course_code]
+        titles = ", ".join(p.title for p in self.programs)
+        justification = (
+            f"{'Fastest' if rank == 0 else 'Alternative'} plan for {titles}: "
+            f"{len(state.semesters)} semesters, {len(courses)} courses plus "
+            f"{sum(1 for s in state.semesters for i in s if not i.course_code)} elective slots, "
+            f"{self.workload} workload ({self.min_units}-{self.max_units} units). "
+            f"Prerequisites and Fall/Spring offering patterns are satisfied by construction."
+        )
+        confidence = 0.9 if not missing and rank == 0 else 0.8
+        return PlanOption(semesters=semesters, courses=courses, risks=risks,
+                          confidence=confidence if not missing else 0.5,
+                          justification=justification, policy_citations=[])
+
+
+# ============================================================================
+# Entry points
+# ============================================================================
+
+def remaining_semesters(current_semester: str) -> Tuple[str, int]:
+    """
+    Map "Second-Year Fall" style status to (start term, semesters left).
+
+    Unknown formats fall back to a full 8-semester plan starting next Fall.
+    """
+    year = datetime.now().year
+    text = (current_semester or "").lower()
+    season = "Spring" if "spring" in text else "Fall"
+    order = ["first", "second", "third", "fourth"]
+    year_index = next((i for i, word in enumerate(order) if word in text), None)
+    if year_index is None:
+        match = re.search(r"year\s*(\d)", text)
+        year_index = int(match.group(1)) - 1 if match else 0
+    used = year_index * 2 + (1 if season == "Spring" else 0)
+    if season == "Spring" and datetime.now().month >= 8:
+        year += 1
+    return f"{season} {year}", max(1, STANDARD_SEMESTERS - used)
+
+
+def plan_for_student(program: str, completed, current_semester: str = "",
+                     minor: Optional[str] = None, workload: str = "balanced",
+                     max_options: int = 2) -> List[PlanOption]:
+    """
+    Plans for a student, or [] when the program has no requirement file
+    (callers fall back to LLM planning).
+    """
+    major = find_program(program)
+    if major is None:
+        return []
+    programs = [major]
+    if minor:
+        minor_reqs = find_program(minor, minor=True)
+        if minor_reqs:
+            programs.append(minor_reqs)
+
+    start_term, semesters = remaining_semesters(current_semester)
+    planner = SemesterPlanner(programs, completed, workload=workload)
+    return planner.plan(start_term, semesters, max_options=max_options)
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    options = plan_for_student(
+        "Computer Science",
+        ["15-112", "15-122", "21-120", "21-122", "21-127", "76-100", "76-101", "07-129", "99-101"],
+        current_semester="Second-Year Fall"
+    )
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"Generated {len(options)} plan(s) in {elapsed:.0f} ms")
+    for option in options:
+        print(f"\n{option.justification}")
+        for semester in option.semesters:
+            print(f"  {semester['term']} ({semester['total_units']} units): {', '.join(semester['courses'])}")
+        for risk in option.risks:
+            print(f"  ⚠️  {risk.description}")
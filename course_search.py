@@ -0,0 +1,426 @@
+"""
+Course Search
+In-memory search over the course catalog (course_tools.DB["courses"]):
+- a prefix trie on course codes ("15-1", "151", "15" for a department)
+- an inverted index on name / short_name / long_desc tokens, with prefix
+  expansion of the last query token for autocomplete (of every token when
+  the words as typed match nothing together)
+- department (code prefix) and unit filters
+
+Used by the /courses/search endpoint and by course_name_mapping.get_course_code,
+so course titles resolve to codes without an LLM or vector store call.
+
+The index is built on first use (~0.2 s for the full catalog) and rebuilt
+when the catalog is swapped by a hot reload.
+"""
+import bisect
+import math
+import re
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+# Field weights: a title hit counts more than a description hit
+NAME_WEIGHT = 3.0
+SHORT_NAME_WEIGHT = 2.0
+DESCRIPTION_WEIGHT = 1.0
+# Prefix-expanded tokens count slightly less than exact ones
+PREFIX_FACTOR = 0.8
+# Vocabulary words one prefix may expand to, and the shortest prefix expanded
+MAX_PREFIX_EXPANSIONS = 256
+MIN_PREFIX_LENGTH = 2
+DEFAULT_LIMIT = 10
+
+STOPWORDS = {"a", "an", "and", "as", "at", "by", "for", "from", "in", "into", "of", "on", "or", "the", "to", "with"}
+# Words that refer to a course without being part of its title
+GENERIC_WORDS = {"course", "courses", "class", "classes"}
+# "15-1", "1512", "QG", "qg-110": departments are two digits or letters
+CODE_QUERY = re.compile(r"^[0-9A-Za-z]{1,2}(?:-?\d{0,3})?$")
+TOKEN = re.compile(r"[a-z0-9]+")
+# "Calculus 2" and "Calculus II" are the same course title
+NUMERALS = {"1": "i", "2": "ii", "3": "iii", "4": "iv"}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens without stopwords."""
+    return [NUMERALS.get(t, t) for t in TOKEN.findall(str(text or "").lower()) if t not in STOPWORDS]
+
+
+def _unit_range(course: dict) -> Tuple[float, float]:
+    """(min, max) units of a course; variable-unit courses carry min_units/max_units."""
+    def number(value):
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+    units = number(course.get("units"))
+    low = number(course.get("min_units"))
+    high = number(course.get("max_units"))
+    low = low if low is not None else units
+    high = high if high is not None else units
+    if low is None and high is None:
+        return 0.0, 0.0
+    return (low if low is not None else high), (high if high is not None else low)
+
+
+@dataclass
+class CourseMatch:
+    code: str
+    name: str
+    department: str
+    units: Optional[float]
+    score: float
+    matched_on: str      # "code" | "title" | "description"
+
+    def to_dict(self) -> dict:
+        return {
+            "code": self.code,
+            "name": self.name,
+            "department": self.department,
+            "units": self.units,
+            "score": round(self.score, 3),
+            "matched_on": self.matched_on
+        }
+
+
+class _TrieNode:
+    __slots__ = ("children", "codes")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.codes: List[str] = []
+
+
+class CourseSearchIndex:
+    """Code trie, token postings and filter data for one catalog snapshot."""
+
+    def __init__(self, courses: Mapping[str, dict]):
+        self._trie = _TrieNode()
+        # token -> {code: field weight}; titles and descriptions kept apart so
+        # name resolution can ignore description-only hits
+        self._title_postings: Dict[str, Dict[str, float]] = {}
+        self._desc_postings: Dict[str, Set[str]] = {}
+        self._names: Dict[str, str] = {}
+        self._name_keys: Dict[str, str] = {}
+        self._units: Dict[str, Tuple[float, float]] = {}
+        self._display_units: Dict[str, Optional[float]] = {}
+        # Normalized full title -> codes (for exact title matches in free text)
+        self._titles: Dict[Tuple[str, ...], List[str]] = {}
+
+        for code in sorted(courses):
+            course = courses[code]
+            name = str(course.get("name") or "")
+            self._names[code] = name
+            self._name_keys[code] = " ".join(tokenize(name))
+            self._units[code] = _unit_range(course)
+            self._display_units[code] = course.get("units") if isinstance(course.get("units"), (int, float)) else None
+            self._insert_code(code)
+
+            for weight, text in ((SHORT_NAME_WEIGHT, course.get("short_name")), (NAME_WEIGHT, name)):
+                for token in tokenize(text):
+                    postings = self._title_postings.setdefault(token, {})
+                    postings[code] = max(postings.get(code, 0.0), weight)
+            for token in set(tokenize(course.get("long_desc"))):
+                self._desc_postings.setdefault(token, set()).add(code)
+            title = tuple(tokenize(name))
+            if title:
+                self._titles.setdefault(title, []).append(code)
+
+        self._size = len(self._names)
+        self._title_vocabulary = sorted(self._title_postings)
+        self._max_title_length = max((len(t) for t in self._titles), default=0)
+
+    def __len__(self) -> int:
+        return self._size
+
+    # ------------------------------------------------------------------
+    # Code prefix trie
+    # ------------------------------------------------------------------
+
+    def _insert_code(self, code: str):
+        node = self._trie
+        node.codes.append(code)
+        for char in code.replace("-", ""):
+            node = node.children.setdefault(char, _TrieNode())
+            node.codes.append(code)
+
+    def codes_with_prefix(self, prefix: str) -> List[str]:
+        """Codes starting with prefix ("15-12", "1512", "qg-1"), in code order."""
+        node = self._trie
+        for char in prefix.replace("-", "").strip().upper():
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return node.codes
+
+    # ------------------------------------------------------------------
+    # Token matching
+    # ------------------------------------------------------------------
+
+    def _idf(self, token: str) -> float:
+        df = len(self._title_postings.get(token, ())) + len(self._desc_postings.get(token, ()))
+        return math.log(1 + self._size / (1 + df))
+
+    def _token_matches(self, token: str, expand: bool) -> Dict[str, Tuple[float, bool]]:
+        """code -> (score, title hit) for one query token."""
+        matches: Dict[str, Tuple[float, bool]] = {}
+        idf = self._idf(token)
+        for code, weight in self._title_postings.get(token, {}).items():
+            matches[code] = (weight * idf, True)
+        for code in self._desc_postings.get(token, ()):
+            if code not in matches:
+                matches[code] = (DESCRIPTION_WEIGHT * idf, False)
+
+        if expand and len(token) >= MIN_PREFIX_LENGTH:
+            # All completions of a prefix share one idf (that of the prefix as a
+            # whole), so a rare word like "compiler" does not outrank "computer"
+            expanded: Dict[str, float] = {}
+            start = bisect.bisect_left(self._title_vocabulary, token)
+            for word in self._title_vocabulary[start:start + MAX_PREFIX_EXPANSIONS]:
+                if not word.startswith(token):
+                    break
+                if word == token:
+                    continue
+                for code, weight in self._title_postings[word].items():
+                    expanded[code] = max(expanded.get(code, 0.0), weight)
+            prefix_idf = math.log(1 + self._size / (1 + len(expanded)))
+            for code, weight in expanded.items():
+                score = weight * prefix_idf * PREFIX_FACTOR
+                if score > matches.get(code, (0.0, False))[0]:
+                    matches[code] = (score, True)
+        return matches
+
+    def _allowed(self, code: str, department: Optional[str],
+                 min_units: Optional[float], max_units: Optional[float]) -> bool:
+        if department and not code.startswith(department.strip().rstrip("-") + "-"):
+            return False
+        low, high = self._units[code]
+        if min_units is not None and high < min_units:
+            return False
+        if max_units is not None and low > max_units:
+            return False
+        return True
+
+    def _match(self, code: str, score: float, matched_on: str) -> CourseMatch:
+        return CourseMatch(
+            code=code,
+            name=self._names[code],
+            department=code.split("-")[0],
+            units=self._display_units[code],
+            score=score,
+            matched_on=matched_on
+        )
+
+    def _rank_text(self, query: str, expand_all: bool = False,
+                   strict: bool = False) -> List[Tuple[str, float, bool]]:
+        """
+        (code, score, every token hit a title) for all courses matching every
+        known token; with strict, a token unknown to the catalog matches nothing.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        # Autocomplete: the word being typed is a prefix unless followed by a space
+        typing = not query[-1:].isspace()
+        per_token = []
+        for i, token in enumerate(tokens):
+            expand = expand_all or (typing and i == len(tokens) - 1)
+            matches = self._token_matches(token, expand=expand)
+            if matches:
+                per_token.append(matches)
+            elif strict:
+                return []
+        if not per_token:
+            return []
+        # Tokens unknown to the catalog are ignored; every known one must match
+        per_token.sort(key=len)
+        candidates = set(per_token[0])
+        for matches in per_token[1:]:
+            candidates.intersection_update(matches)
+            if not candidates:
+                return []
+
+        phrase = " ".join(tokens)
+        ranked = []
+        for code in candidates:
+            score = sum(m[code][0] for m in per_token)
+            title_hit = all(m[code][1] for m in per_token)
+            name_key = self._name_keys[code]
+            if name_key == phrase:
+                score *= 2.0
+            elif name_key.startswith(phrase):
+                score *= 1.5
+            elif phrase in name_key:
+                score *= 1.2
+            ranked.append((code, score, title_hit))
+        # Higher score first; among equals prefer the shorter (more specific) title
+        ranked.sort(key=lambda r: (-r[1], len(self._name_keys[r[0]]), r[0]))
+        return ranked
+
+    # ------------------------------------------------------------------
+    # Public queries
+    # ------------------------------------------------------------------
+
+    def search(self, query: str, department: Optional[str] = None,
+               min_units: Optional[float] = None, max_units: Optional[float] = None,
+               limit: int = DEFAULT_LIMIT) -> List[CourseMatch]:
+        """
+        Courses matching a code prefix or title/description words.
+
+        "15-2" lists 15-2xx courses in code order; "comp sys" ranks courses
+        whose title words start with those words first.
+        """
+        query = (query or "").lstrip()
+        if limit <= 0:
+            return []
+        if not query.strip():
+            # Filters alone (e.g. browse a department)
+            codes = self.codes_with_prefix(department or "")
+            return [
+                self._match(code, 0.0, "code") for code in codes
+                if self._allowed(code, department, min_units, max_units)
+            ][:limit]
+
+        # A short word ("co", "ai") is only a code query if some code starts with it
+        codes = self.codes_with_prefix(query) if CODE_QUERY.match(query.strip()) else []
+        if codes:
+            results = []
+            for code in codes:
+                if self._allowed(code, department, min_units, max_units):
+                    results.append(self._match(code, 1.0, "code"))
+                    if len(results) >= limit:
+                        break
+            return results
+
+        # "comp sys": "comp" also matches titles exactly ("... LIT & COMP"), which
+        # can leave no course matching every word; then every word is a prefix
+        ranked = self._rank_text(query) or self._rank_text(query, expand_all=True)
+        results = []
+        for code, score, title_hit in ranked:
+            if self._allowed(code, department, min_units, max_units):
+                results.append(self._match(code, score, "title" if title_hit else "description"))
+                if len(results) >= limit:
+                    break
+        return results
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Best course code for a course title ("computer systems" -> "15-213"), or None."""
+        query = (name or "").strip()
+        if not query:
+            return None
+        if CODE_QUERY.match(query):
+            # "15213" is 15-213, "qg110" is QG-110
+            code = query.upper() if "-" in query else f"{query[:2]}-{query[2:]}".upper()
+            if code in self._names:
+                return code
+            if any(char.isdigit() for char in query):
+                return None
+        # "the calculus course" names the course "calculus"
+        words = [token for token in tokenize(query) if token not in GENERIC_WORDS]
+        if not words:
+            return None
+        phrase = " ".join(words)
+        # Every word must appear in the title, abbreviated or not ("intro"),
+        # and one shared word is not enough: a single word must be the whole
+        # title, several words must cover at least half of it
+        for code, _, title_hit in self._rank_text(phrase, expand_all=True, strict=True):
+            if not title_hit:
+                continue
+            title = self._name_keys[code].split()
+            if self._name_keys[code] == phrase or (len(words) >= 2 and 2 * len(words) >= len(title)):
+                return code
+        return None
+
+    def find_titles_in_text(self, text: str) -> List[str]:
+        """
+        Codes of courses whose full title appears in the text, e.g.
+        "is Principles of Imperative Computation hard?" -> ["15-122"].
+
+        Titles shared by several courses ("Special Topics") and one-word
+        titles are skipped as too ambiguous.
+        """
+        tokens = tokenize(text)
+        found = []
+        i = 0
+        while i < len(tokens):
+            # Longest title starting at this token wins
+            for length in range(min(self._max_title_length, len(tokens) - i), 1, -1):
+                codes = self._titles.get(tuple(tokens[i:i + length]))
+                if codes and len(codes) == 1:
+                    if codes[0] not in found:
+                        found.append(codes[0])
+                    i += length
+                    break
+            else:
+                i += 1
+        return found
+
+
+_index: Optional[CourseSearchIndex] = None
+_index_source = None
+
+
+def get_course_search_index() -> CourseSearchIndex:
+    """
+    Index over the course catalog loaded by course_tools (built on first use).
+
+    Rebuilt automatically when the catalog is swapped by a hot reload.
+    """
+    global _index, _index_source
+    from course_tools import DB
+    catalog = DB["courses"]
+    if _index is None or _index_source is not catalog:
+        _index = CourseSearchIndex(catalog)
+        _index_source = catalog
+    return _index
+
+
+def search_courses(query: str, department: Optional[str] = None,
+                   min_units: Optional[float] = None, max_units: Optional[float] = None,
+                   limit: int = DEFAULT_LIMIT) -> List[CourseMatch]:
+    """Search the loaded catalog (see CourseSearchIndex.search)."""
+    return get_course_search_index().search(query, department, min_units, max_units, limit)
+
+
+def resolve_course_name(name: str) -> Optional[str]:
+    """Course code for a course title, or None when nothing in the catalog matches."""
+    return get_course_search_index().resolve(name)
+
+
+def find_course_titles_in_text(text: str) -> List[str]:
+    """Codes of courses mentioned by full title in the text."""
+    return get_course_search_index().find_titles_in_text(text)
+
+
+def _percentile(samples: Iterable[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    start = time.perf_counter()
+    index = get_course_search_index()
+    print(f"Indexed {len(index)} courses in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    queries = sys.argv[1:] or ["15-1", "comp", "computer sys", "machine learning", "intro", "organic chem",
+                               "principles of imperative", "calculus", "writing", "genetics", "67",
+                               "QG-110", "qn"]
+    for query in queries:
+        hits = index.search(query, limit=5)
+        print(f"\n🔎 {query!r}")
+        for hit in hits:
+            print(f"   {hit.code}  {hit.name}  ({hit.matched_on}, {hit.score:.2f})")
+
+    # Latency: every prefix of every query, as an autocomplete box would send them
+    prefixes = [q[:i] for q in queries for i in range(1, len(q) + 1)]
+    timings = []
+    for _ in range(20):
+        for prefix in prefixes:
+            begin = time.perf_counter()
+            index.search(prefix)
+            timings.append((time.perf_counter() - begin) * 1000)
+    print(f"\n⏱️  {len(timings)} searches: p50 {_percentile(timings, 0.5):.3f} ms, "
+          f"p99 {_percentile(timings, 0.99):.3f} ms")
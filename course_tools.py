@@ -1,45 +1,36 @@
-import json
 import os
 import re
 
-DATA_PATH = "./data/courses"
+from course_catalog import open_packed_catalog, read_course_files
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "courses")
 DB = {"courses": {}}
 
 def load_data():
-    """Load all JSON course files into memory."""
+    """
+    Load the course catalog.
+    
+    Courses come from the packed catalog (course_catalog.py), which is
+    memory-mapped and decoded per course on access; it is rebuilt here when
+    the JSON files changed. If no pack can be used, every JSON file is parsed
+    into a dict instead.
+    
+    The catalog is built first and swapped into DB in one step, so calling
+    this again (hot reload) never exposes a half-loaded catalog.
+    """
     if not os.path.exists(DATA_PATH):
         print(f"⚠️  Warning: Course data path not found: {DATA_PATH}")
         print(f"   Course lookup features will be limited.")
         return
     
     try:
-        files = os.listdir(DATA_PATH)
-        json_files = [f for f in files if f.endswith(".json")]
-        
-        if not json_files:
-            print(f"⚠️  Warning: No JSON files found in {DATA_PATH}")
-            return
-        
-        for filename in json_files:
-            try:
-                file_path = os.path.join(DATA_PATH, filename)
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    # Each JSON file is a single course object with a "code" field
-                    if isinstance(data, dict) and "code" in data:
-                        DB["courses"][data["code"]] = data
-                    # Handle legacy format where JSON might be a list
-                    elif isinstance(data, list):
-                        for item in data:
-                            if isinstance(item, dict) and "code" in item:
-                                DB["courses"][item["code"]] = item
-            except Exception as e:
-                # Continue loading other files even if one fails
-                print(f"⚠️  Error loading {filename}: {e}")
-                continue
+        courses = open_packed_catalog(DATA_PATH)
+        if courses is None:
+            courses = read_course_files(DATA_PATH)
         
-        if DB["courses"]:
-            print(f"✅ Loaded {len(DB['courses'])} courses from {DATA_PATH}")
+        if courses:
+            DB["courses"] = courses
+            print(f"✅ Loaded {len(courses)} courses from {DATA_PATH}")
         else:
             print(f"⚠️  Warning: No valid course data loaded from {DATA_PATH}")
             
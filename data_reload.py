@@ -0,0 +1,232 @@
+"""
+Hot Reload of Data and Indexes
+Rebuilds domain indexes and the course catalog in the background when files
+under data/ change, then swaps them in without restarting the API.
+
+A reload of a domain:
+1. Copies the active index to a new snapshot and updates only the changed
+   files in the copy (manifest-driven, see update_domain_index)
+2. Points the domain at the new snapshot and reopens its shared retriever
+   (vector_store_registry.py)
+3. Reloads the course catalog (course_tools) and its search index
+   (course_search) for the "courses" domain, and drops the compiled degree
+   requirements (degree_requirements) for the "programs" domain
+
+Requests already running keep the retriever and catalog objects they started
+with, so they finish against the old snapshot. The snapshot replaced by one
+reload is deleted at the start of the next.
+
+Triggers: POST /api/v1/admin/reload, or the polling watcher started by the
+API when DATA_WATCH_INTERVAL (config.py) is non-zero.
+"""
+import os
+import threading
+from datetime import datetime
+from typing import Dict, Iterable, Optional, Tuple
+
+import course_tools
+import degree_requirements
+from config import get_data_watch_interval
+from course_search import get_course_search_index
+from retrieval_cache import invalidate_domain
+from vector_store_registry import get_vector_store_registry
+from rag_engine_improved import (
+    DOMAIN_PATHS, get_db_path, list_domain_files, load_index_manifest, domain_index_is_current,
+    stage_domain_snapshot, activate_domain_snapshot, prune_domain_snapshots
+)
+
+
+class DataReloader:
+    """
+    Runs reloads one at a time on a background thread.
+
+    Domains requested while a reload is running are queued and handled by
+    the same worker right after it.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = set()
+        self._running = False
+        self.status = {
+            "state": "idle",
+            "last_started": None,
+            "last_finished": None,
+            "last_result": None,
+            "last_error": None
+        }
+
+    def trigger(self, domains: Optional[Iterable[str]] = None) -> bool:
+        """
+        Queue a background reload of some (default: all) domains.
+
+        Returns:
+            True if a new worker was started, False if the domains were
+            queued behind a reload that is already running
+        """
+        domains = set(domains or DOMAIN_PATHS.keys())
+        unknown = domains - set(DOMAIN_PATHS)
+        if unknown:
+            raise ValueError(f"Unknown domain(s): {', '.join(sorted(unknown))}")
+
+        with self._lock:
+            self._pending |= domains
+            if self._running:
+                return False
+            self._running = True
+
+        threading.Thread(target=self._run, name="data-reload", daemon=True).start()
+        return True
+
+    def _run(self):
+        while True:
+            with self._lock:
+                if not self._pending:
+                    self._running = False
+                    return
+                domains = sorted(self._pending)
+                self._pending.clear()
+            self.reload(domains)
+
+    def reload(self, domains: Iterable[str]) -> Dict[str, str]:
+        """Reload the given domains now (blocking) and return a per-domain result."""
+        domains = list(domains)
+        self.status.update(state="running", last_started=datetime.utcnow().isoformat())
+        print(f"🔄 Reloading data for: {', '.join(domains)}")
+
+        result = {}
+        error = None
+        for domain in domains:
+            try:
+                result[domain] = self._reload_domain(domain)
+            except Exception as e:
+                result[domain] = "failed"
+                error = f"{domain}: {e}"
+                print(f"⚠️  Reload of domain '{domain}' failed: {e}")
+
+        if "courses" in domains:
+            course_tools.load_data()
+            # Rebuild the search index here rather than on the next search
+            get_course_search_index()
+            result["course_catalog"] = f"{len(course_tools.DB['courses'])} courses"
+
+        if "programs" in domains:
+            # Requirement files are compiled again on next use
+            degree_requirements.clear_cache()
+
+        self.status.update(
+            state="idle",
+            last_finished=datetime.utcnow().isoformat(),
+            last_result=result,
+            last_error=error
+        )
+        print(f"✅ Reload finished: {result}")
+        return result
+
+    def _reload_domain(self, domain: str) -> str:
+        if domain_index_is_current(domain):
+            return "unchanged"
+
+        active_path = get_db_path(domain)
+        # Older snapshots were replaced by the last reload; nothing reads them now
+        prune_domain_snapshots(domain, keep=[active_path])
+
+        try:
+            snapshot_path = stage_domain_snapshot(domain)
+        except Exception:
+            prune_domain_snapshots(domain, keep=[active_path])
+            raise
+
+        activate_domain_snapshot(domain, snapshot_path)
+        _reload_agent_retrievers(domain)
+        # Results cached from the previous snapshot must not be served again
+        invalidate_domain(domain)
+        return f"reloaded ({os.path.basename(snapshot_path)})"
+
+
+def _reload_agent_retrievers(domain: str):
+    """Point the agents of a domain at its new snapshot (via the shared registry)."""
+    get_vector_store_registry().reload(domain)
+
+
+class DataWatcher:
+    """Polls the data folders and triggers reloads for domains that changed."""
+
+    def __init__(self, reloader: DataReloader, interval: float):
+        self.reloader = reloader
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _fingerprint(domain: str) -> Tuple:
+        """Cheap change signature: (path, mtime, size) of every source file."""
+        entries = []
+        for path in list_domain_files(domain):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(entries)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="data-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        fingerprints = {domain: self._fingerprint(domain) for domain in DOMAIN_PATHS}
+
+        # Catch up on data that changed while the process was down (indexes
+        # without a manifest have nothing to compare against and are left alone)
+        stale = [
+            domain for domain in DOMAIN_PATHS
+            if load_index_manifest(domain) is not None and not domain_index_is_current(domain)
+        ]
+        if stale:
+            self.reloader.trigger(stale)
+
+        while not self._stop.wait(self.interval):
+            changed = []
+            for domain in DOMAIN_PATHS:
+                fingerprint = self._fingerprint(domain)
+                if fingerprint != fingerprints[domain]:
+                    fingerprints[domain] = fingerprint
+                    changed.append(domain)
+            if changed:
+                print(f"👀 Data changed for: {', '.join(changed)}")
+                self.reloader.trigger(changed)
+
+
+# Process-wide reloader shared by the admin endpoint and the watcher
+data_reloader = DataReloader()
+_watcher: Optional[DataWatcher] = None
+
+
+def start_data_watcher() -> bool:
+    """Start the data/ watcher if DATA_WATCH_INTERVAL is set (returns whether it runs)."""
+    global _watcher
+    interval = get_data_watch_interval()
+    if interval <= 0:
+        return False
+    if _watcher is None:
+        _watcher = DataWatcher(data_reloader, interval)
+        _watcher.start()
+    return True
+
+
+def stop_data_watcher():
+    """Stop the data/ watcher (if running)."""
+    global _watcher
+    if _watcher is not None:
+        _watcher.stop()
+        _watcher = None
+
+
+if __name__ == "__main__":
+    # Reload everything once in the foreground (e.g. after editing data/)
+    data_reloader.reload(DOMAIN_PATHS.keys())
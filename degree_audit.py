@@ -0,0 +1,353 @@
+"""
+Degree Audit
+Evaluates a student's completed courses against the compiled requirement
+trees (degree_requirements.py) of their majors and minors and reports which
+requirements are satisfied and what is still remaining.
+
+Course allocation:
+- Listed-course requirements ("15-122, 15-150, ...") may share courses
+  (e.g. one course satisfying two listed requirements), as the program files
+  do not say otherwise
+- Courses listed anywhere in a program are never spent on its rule-based
+  elective pools; each remaining course counts toward at most one pool
+- For "choose one" groups (concentrations, science options) the most
+  complete option is reported
+
+Batch mode audits many profiles with a process pool. Requirement trees and
+the prerequisite graph are compiled once in the parent and inherited by the
+workers, so per-profile cost is only the tree walk:
+
+    python degree_audit.py profiles.json --output audits.json
+"""
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Set
+
+from config import get_audit_workers
+from degree_requirements import ProgramRequirements, Requirement, find_program, load_program, requirement_files
+from prereq_graph import PrereqGraph, StudentState, completed_from_profile, get_prereq_graph
+
+DEFAULT_COURSE_UNITS = 9.0
+# Listed options shown per remaining requirement
+MAX_OPTIONS_SHOWN = 6
+
+
+@dataclass
+class RequirementResult:
+    """Audit result for one requirement node."""
+    name: str
+    label: str
+    kind: str
+    satisfied: bool
+    required: int                                   # courses (or sub-requirements) needed
+    completed: int
+    applied_courses: List[str] = field(default_factory=list)
+    options: List[str] = field(default_factory=list)  # listed courses still available
+    children: List["RequirementResult"] = field(default_factory=list)
+    units: float = DEFAULT_COURSE_UNITS                # typical units per course
+    description: str = ""
+
+    def walk(self):
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+
+@dataclass
+class ProgramAudit:
+    """Audit of one program (major or minor) for one student."""
+    program: str
+    kind: str
+    source: str
+    satisfied: bool
+    root: RequirementResult
+    required_units: float
+    completed_units: float
+    satisfied_requirements: List[str] = field(default_factory=list)
+    remaining_requirements: List[str] = field(default_factory=list)
+    applied_courses: List[str] = field(default_factory=list)
+
+    @property
+    def remaining_units(self) -> float:
+        return max(0.0, self.required_units - self.completed_units)
+
+    @property
+    def completion_percentage(self) -> float:
+        if self.required_units <= 0:
+            return 100.0 if self.satisfied else 0.0
+        return round(min(100.0, self.completed_units / self.required_units * 100), 1)
+
+    def to_degree_progress(self) -> dict:
+        """Fields of api.models.student_profile.DegreeProgress."""
+        return {
+            "program_name": self.program,
+            "program_type": self.kind,
+            "required_credits": self.required_units,
+            "completed_credits": self.completed_units,
+            "remaining_credits": self.remaining_units,
+            "completion_percentage": self.completion_percentage,
+            "remaining_requirements": self.remaining_requirements
+        }
+
+
+# ============================================================================
+# Single audit
+# ============================================================================
+
+class _Auditor:
+    """Walks one requirement tree for one student."""
+
+    def __init__(self, program: ProgramRequirements, student: StudentState, graph: PrereqGraph):
+        self.program = program
+        self.student = student
+        self.graph = graph
+        self.passed = [code for code in student.completed if graph.has_passed(code, student)]
+        listed = set(program.root.all_courses())
+        self.pool_candidates = [code for code in self.passed if code not in listed]
+        self.pool_used: Set[str] = set()
+
+    def units(self, code: str) -> float:
+        data = self.graph.courses.get(code) or {}
+        return float(data.get("units") or DEFAULT_COURSE_UNITS)
+
+    def evaluate(self, node: Requirement) -> RequirementResult:
+        if node.kind == "courses":
+            return self._evaluate_courses(node)
+        if node.kind == "pool":
+            return self._evaluate_pool(node)
+        if node.kind == "any":
+            return self._evaluate_any(node)
+
+        children = [self.evaluate(child) for child in node.children]
+        done = sum(1 for child in children if child.satisfied)
+        return RequirementResult(
+            name=node.name, label=node.label, kind=node.kind,
+            satisfied=done == len(children), required=len(children), completed=done,
+            applied_courses=[c for child in children for c in child.applied_courses],
+            children=children, units=node.units, description=node.description
+        )
+
+    def _evaluate_courses(self, node: Requirement) -> RequirementResult:
+        applied = [
+            code for code in node.courses
+            if self.graph.has_passed(code, self.student, node.min_grade)
+        ][:node.count]
+        return RequirementResult(
+            name=node.name, label=node.label, kind=node.kind,
+            satisfied=len(applied) >= node.count, required=node.count, completed=len(applied),
+            applied_courses=applied,
+            options=[code for code in node.courses if code not in applied],
+            units=node.units, description=node.description
+        )
+
+    def _evaluate_pool(self, node: Requirement) -> RequirementResult:
+        applied, units = [], 0.0
+        for code in self.pool_candidates:
+            if len(applied) >= node.count and units >= node.min_units:
+                break
+            if code in self.pool_used or not node.matches(code, self.units(code)):
+                continue
+            if node.min_grade and not self.graph.has_passed(code, self.student, node.min_grade):
+                continue
+            applied.append(code)
+            units += self.units(code)
+        self.pool_used.update(applied)
+        return RequirementResult(
+            name=node.name, label=node.label, kind=node.kind,
+            satisfied=len(applied) >= node.count and units >= node.min_units,
+            required=node.count, completed=min(len(applied), node.count),
+            applied_courses=applied, units=node.units, description=node.description
+        )
+
+    def _evaluate_any(self, node: Requirement) -> RequirementResult:
+        # Try every option against the same pool state and keep the best ones
+        used = set(self.pool_used)
+        trials = []
+        for child in node.children:
+            self.pool_used = set(used)
+            result = self.evaluate(child)
+            trials.append((result.satisfied, _progress(result), -len(trials), child))
+        trials.sort(reverse=True, key=lambda t: t[:3])
+
+        self.pool_used = used
+        chosen = [self.evaluate(t[3]) for t in trials[:node.count]]
+        done = sum(1 for child in chosen if child.satisfied)
+        return RequirementResult(
+            name=node.name, label=node.label, kind=node.kind,
+            satisfied=done >= node.count, required=node.count, completed=done,
+            applied_courses=[c for child in chosen for c in child.applied_courses],
+            options=[child.label for child in node.children],
+            children=chosen, units=node.units, description=node.description
+        )
+
+
+def _progress(result: RequirementResult) -> float:
+    return result.completed / result.required if result.required else 1.0
+
+
+def _remaining_lines(result: RequirementResult, prefix: str = "") -> List[str]:
+    """Human-readable remaining requirements (leaves of the unsatisfied branches)."""
+    if result.satisfied:
+        return []
+    label = f"{prefix}{result.label}"
+    missing = result.required - result.completed
+
+    if result.kind == "courses":
+        shown = ", ".join(result.options[:MAX_OPTIONS_SHOWN])
+        more = ", ..." if len(result.options) > MAX_OPTIONS_SHOWN else ""
+        if missing == len(result.options):
+            return [f"{label}: {shown}{more}"]
+        return [f"{label}: {missing} more of {shown}{more}"]
+    if result.kind == "pool":
+        # A pool can have enough courses but still be short on units
+        missing = max(1, missing)
+        return [f"{label}: {missing} more course{'s' if missing != 1 else ''}"]
+
+    lines = []
+    for child in result.children:
+        child_prefix = prefix if result.kind == "all" else f"{label} > "
+        lines.extend(_remaining_lines(child, child_prefix))
+    return lines
+
+
+def audit_program(program: ProgramRequirements, completed,
+                  graph: Optional[PrereqGraph] = None) -> ProgramAudit:
+    """Audit completed courses (codes, {code: grade} or profile records) against one program."""
+    graph = graph or get_prereq_graph()
+    student = graph.student_state(completed)
+    auditor = _Auditor(program, student, graph)
+    root = auditor.evaluate(program.root)
+
+    applied = list(dict.fromkeys(root.applied_courses))
+    leaves = [r for r in root.walk() if r.kind in ("courses", "pool")]
+    if program.kind == "major" and program.total_units:
+        # Every passed course counts toward the degree's unit total
+        required_units = program.total_units
+        completed_units = sum(auditor.units(code) for code in auditor.passed)
+    else:
+        required_units = program.total_units or sum(r.required * r.units for r in leaves)
+        completed_units = sum(auditor.units(code) for code in applied)
+
+    return ProgramAudit(
+        program=program.title,
+        kind=program.kind,
+        source=os.path.basename(program.source),
+        satisfied=root.satisfied,
+        root=root,
+        required_units=required_units,
+        completed_units=min(completed_units, required_units) if program.kind == "minor" else completed_units,
+        satisfied_requirements=[r.label for r in leaves if r.satisfied],
+        remaining_requirements=_remaining_lines(root),
+        applied_courses=applied
+    )
+
+
+def audit_student(profile: dict, graph: Optional[PrereqGraph] = None) -> List[ProgramAudit]:
+    """
+    Audit every program of a profile dict ("primary_major"/"major",
+    "additional_majors", "minors", "completed_courses").
+
+    Programs without a requirement file are skipped.
+    """
+    graph = graph or get_prereq_graph()
+    completed = graph.student_state(completed_from_profile(profile))
+
+    majors = profile.get("primary_major") or profile.get("major") or []
+    majors = [majors] if isinstance(majors, str) else list(majors)
+    majors += list(profile.get("additional_majors") or [])
+    minors = profile.get("minors") or profile.get("minor") or []
+    minors = [minors] if isinstance(minors, str) else list(minors)
+
+    audits = []
+    for name, is_minor in [(m, False) for m in majors] + [(m, True) for m in minors]:
+        program = find_program(name, minor=is_minor)
+        if program is not None:
+            audits.append(audit_program(program, completed, graph))
+    return audits
+
+
+# ============================================================================
+# Batch audits
+# ============================================================================
+
+def _warm_up():
+    """Compile the prerequisite graph and every requirement tree (per process)."""
+    get_prereq_graph()
+    for path in requirement_files():
+        load_program(path)
+
+
+def _audit_record(profile: dict) -> dict:
+    try:
+        audits = audit_student(profile)
+        return {
+            "user_id": profile.get("user_id"),
+            "degree_progress": [audit.to_degree_progress() for audit in audits],
+            "error": None
+        }
+    except Exception as e:
+        return {"user_id": profile.get("user_id"), "degree_progress": [], "error": str(e)}
+
+
+def audit_batch(profiles: Iterable[dict], workers: Optional[int] = None,
+                chunksize: int = 64) -> List[dict]:
+    """
+    Audit many profiles in parallel (results keep the input order).
+
+    Each result is {"user_id", "degree_progress": [DegreeProgress dicts], "error"};
+    a profile that fails to audit does not stop the batch.
+    """
+    profiles = list(profiles)
+    workers = workers or get_audit_workers()
+    _warm_up()
+
+    if workers <= 1 or len(profiles) <= chunksize:
+        return [_audit_record(profile) for profile in profiles]
+
+    # fork lets workers inherit the compiled trees; spawn platforms warm up per worker
+    start_methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in start_methods else None)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_warm_up) as pool:
+        return list(pool.map(_audit_record, profiles, chunksize=chunksize))
+
+
+def _load_profiles(path: str) -> List[dict]:
+    """Profiles from a JSON list or a JSON-lines file."""
+    with open(path, "r", encoding="utf-8") as f:
+        text = f.read().strip()
+    if text.startswith("["):
+        return json.loads(text)
+    return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run degree audits for a cohort of student profiles")
+    parser.add_argument("profiles", help="JSON list or JSON-lines file of student profiles")
+    parser.add_argument("--output", "-o", help="Write results here (default: print a summary)")
+    parser.add_argument("--workers", "-w", type=int, default=None, help="Worker processes")
+    args = parser.parse_args()
+
+    cohort = _load_profiles(args.profiles)
+    start = time.perf_counter()
+    results = audit_batch(cohort, workers=args.workers)
+    elapsed = time.perf_counter() - start
+
+    failed = sum(1 for r in results if r["error"])
+    print(f"✅ Audited {len(results)} profiles in {elapsed:.1f}s ({failed} failed)")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"📝 Results written to {args.output}")
+    else:
+        for result in results[:5]:
+            for progress in result["degree_progress"]:
+                print(f"  {result['user_id']}: {progress['program_name']} "
+                      f"{progress['completion_percentage']}% "
+                      f"({len(progress['remaining_requirements'])} requirements remaining)")
@@ -0,0 +1,383 @@
+"""
+Degree Requirement Trees
+Compiles the program requirement JSON files under data/programs
+(cmu_*_degree_requirements.json and the Minors/cmu_minor_*.json files) into
+one uniform tree, so planners and audits never deal with the many shapes
+those files use ("choose_one_from", "options", "categories",
+"course_range", "subject_codes", ...).
+
+Node kinds:
+- "all":     every child must be satisfied
+- "any":     `count` children must be satisfied (e.g. pick one concentration)
+- "courses": `count` courses from an explicit list
+- "pool":    `count` courses (and/or `min_units`) matching a rule, e.g.
+             "any 73-300..73-999 course except 73-360" or "subject codes 15, 16"
+"""
+import glob
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+PROGRAMS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "programs")
+
+# Keys holding explicit course lists, and how many of the list they require
+# (None = read from courses_required / requirement text, "all" = every course)
+COURSE_LIST_KEYS = {
+    "core_courses": "all",
+    "required_courses": "all",
+    "required_course": "all",
+    "choose_one_from": 1,
+    "at_least_one_from": 1,
+    "choose_from": None,
+    "options": None,
+    "course_options": None,
+    "courses": None,
+    "specific_courses": None,
+}
+
+# Keys that describe rule-based elective pools
+POOL_KEYS = {
+    "subject_code", "subject_codes", "course_range", "course_pattern", "course_patterns",
+}
+
+# Dict-valued keys that never hold requirements
+METADATA_KEYS = {
+    "program", "minor", "entry_year", "double_counting_rules", "restrictions", "pathways",
+    "excluded_ranges", "course_range", "limited_double_count",
+}
+
+_NUMBER_WORDS = {"one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "eight": 8}
+_COUNT_RE = re.compile(
+    r"\b(?:at least|any|choose(?: any)?|take)\s+(\d+|one|two|three|four|five|six|seven|eight)(?=\s+courses?\b)",
+    re.IGNORECASE
+)
+
+
+@dataclass
+class Requirement:
+    """One node of a compiled requirement tree."""
+    name: str
+    kind: str
+    count: int = 1
+    courses: List[str] = field(default_factory=list)
+    children: List["Requirement"] = field(default_factory=list)
+    min_units: float = 0.0
+    min_grade: Optional[str] = None
+    units: float = 9.0
+    description: str = ""
+    # Pool filters
+    subjects: List[str] = field(default_factory=list)
+    ranges: List[Tuple[str, str]] = field(default_factory=list)
+    patterns: List[str] = field(default_factory=list)
+    extra_courses: List[str] = field(default_factory=list)
+    excluded_courses: List[str] = field(default_factory=list)
+    excluded_ranges: List[Tuple[str, str]] = field(default_factory=list)
+    excluded_patterns: List[str] = field(default_factory=list)
+    min_course_units: float = 0.0
+
+    @property
+    def label(self) -> str:
+        return self.name.replace("_", " ").title()
+
+    def matches(self, code: str, course_units: Optional[float] = None) -> bool:
+        """Whether a course counts toward this pool requirement."""
+        if code in self.excluded_courses:
+            return False
+        if any(_in_range(code, start, end) for start, end in self.excluded_ranges):
+            return False
+        if any(_match_pattern(code, pattern) for pattern in self.excluded_patterns):
+            return False
+        if code in self.extra_courses:
+            return True
+        if self.min_course_units and course_units is not None and course_units < self.min_course_units:
+            return False
+        return (
+            code.split("-")[0] in self.subjects
+            or any(_in_range(code, start, end) for start, end in self.ranges)
+            or any(_match_pattern(code, pattern) for pattern in self.patterns)
+        )
+
+    def walk(self):
+        """Yield this node and all descendants."""
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def all_courses(self) -> List[str]:
+        """Every explicitly listed course in the tree."""
+        seen = []
+        for node in self.walk():
+            for code in node.courses + node.extra_courses:
+                if code not in seen:
+                    seen.append(code)
+        return seen
+
+
+@dataclass
+class ProgramRequirements:
+    """A compiled program (major or minor)."""
+    title: str
+    kind: str                  # "major" | "minor"
+    source: str
+    total_units: float
+    root: Requirement
+
+
+# ============================================================================
+# Compilation
+# ============================================================================
+
+def compile_program(data: dict, source: str = "") -> ProgramRequirements:
+    """Compile one requirement JSON document."""
+    program_reqs = data.get("program_requirements", {}) or {}
+    if "minor" in data:
+        title = data["minor"].get("name", "Minor")
+        kind = "minor"
+        body = program_reqs.get("requirements", {})
+    else:
+        title = data.get("program", {}).get("title", "Program")
+        kind = "major"
+        body = data.get("requirements", {})
+
+    total_units = float(
+        program_reqs.get("total_units_required") or program_reqs.get("total_min_units") or 0
+    )
+    root = _compile_node("requirements", body, default_units=program_reqs.get("mode_average_units", 9))
+    root = root or Requirement(name="requirements", kind="all")
+    return ProgramRequirements(title=title, kind=kind, source=source, total_units=total_units, root=root)
+
+
+def _compile_node(name: str, node: dict, default_units: float = 9.0) -> Optional[Requirement]:
+    if not isinstance(node, dict):
+        return None
+
+    units = float(node.get("mode_average_units", default_units) or default_units)
+    text = " ".join(str(node.get(k, "")) for k in ("requirement", "description"))
+    min_grade = node.get("minimum_grade")
+    parts: List[Requirement] = []
+
+    # Explicit course lists
+    min_units = float(node.get("min_units", 0) or 0)
+    for key, fixed in COURSE_LIST_KEYS.items():
+        if not isinstance(node.get(key), list):
+            continue
+        codes = _course_codes(node[key])
+        if not codes:
+            continue
+        if fixed == "all":
+            count = len(codes)
+        elif fixed is not None:
+            count = fixed
+        elif _says_all(text):
+            count = _count_from(node, text, default=len(codes))
+        else:
+            count = _count_from(node, text, default=max(1, round(min_units / units)) if min_units else 1)
+        if key == "choose_from" and "at_least_one_from" in node:
+            codes = list(dict.fromkeys(_course_codes(node["at_least_one_from"]) + codes))
+        parts.append(Requirement(
+            name=f"{name}" if not parts else f"{name}.{key}",
+            kind="courses", count=min(count, len(codes)), courses=codes, min_units=min_units,
+            min_grade=min_grade, units=units, description=text.strip()
+        ))
+
+    # Rule-based pools
+    if POOL_KEYS & set(node) or ("additional_courses_allowed" in node and not parts):
+        parts.append(_compile_pool(name, node, text, units))
+
+    # Nested requirements
+    children = []
+    child_keys = []
+    for key, value in node.items():
+        if key in METADATA_KEYS or not isinstance(value, dict) or "code" in value:
+            continue
+        child_keys.append(key)
+        if key in ("categories", "concentrations"):
+            group = [c for c in (_compile_node(k, v, units) for k, v in value.items()) if c]
+            if not group:
+                continue
+            any_of = key == "concentrations" or _says_any(text)
+            children.append(Requirement(
+                name=key, kind="any" if any_of else "all",
+                count=1 if any_of else len(group), children=group, units=units
+            ))
+        else:
+            child = _compile_node(key, value, units)
+            if child:
+                children.append(child)
+
+    parts.extend(children)
+    if not parts:
+        return None
+    if len(parts) == 1:
+        only = parts[0]
+        only.name = name
+        return only
+
+    # "option_1" / "option_2" siblings are alternatives
+    options_only = bool(child_keys) and len(children) == len(parts) and all(k.startswith("option") for k in child_keys)
+    any_of = _says_any(text) or node.get("choose_one_concentration") or options_only
+    return Requirement(
+        name=name, kind="any" if any_of else "all",
+        count=1 if any_of else len(parts), children=parts,
+        min_grade=min_grade, units=units, description=text.strip()
+    )
+
+
+def _compile_pool(name: str, node: dict, text: str, units: float) -> Requirement:
+    subjects = node.get("subject_codes") or ([node["subject_code"]] if "subject_code" in node else [])
+    ranges = _ranges(node.get("course_range"))
+    patterns = list(node.get("course_patterns", [])) + ([node["course_pattern"]] if "course_pattern" in node else [])
+    min_units = float(node.get("min_units", 0) or 0)
+    count = _count_from(node, text, default=max(1, round(min_units / units)) if min_units else 1)
+    return Requirement(
+        name=name, kind="pool", count=count, min_units=min_units,
+        min_grade=node.get("minimum_grade"), units=units, description=text.strip(),
+        subjects=[str(s).zfill(2) for s in subjects],
+        ranges=ranges,
+        patterns=patterns,
+        extra_courses=_course_codes(node.get("additional_courses", []) + node.get("additional_courses_allowed", [])),
+        excluded_courses=_course_codes(node.get("excluded_courses", [])),
+        excluded_ranges=_ranges(node.get("excluded_ranges")),
+        excluded_patterns=list(node.get("excluded_patterns", [])),
+        min_course_units=float(node.get("minimum_units_per_course") or node.get("min_units_per_course") or 0)
+    )
+
+
+def _course_codes(items) -> List[str]:
+    codes = []
+    if isinstance(items, dict):
+        items = [items]
+    for item in items or []:
+        code = item.get("code") or item.get("course_code") if isinstance(item, dict) else item
+        if isinstance(code, str) and re.fullmatch(r"[0-9A-Z]{2}-\d{3}", code.strip()):
+            codes.append(code.strip())
+    return list(dict.fromkeys(codes))
+
+
+def _ranges(value) -> List[Tuple[str, str]]:
+    """Parse "02-100 to 02-199" strings or {"start", "end"} dicts."""
+    if not value:
+        return []
+    if isinstance(value, (dict, str)):
+        value = [value]
+    ranges = []
+    for item in value:
+        if isinstance(item, dict) and "start" in item and "end" in item:
+            ranges.append((item["start"], item["end"]))
+        elif isinstance(item, str):
+            match = re.match(r"(\S+)\s*(?:to|-|–)\s*(\S+)$", item.strip())
+            if match:
+                ranges.append((match.group(1), match.group(2)))
+    return ranges
+
+
+def _count_from(node: dict, text: str, default: int) -> int:
+    if node.get("courses_required"):
+        return int(node["courses_required"])
+    match = _COUNT_RE.search(text)
+    if match:
+        word = match.group(1).lower()
+        return int(word) if word.isdigit() else _NUMBER_WORDS[word]
+    return default
+
+
+def _says_all(text: str) -> bool:
+    return bool(re.search(r"\bfulfill all\b|\brequired courses\b", text, re.IGNORECASE))
+
+
+def _says_any(text: str) -> bool:
+    return bool(re.search(r"\bfulfill any\b", text, re.IGNORECASE))
+
+
+def _in_range(code: str, start: str, end: str) -> bool:
+    return len(code) == len(start) and start <= code <= end
+
+
+def _match_pattern(code: str, pattern: str) -> bool:
+    return bool(re.fullmatch(pattern.replace("*", r"\d"), code))
+
+
+# ============================================================================
+# Loading
+# ============================================================================
+
+PROGRAM_ALIASES = {
+    "cs": "computer_science",
+    "computer science": "computer_science",
+    "computer science & ai": "computer_science",
+    "is": "information_systems",
+    "information systems": "information_systems",
+    "business": "business_administration",
+    "ba": "business_administration",
+    "biology": "biological_sciences",
+    "math": "mathematical_sciences",
+    "mathematics": "mathematical_sciences",
+    "compbio": "computational_biology",
+}
+
+_compiled: Dict[str, ProgramRequirements] = {}
+_lookups: Dict[Tuple[str, bool], Optional[str]] = {}
+
+
+def requirement_files() -> List[str]:
+    """All major and minor requirement files."""
+    majors = glob.glob(os.path.join(PROGRAMS_PATH, "**", "cmu_*_degree_requirements.json"), recursive=True)
+    minors = glob.glob(os.path.join(PROGRAMS_PATH, "**", "cmu_minor_*.json"), recursive=True)
+    return sorted(majors) + sorted(minors)
+
+
+def load_program(path: str) -> ProgramRequirements:
+    """Compile (and cache) the requirement file at path."""
+    if path not in _compiled:
+        with open(path, "r", encoding="utf-8") as f:
+            _compiled[path] = compile_program(json.load(f), source=path)
+    return _compiled[path]
+
+
+def program_key(filename: str) -> str:
+    """Program part of a requirement file name ("cmu_minor_arabic_studies.json" -> "arabic_studies")."""
+    key = os.path.splitext(os.path.basename(filename))[0].lower().replace("-", "_")
+    key = re.sub(r"^cmu_(minor_)?", "", key)
+    return re.sub(r"_degree_requirements$", "", key)
+
+
+def _normalize_program_name(name: str) -> str:
+    """"Minor in Arabic Studies", "economics minor" -> "arabic_studies", "economics"."""
+    key = re.sub(r"\s+", " ", str(name).strip().lower())
+    key = re.sub(r"^(?:the |an? )?(?:(?:minor|major|bs|ba|degree) in )?", "", key)
+    key = re.sub(r" (?:minor|major|degree)$", "", key)
+    key = PROGRAM_ALIASES.get(key, key)
+    return re.sub(r"[\s\-]+", "_", key)
+
+
+def find_program(name, minor: bool = False) -> Optional[ProgramRequirements]:
+    """
+    Compiled requirements for a program name such as "CS" or "Economics".
+
+    The whole name must match a program (or an alias), so a stray word
+    ("A", "Science") finds nothing and callers fall back to the LLM.
+    """
+    if isinstance(name, (list, tuple)):
+        name = name[0] if name else ""
+    if not name:
+        return None
+    key = _normalize_program_name(name)
+
+    if (key, minor) not in _lookups:
+        _lookups[(key, minor)] = None
+        for path in requirement_files():
+            is_minor = os.path.basename(path).lower().startswith("cmu_minor_")
+            if is_minor == minor and program_key(path) == key:
+                _lookups[(key, minor)] = path
+                break
+
+    path = _lookups[(key, minor)]
+    return load_program(path) if path else None
+
+
+def clear_cache():
+    """Forget compiled programs (after requirement files change)."""
+    _compiled.clear()
+    _lookups.clear()
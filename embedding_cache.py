@@ -0,0 +1,175 @@
+"""
+Persistent Embedding Cache
+Content-addressed, on-disk cache for chunk embeddings used by index builds.
+
+Each vector is stored under sha256(model name + chunk text), so:
+- Rebuilding an index (even after deleting the Chroma DB) re-embeds nothing
+  that was embedded before
+- A one-line data fix only pays for the chunks whose text actually changed
+- Switching embedding models never returns vectors from the old model
+
+Vectors live in a single SQLite file (see EMBEDDING_CACHE_PATH in config.py).
+Query embeddings are passed straight through to the wrapped model.
+"""
+import hashlib
+import os
+import sqlite3
+import threading
+from array import array
+from typing import Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Wraps an Embeddings model with a persistent content-addressed cache.
+
+    Only cache misses are sent to the underlying model (in one batched call);
+    hit/miss counters are kept so index builds can report hit rates.
+    """
+
+    def __init__(self, embeddings: Embeddings, cache_path: str, model_name: Optional[str] = None):
+        self.embeddings = embeddings
+        self.cache_path = cache_path
+        self.model_name = model_name or getattr(embeddings, "model", embeddings.__class__.__name__)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(cache_path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(cache_path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+        )
+        self._conn.commit()
+
+    # ------------------------------------------------------------------
+    # Keys and (de)serialization
+    # ------------------------------------------------------------------
+
+    def key(self, text: str) -> str:
+        """Content address for a chunk: sha256 of model name + text."""
+        return hashlib.sha256(f"{self.model_name}\n{text}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _pack(vector: List[float]) -> bytes:
+        # float32 is what the vector store keeps anyway
+        return array("f", vector).tobytes()
+
+    @staticmethod
+    def _unpack(blob: bytes) -> List[float]:
+        vector = array("f")
+        vector.frombytes(blob)
+        return vector.tolist()
+
+    def _lookup(self, keys: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        unique = list(dict.fromkeys(keys))
+        # Stay under SQLite's bound-parameter limit
+        for i in range(0, len(unique), 500):
+            batch = unique[i:i + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = self._conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+            ).fetchall()
+            for key, blob in rows:
+                found[key] = self._unpack(blob)
+        return found
+
+    # ------------------------------------------------------------------
+    # Embeddings interface
+    # ------------------------------------------------------------------
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed chunks, reusing cached vectors and embedding only misses."""
+        keys = [self.key(text) for text in texts]
+
+        with self._lock:
+            cached = self._lookup(keys)
+
+        # Embed each distinct missing text once
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            new_entries = dict(zip(missing.keys(), vectors))
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(key, self._pack(vector)) for key, vector in new_entries.items()]
+                )
+                self._conn.commit()
+            cached.update(new_entries)
+
+        with self._lock:
+            self.hits += len(texts) - len(missing)
+            self.misses += len(missing)
+
+        return [cached[key] for key in keys]
+
+    def embed_query(self, text: str) -> List[float]:
+        """Queries are not cached here."""
+        return self.embeddings.embed_query(text)
+
+    async def aembed_query(self, text: str) -> List[float]:
+        return await self.embeddings.aembed_query(text)
+
+    # ------------------------------------------------------------------
+    # Statistics
+    # ------------------------------------------------------------------
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters since creation (or the last reset_stats())."""
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "cached_vectors": self.size()
+        }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def size(self) -> int:
+        """Number of vectors stored on disk."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def print_stats(self, label: str = "Embedding cache"):
+        stats = self.stats()
+        print(f"   💾 {label}: {stats['hits']} hits, {stats['misses']} embedded "
+              f"(hit rate {stats['hit_rate']:.1%}, {stats['cached_vectors']} vectors on disk)")
+
+
+if __name__ == "__main__":
+    # Demo with a fake model: the second pass is served entirely from the cache
+    import tempfile
+
+    class CountingEmbeddings(Embeddings):
+        model = "demo-model"
+        calls = 0
+
+        def embed_documents(self, texts):
+            CountingEmbeddings.calls += len(texts)
+            return [[float(len(t)), 1.0, 0.0] for t in texts]
+
+        def embed_query(self, text):
+            return self.embed_documents([text])[0]
+
+    path = os.path.join(tempfile.mkdtemp(), "embeddings.sqlite")
+    cache = CachedEmbeddings(CountingEmbeddings(), path)
+    chunks = ["15-112 Fundamentals of Programming", "67-250 Information Systems Milieux"]
+
+    cache.embed_documents(chunks)
+    cache.print_stats("First build")
+    cache.reset_stats()
+    cache.embed_documents(chunks + ["new chunk"])
+    cache.print_stats("Second build")
+    print(f"   Underlying model embedded {CountingEmbeddings.calls} texts in total")
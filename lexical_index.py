@@ -0,0 +1,296 @@
+"""
+Lexical (BM25) Index and Hybrid Retrieval
+A BM25 index over the same chunks as a domain's Chroma store, kept in
+lexical_index.json inside the domain DB directory (so hot-reload snapshots
+copy it along with the vectors).
+
+Vector search misses exact tokens such as course codes ("67-364") or policy
+names; BM25 finds those but misses paraphrases. HybridRetriever asks both
+for their top fetch_k chunks and merges the two rankings with reciprocal
+rank fusion:
+
+    score(chunk) = sum over rankings of 1 / (RRF_K + rank)
+
+The same index maps course codes to their chunks (the course's own file,
+then chunks whose courses_mentioned metadata lists it), so agents can fetch
+the context of known courses without an embedding call.
+
+The index is written by the index builds in rag_engine_improved.py. For a
+store built before this existed, it is rebuilt from the chunk texts already
+in Chroma (no embedding calls).
+
+Benchmark (needs the built indexes and an OpenAI key):
+
+    python lexical_index.py courses
+"""
+import heapq
+import json
+import math
+import os
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+LEXICAL_INDEX_FILE = "lexical_index.json"
+# BM25 parameters (standard values)
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Course codes stay one token; everything else is split on non-alphanumerics
+TOKEN = re.compile(r"\d{2}-\d{3,4}|[a-z0-9]+")
+COURSE_CODE = re.compile(r"\d{2}-\d{3,4}")
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "for", "from", "how", "i", "in",
+    "is", "it", "me", "my", "of", "on", "or", "the", "to", "what", "when", "which", "with"
+}
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+def _chunk_order(chunk_id: str) -> Tuple[str, int]:
+    source, _, n = chunk_id.rpartition("#")
+    return (source, int(n)) if n.isdigit() else (chunk_id, 0)
+
+
+def chunk_key(doc: Document) -> Tuple[str, str]:
+    """Identity of a chunk across retrievers (vector results carry no chunk ID)."""
+    return doc.metadata.get("source", ""), doc.page_content
+
+
+class BM25Index:
+    """BM25 over a set of chunks keyed by chunk ID."""
+
+    def __init__(self, chunks: Dict[str, Tuple[str, dict]] = None):
+        # chunk ID -> (text, metadata)
+        self.chunks: Dict[str, Tuple[str, dict]] = dict(chunks or {})
+        self._compile()
+
+    def _compile(self):
+        # Chunks of one file stay in file order ("<source>#<n>" IDs)
+        self._ids: List[str] = sorted(self.chunks, key=_chunk_order)
+        self._lengths: List[int] = []
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        # course code -> chunks of the course's own file / chunks mentioning it
+        self._course_files: Dict[str, List[int]] = {}
+        self._course_mentions: Dict[str, List[int]] = {}
+        for i, chunk_id in enumerate(self._ids):
+            text, metadata = self.chunks[chunk_id]
+            counts = Counter(tokenize(text))
+            self._lengths.append(sum(counts.values()))
+            for token, tf in counts.items():
+                self._postings.setdefault(token, []).append((i, tf))
+
+            own = os.path.splitext(os.path.basename(metadata.get("source", "")))[0]
+            if COURSE_CODE.fullmatch(own):
+                self._course_files.setdefault(own, []).append(i)
+            for code in filter(None, (c.strip() for c in metadata.get("courses_mentioned", "").split(","))):
+                if code != own:
+                    self._course_mentions.setdefault(code, []).append(i)
+        self._avg_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    # ------------------------------------------------------------------
+    # Updates and persistence
+    # ------------------------------------------------------------------
+
+    def update(self, added: Dict[str, Tuple[str, dict]], removed: Sequence[str] = ()):
+        """Drop removed chunk IDs, add (or replace) chunks, and recompile."""
+        for chunk_id in removed:
+            self.chunks.pop(chunk_id, None)
+        self.chunks.update(added)
+        self._compile()
+
+    def save(self, db_path: str):
+        """Write the index next to the domain's Chroma files (atomic)."""
+        path = os.path.join(db_path, LEXICAL_INDEX_FILE)
+        os.makedirs(db_path, exist_ok=True)
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({"chunks": self.chunks}, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, db_path: str) -> Optional["BM25Index"]:
+        """Index stored in a domain DB directory (None if there is none)."""
+        path = os.path.join(db_path, LEXICAL_INDEX_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return cls({chunk_id: (text, metadata) for chunk_id, (text, metadata) in data["chunks"].items()})
+
+    @staticmethod
+    def chunk_entries(chunks: List[Document], ids: List[str]) -> Dict[str, Tuple[str, dict]]:
+        """{chunk ID: (text, metadata)} entries for chunks about to be indexed."""
+        return {chunk_id: (chunk.page_content, dict(chunk.metadata)) for chunk, chunk_id in zip(chunks, ids)}
+
+    @classmethod
+    def from_documents(cls, chunks: List[Document], ids: List[str]) -> "BM25Index":
+        return cls(cls.chunk_entries(chunks, ids))
+
+    @classmethod
+    def from_vectorstore(cls, vectorstore) -> "BM25Index":
+        """Index the chunks already stored in a Chroma collection."""
+        data = vectorstore.get(include=["documents", "metadatas"])
+        return cls({
+            chunk_id: (text or "", metadata or {})
+            for chunk_id, text, metadata in zip(data["ids"], data["documents"], data["metadatas"])
+        })
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def _document(self, i: int) -> Document:
+        text, metadata = self.chunks[self._ids[i]]
+        return Document(page_content=text, metadata=dict(metadata))
+
+    def course_chunks(self, codes: Sequence[str], limit: int = 5) -> Dict[str, List[Document]]:
+        """
+        Chunks about each course code, looked up by metadata (no embedding):
+        the chunks of the course's own file first, then chunks whose
+        courses_mentioned lists it. Codes with no chunks are left out.
+        """
+        found = {}
+        for code in dict.fromkeys(codes):
+            positions = self._course_files.get(code, []) + self._course_mentions.get(code, [])
+            if positions:
+                found[code] = [self._document(i) for i in positions[:limit]]
+        return found
+
+    def search(self, query: str, k: int = 5) -> List[Tuple[Document, float]]:
+        """Top-k chunks by BM25 score."""
+        n = len(self._ids)
+        if not n:
+            return []
+        scores: Dict[int, float] = {}
+        for token in set(tokenize(query)):
+            postings = self._postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+            for i, tf in postings:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self._lengths[i] / self._avg_length)
+                scores[i] = scores.get(i, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+        top = heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+        return [(self._document(i), score) for i, score in top]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[List[Document]], k: int, rrf_k: int = 60) -> List[Document]:
+    """Merge ranked chunk lists; chunks ranked high by either list come first."""
+    scores: Dict[Tuple[str, str], float] = {}
+    docs: Dict[Tuple[str, str], Document] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, start=1):
+            key = chunk_key(doc)
+            scores[key] = scores.get(key, 0.0) + 1.0 / (rrf_k + rank)
+            docs.setdefault(key, doc)
+    # Stable sort keeps the first ranking's order among equal scores
+    ordered = sorted(docs, key=lambda key: -scores[key])
+    return [docs[key] for key in ordered[:k]]
+
+
+class HybridRetriever(BaseRetriever):
+    """
+    Vector retriever + BM25 index, fused with reciprocal rank fusion.
+
+    The BM25 index also answers exact course-code lookups (course_chunks).
+    """
+
+    vector_retriever: BaseRetriever
+    lexical_index: Any
+    k: int = 5
+    fetch_k: int = 20
+    rrf_k: int = 60
+
+    def _lexical(self, query: str) -> List[Document]:
+        return [doc for doc, _ in self.lexical_index.search(query, self.fetch_k)]
+
+    def _get_relevant_documents(self, query: str, *,
+                                run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        vector_docs = self.vector_retriever.invoke(query, config={"callbacks": run_manager.get_child()})
+        return reciprocal_rank_fusion([vector_docs, self._lexical(query)], self.k, self.rrf_k)
+
+    async def _aget_relevant_documents(self, query: str, *,
+                                       run_manager: AsyncCallbackManagerForRetrieverRun) -> List[Document]:
+        vector_docs = await self.vector_retriever.ainvoke(query, config={"callbacks": run_manager.get_child()})
+        # BM25 is in-memory and sub-millisecond; no need for a thread
+        return reciprocal_rank_fusion([vector_docs, self._lexical(query)], self.k, self.rrf_k)
+
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+
+def _course_benchmark_queries(limit: int) -> List[Tuple[str, str]]:
+    """(query, relevant source suffix) pairs from the course catalog."""
+    from course_tools import DB
+    queries = []
+    for code in sorted(DB["courses"])[::max(1, len(DB["courses"]) // limit)][:limit]:
+        course = DB["courses"][code]
+        queries.append((f"What are the prerequisites for {code}?", f"{code}.json"))
+        if course.get("name"):
+            queries.append((f"Tell me about {course['name']}", f"{code}.json"))
+    return queries
+
+
+def benchmark(domain: str = "courses", k: int = 5, limit: int = 50) -> Dict[str, dict]:
+    """Recall@k and latency of vector-only, BM25-only and hybrid retrieval."""
+    import time
+    from rag_engine_improved import get_db_path, get_retriever
+    from config import get_hybrid_fetch_k
+    from retrieval_cache import CachedRetriever, clear_caches
+
+    if domain != "courses":
+        raise ValueError("Labelled benchmark queries are only generated for the courses domain")
+
+    hybrid = get_retriever(domain=domain, k=k)
+    # Time the retrievers themselves, not the result cache in front of them
+    if isinstance(hybrid, CachedRetriever):
+        hybrid = hybrid.retriever
+    if not isinstance(hybrid, HybridRetriever):
+        raise RuntimeError("Hybrid retrieval is disabled (HYBRID_RETRIEVAL_ENABLED=false)")
+    vector = hybrid.vector_retriever
+    lexical = hybrid.lexical_index
+    print(f"Benchmarking domain '{domain}' at {get_db_path(domain)}: {len(lexical)} chunks, k={k}, "
+          f"fetch_k={get_hybrid_fetch_k()}")
+
+    paths = {
+        "vector": lambda q: vector.invoke(q)[:k],
+        "bm25": lambda q: [doc for doc, _ in lexical.search(q, k)],
+        "hybrid": hybrid.invoke,
+    }
+    queries = _course_benchmark_queries(limit)
+    report = {}
+    for name, run in paths.items():
+        # Each path embeds its queries itself (the paths share query embeddings)
+        clear_caches()
+        hits, timings = 0, []
+        for query, relevant in queries:
+            start = time.perf_counter()
+            docs = run(query)
+            timings.append((time.perf_counter() - start) * 1000)
+            hits += any(doc.metadata.get("source", "").endswith(relevant) for doc in docs)
+        timings.sort()
+        report[name] = {
+            "recall_at_k": hits / len(queries),
+            "p50_ms": timings[len(timings) // 2],
+            "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        }
+        print(f"   {name:7s} recall@{k} {report[name]['recall_at_k']:.2f}  "
+              f"p50 {report[name]['p50_ms']:.1f} ms  p95 {report[name]['p95_ms']:.1f} ms")
+    return report
+
+
+if __name__ == "__main__":
+    import sys
+    benchmark(sys.argv[1] if len(sys.argv) > 1 else "courses")
@@ -0,0 +1,103 @@
+"""
+Shared LLM Clients
+One process-wide, size-bounded HTTP connection pool for every LLM and
+embedding client (agents, coordinator, clarification handler, RAG).
+
+Both a sync ``httpx.Client`` and an async ``httpx.AsyncClient`` are kept, so
+the same ChatOpenAI instance serves ``invoke`` (CLI, Streamlit) and
+``ainvoke`` (FastAPI) without each caller opening its own TCP pool.
+
+Note: the async client must be used from a single event loop (the API's).
+"""
+import threading
+from typing import Optional
+
+import httpx
+from langchain_openai import ChatOpenAI
+
+from config import (
+    get_agent_model, get_agent_temperature,
+    get_coordinator_model, get_coordinator_temperature,
+    get_openai_base_url, get_llm_request_timeout, get_llm_pool_limits
+)
+from llm_record_replay import wrap_chat_model
+
+_lock = threading.Lock()
+_http_client: Optional[httpx.Client] = None
+_async_http_client: Optional[httpx.AsyncClient] = None
+
+
+def _pool_limits() -> httpx.Limits:
+    max_connections, max_keepalive = get_llm_pool_limits()
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive
+    )
+
+
+def get_http_client() -> httpx.Client:
+    """Shared sync HTTP client (created on first use)."""
+    global _http_client
+    if _http_client is None:
+        with _lock:
+            if _http_client is None:
+                # SSL verification disabled to match the existing proxy setup
+                _http_client = httpx.Client(
+                    verify=False,
+                    timeout=get_llm_request_timeout(),
+                    limits=_pool_limits()
+                )
+    return _http_client
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Shared async HTTP client (created on first use)."""
+    global _async_http_client
+    if _async_http_client is None:
+        with _lock:
+            if _async_http_client is None:
+                _async_http_client = httpx.AsyncClient(
+                    verify=False,
+                    timeout=get_llm_request_timeout(),
+                    limits=_pool_limits()
+                )
+    return _async_http_client
+
+
+def create_chat_model(model: str, temperature: float) -> ChatOpenAI:
+    """Build a ChatOpenAI bound to the shared sync and async connection pools."""
+    timeout = get_llm_request_timeout()
+    llm_kwargs = {
+        "model": model,
+        "temperature": temperature,
+        "http_client": get_http_client(),
+        "http_async_client": get_async_http_client(),
+        "request_timeout": timeout
+    }
+    base_url = get_openai_base_url()
+    if base_url:
+        llm_kwargs["base_url"] = base_url
+
+    # Recorded or replayed when LLM_CACHE_MODE is set (see llm_record_replay.py)
+    return wrap_chat_model(ChatOpenAI(**llm_kwargs))
+
+
+def get_agent_llm() -> ChatOpenAI:
+    """LLM for domain agents (faster, cost-effective model)."""
+    return create_chat_model(get_agent_model(), get_agent_temperature())
+
+
+def get_coordinator_llm() -> ChatOpenAI:
+    """LLM for the coordinator and clarification handler (stronger model)."""
+    return create_chat_model(get_coordinator_model(), get_coordinator_temperature())
+
+
+async def aclose_http_clients():
+    """Close the shared pools (call on application shutdown)."""
+    global _http_client, _async_http_client
+    if _async_http_client is not None:
+        await _async_http_client.aclose()
+        _async_http_client = None
+    if _http_client is not None:
+        _http_client.close()
+        _http_client = None
@@ -0,0 +1,320 @@
+"""
+LLM Record/Replay Cache
+Makes the multi-agent graph runnable offline and deterministic, for
+profiling, load tests and regression tests.
+
+Every chat model built by llm_clients.create_chat_model (coordinator,
+clarification handler, all BaseAgent LLMs) and the query embedding model
+are wrapped according to LLM_CACHE_MODE:
+
+- passthrough (default): no wrapping, calls go straight to OpenAI
+- record: every call goes to OpenAI and the response is stored
+- replay: every call is answered from the store; a call that was never
+  recorded raises ReplayMiss instead of touching the network
+
+Entries are keyed by sha256(model, temperature, messages, stop) for chat
+calls and sha256(model, text) for query embeddings, and live in one SQLite
+file (LLM_CACHE_PATH). Recorded latencies are kept, so replay can either
+return at once (LLM_REPLAY_LATENCY=none) or sleep the recorded time
+(=recorded) for realistic but reproducible timings.
+
+Typical use:
+
+    LLM_CACHE_MODE=record python test_planning.py    # online, fills the store
+    LLM_CACHE_MODE=replay python test_planning.py    # offline, same answers
+
+In replay mode OPENAI_API_KEY can be any value; index builds still embed
+documents through the persistent embedding cache (embedding_cache.py).
+"""
+import asyncio
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterator, AsyncIterator, List, Optional, Tuple
+
+from langchain_core.embeddings import Embeddings
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+from config import get_llm_cache_mode, get_llm_cache_path, get_llm_replay_latency
+
+MODES = ("passthrough", "record", "replay")
+
+
+class ReplayMiss(RuntimeError):
+    """A replayed run made a call that was never recorded."""
+
+
+class RecordReplayStore:
+    """SQLite store of recorded responses, keyed by request hash."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            "key TEXT PRIMARY KEY, kind TEXT NOT NULL, model TEXT NOT NULL, "
+            "payload TEXT NOT NULL, latency_ms REAL NOT NULL, recorded_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def key(*parts: Any) -> str:
+        return hashlib.sha256(json.dumps(parts, ensure_ascii=False, default=str).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """(payload, recorded latency in ms), or None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, latency_ms FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(row[0]), row[1]
+
+    def put(self, key: str, kind: str, model: str, payload: Any, latency_ms: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, kind, model, payload, latency_ms, recorded_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, kind, model, json.dumps(payload, ensure_ascii=False), latency_ms, time.time())
+            )
+            self._conn.commit()
+            self.recorded += 1
+
+    def size(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "entries": self.size(),
+            "hits": self.hits,
+            "misses": self.misses,
+            "recorded": self.recorded
+        }
+
+
+def _message_parts(messages) -> List[Tuple[str, str]]:
+    """(role, content) pairs of a chat input (a string or a list of messages)."""
+    if isinstance(messages, str):
+        return [("human", messages)]
+    parts = []
+    for message in messages:
+        content = message.content if isinstance(message.content, str) else json.dumps(message.content, default=str)
+        parts.append((getattr(message, "type", message.__class__.__name__), content))
+    return parts
+
+
+def _replay_chunks(text: str) -> List[str]:
+    """Split a replayed answer into word-sized stream chunks."""
+    return re.findall(r"\S+\s*|\s+", text) or [text]
+
+
+class RecordReplayChatModel:
+    """
+    Chat model wrapper that records or replays invoke/ainvoke/stream/astream.
+
+    Anything else (model_name, temperature, ...) is read from the wrapped model.
+    """
+
+    def __init__(self, llm, store: RecordReplayStore, mode: str, replay_latency: str = "none"):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown LLM cache mode for wrapping: {mode}")
+        self.llm = llm
+        self.store = store
+        self.mode = mode
+        self.replay_latency = replay_latency
+
+    def __getattr__(self, name):
+        # Only called for attributes not set in __init__
+        return getattr(self.llm, name)
+
+    @property
+    def model(self) -> str:
+        return getattr(self.llm, "model_name", None) or getattr(self.llm, "model", "unknown")
+
+    def _key(self, messages, stop=None) -> str:
+        return self.store.key("chat", self.model, getattr(self.llm, "temperature", None),
+                              _message_parts(messages), stop)
+
+    def _replay(self, key: str) -> Tuple[str, float]:
+        entry = self.store.get(key)
+        if entry is None:
+            raise ReplayMiss(f"No recorded {self.model} response for this prompt "
+                             f"(record it with LLM_CACHE_MODE=record); key {key[:12]}")
+        payload, latency_ms = entry
+        return payload["content"], (latency_ms / 1000 if self.replay_latency == "recorded" else 0.0)
+
+    def _record(self, key: str, content: str, start: float):
+        latency_ms = (time.perf_counter() - start) * 1000
+        self.store.put(key, "chat", self.model, {"content": content}, latency_ms)
+
+    def invoke(self, messages, config=None, *, stop=None, **kwargs):
+        key = self._key(messages, stop)
+        if self.mode == "replay":
+            content, delay = self._replay(key)
+            if delay:
+                time.sleep(delay)
+            return AIMessage(content=content)
+        start = time.perf_counter()
+        response = self.llm.invoke(messages, config, stop=stop, **kwargs)
+        self._record(key, response.content, start)
+        return response
+
+    async def ainvoke(self, messages, config=None, *, stop=None, **kwargs):
+        key = self._key(messages, stop)
+        if self.mode == "replay":
+            content, delay = self._replay(key)
+            if delay:
+                await asyncio.sleep(delay)
+            return AIMessage(content=content)
+        start = time.perf_counter()
+        response = await self.llm.ainvoke(messages, config, stop=stop, **kwargs)
+        self._record(key, response.content, start)
+        return response
+
+    def stream(self, messages, config=None, *, stop=None, **kwargs) -> Iterator[AIMessageChunk]:
+        key = self._key(messages, stop)
+        if self.mode == "replay":
+            content, delay = self._replay(key)
+            chunks = _replay_chunks(content)
+            for piece in chunks:
+                if delay:
+                    time.sleep(delay / len(chunks))
+                yield AIMessageChunk(content=piece)
+            return
+        start = time.perf_counter()
+        parts = []
+        for chunk in self.llm.stream(messages, config, stop=stop, **kwargs):
+            if chunk.content:
+                parts.append(chunk.content)
+            yield chunk
+        # Only complete streams are recorded
+        self._record(key, "".join(parts), start)
+
+    async def astream(self, messages, config=None, *, stop=None, **kwargs) -> AsyncIterator[AIMessageChunk]:
+        key = self._key(messages, stop)
+        if self.mode == "replay":
+            content, delay = self._replay(key)
+            chunks = _replay_chunks(content)
+            for piece in chunks:
+                if delay:
+                    await asyncio.sleep(delay / len(chunks))
+                yield AIMessageChunk(content=piece)
+            return
+        start = time.perf_counter()
+        parts = []
+        async for chunk in self.llm.astream(messages, config, stop=stop, **kwargs):
+            if chunk.content:
+                parts.append(chunk.content)
+            yield chunk
+        self._record(key, "".join(parts), start)
+
+
+class RecordReplayEmbeddings(Embeddings):
+    """Records or replays query embeddings; document embeddings pass straight through."""
+
+    def __init__(self, embeddings: Embeddings, store: RecordReplayStore, mode: str,
+                 replay_latency: str = "none"):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown LLM cache mode for wrapping: {mode}")
+        self.embeddings = embeddings
+        self.store = store
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self.model = getattr(embeddings, "model", embeddings.__class__.__name__)
+
+    def _key(self, text: str) -> str:
+        return self.store.key("embedding", self.model, text)
+
+    def _replay(self, text: str) -> Tuple[List[float], float]:
+        entry = self.store.get(self._key(text))
+        if entry is None:
+            raise ReplayMiss(f"No recorded {self.model} embedding for query: {text[:60]!r}")
+        vector, latency_ms = entry
+        return vector, (latency_ms / 1000 if self.replay_latency == "recorded" else 0.0)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        if self.mode == "replay":
+            vector, delay = self._replay(text)
+            if delay:
+                time.sleep(delay)
+            return vector
+        start = time.perf_counter()
+        vector = self.embeddings.embed_query(text)
+        self.store.put(self._key(text), "embedding", self.model, list(vector),
+                       (time.perf_counter() - start) * 1000)
+        return vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        if self.mode == "replay":
+            vector, delay = self._replay(text)
+            if delay:
+                await asyncio.sleep(delay)
+            return vector
+        start = time.perf_counter()
+        vector = await self.embeddings.aembed_query(text)
+        self.store.put(self._key(text), "embedding", self.model, list(vector),
+                       (time.perf_counter() - start) * 1000)
+        return vector
+
+
+_store: Optional[RecordReplayStore] = None
+_store_lock = threading.Lock()
+
+
+def _mode() -> str:
+    mode = get_llm_cache_mode()
+    if mode not in MODES:
+        raise ValueError(f"LLM_CACHE_MODE must be one of {MODES}, got {mode!r}")
+    return mode
+
+
+def get_record_replay_store() -> RecordReplayStore:
+    """The shared store (opened on first use)."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = RecordReplayStore(get_llm_cache_path())
+    return _store
+
+
+def wrap_chat_model(llm):
+    """The chat model wrapped for the configured mode (unchanged in passthrough)."""
+    mode = _mode()
+    if mode == "passthrough":
+        return llm
+    return RecordReplayChatModel(llm, get_record_replay_store(), mode, get_llm_replay_latency())
+
+
+def wrap_query_embeddings(embeddings: Embeddings) -> Embeddings:
+    """The embedding model wrapped for the configured mode (unchanged in passthrough)."""
+    mode = _mode()
+    if mode == "passthrough":
+        return embeddings
+    return RecordReplayEmbeddings(embeddings, get_record_replay_store(), mode, get_llm_replay_latency())
+
+
+def llm_cache_stats() -> Dict[str, Any]:
+    """Mode and hit/miss/record counters of the record/replay store."""
+    mode = _mode()
+    if mode == "passthrough":
+        return {"mode": mode}
+    return {"mode": mode, **get_record_replay_store().stats()}
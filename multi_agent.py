@@ -1,18 +1,30 @@
 """
 Main Multi-Agent Workflow
 Implements dynamic routing with Coordinator managing agent execution.
+
+Agents the coordinator places in the same parallel stage are fanned out
+concurrently and joined before the coordinator decides the next step.
+
+Every node has a sync and an async implementation, so the compiled graph
+supports both ``app.invoke`` (CLI, Streamlit) and ``app.ainvoke`` (FastAPI).
+The async path never blocks an OS thread on LLM calls; all LLM traffic goes
+through the shared connection pool in llm_clients.py.
 """
-from typing import Dict, Any
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Tuple
 from langgraph.graph import StateGraph, START, END
-from langchain_core.messages import HumanMessage
+from langchain_core.messages import HumanMessage, AIMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 
-from blackboard.schema import BlackboardState, WorkflowStep
+from blackboard.schema import BlackboardState, WorkflowStep, AgentOutput
 from agents.programs_agent import ProgramsRequirementsAgent
 from agents.courses_agent import CourseSchedulingAgent
 from agents.policy_agent import PolicyComplianceAgent
 from agents.planning_agent import AcademicPlanningAgent
 from coordinator.coordinator import Coordinator
-from config import print_model_config
+from config import print_model_config, is_parallel_execution_enabled, get_max_parallel_agents
 
 # Print model configuration on startup
 print_model_config()
@@ -27,6 +39,121 @@ courses_agent = CourseSchedulingAgent()
 policy_agent = PolicyComplianceAgent()
 planning_agent = AcademicPlanningAgent()
 
+# Agent name → agent instance
+AGENT_REGISTRY = {
+    "programs_requirements": programs_agent,
+    "course_scheduling": courses_agent,
+    "policy_compliance": policy_agent,
+    "academic_planning": planning_agent,
+}
+
+# Agents whose plan options replace the blackboard's plan_options
+PLAN_AGENTS = ("programs_requirements", "academic_planning")
+
+# ============================================================================
+# EXECUTION HELPERS
+# ============================================================================
+
+def _run_agent(agent_name: str, state: BlackboardState) -> Tuple[AgentOutput, float]:
+    """Execute one agent against the current state, returning (output, elapsed ms)."""
+    start = time.perf_counter()
+    output = AGENT_REGISTRY[agent_name].execute(state)
+    return output, (time.perf_counter() - start) * 1000
+
+async def _arun_agent(agent_name: str, state: BlackboardState) -> Tuple[AgentOutput, float]:
+    """Async version of _run_agent()."""
+    start = time.perf_counter()
+    output = await AGENT_REGISTRY[agent_name].aexecute(state)
+    return output, (time.perf_counter() - start) * 1000
+
+def _record_stage(agents: List[str], wall_ms: float, agent_ms: Dict[str, float]) -> Dict[str, Any]:
+    """Build the timing delta for a completed stage."""
+    return {
+        "agent_timings": agent_ms,
+        "stage_timings": [{"agents": agents, "wall_ms": wall_ms, "agent_ms": agent_ms}]
+    }
+
+def _agent_delta(agent_name: str, output: AgentOutput) -> Dict[str, Any]:
+    """
+    Blackboard delta for one agent's output.
+
+    agent_outputs, risks and constraints have reducers in BlackboardState,
+    so only this agent's contribution is returned. plan_options has none:
+    the planning agents' options replace the previous ones.
+    """
+    delta = {
+        "agent_outputs": {agent_name: output},
+        "risks": output.risks,
+        "constraints": output.constraints
+    }
+    if agent_name in PLAN_AGENTS:
+        delta["plan_options"] = output.plan_options or []
+    return delta
+
+def _single_agent_update(agent_name: str, output: AgentOutput, elapsed_ms: float) -> Dict[str, Any]:
+    """Node update for a stage that ran a single agent."""
+    return {
+        **_agent_delta(agent_name, output),
+        **_record_stage([agent_name], elapsed_ms, {agent_name: elapsed_ms})
+    }
+
+def _stage_update(stage: List[str], results: Dict[str, Tuple[AgentOutput, float]],
+                  wall_ms: float) -> Dict[str, Any]:
+    """Concatenate the per-agent deltas of a parallel stage in stage order."""
+    update = {"agent_outputs": {}, "risks": [], "constraints": []}
+    agent_ms = {}
+    for name in stage:
+        output, elapsed_ms = results[name]
+        delta = _agent_delta(name, output)
+        update["agent_outputs"].update(delta["agent_outputs"])
+        for field in ("risks", "constraints"):
+            update[field].extend(delta[field])
+        if "plan_options" in delta:
+            update.setdefault("plan_options", []).extend(delta["plan_options"])
+        agent_ms[name] = elapsed_ms
+
+    print(f"   ⚡ Parallel stage {stage}: {wall_ms:.0f}ms wall-clock "
+          f"vs {sum(agent_ms.values()):.0f}ms sequential")
+
+    return {**update, **_record_stage(stage, wall_ms, agent_ms)}
+
+def _synthesis_update(state: BlackboardState, answer: str) -> Dict[str, Any]:
+    """Final node update once the answer is synthesized."""
+    metrics = _execution_metrics(state)
+    print(f"   ⚡ Agent time: {metrics['agent_wall_ms']:.0f}ms wall-clock, "
+          f"{metrics['agent_sequential_ms']:.0f}ms sequential (speedup {metrics['speedup']}x)")
+    
+    return {
+        "messages": [AIMessage(content=answer)],
+        "workflow_step": WorkflowStep.COMPLETE,
+        "execution_metrics": metrics
+    }
+
+def _on_token(config: RunnableConfig = None):
+    """Token callback passed as ``{"configurable": {"on_token": callback}}``, if any."""
+    return ((config or {}).get("configurable") or {}).get("on_token")
+
+def _next_stage(stages: List[List[str]], remaining: List[str]) -> List[str]:
+    """Return the pending agents of the first stage that still has work."""
+    for stage in stages:
+        pending = [a for a in stage if a in remaining]
+        if pending:
+            return pending
+    return remaining[:1]
+
+def _execution_metrics(state: BlackboardState) -> Dict[str, Any]:
+    """Summarize wall-clock agent time against the equivalent sequential time."""
+    stage_timings = state.get("stage_timings", [])
+    wall_ms = sum(s["wall_ms"] for s in stage_timings)
+    sequential_ms = sum(sum(s["agent_ms"].values()) for s in stage_timings)
+    return {
+        "parallel": is_parallel_execution_enabled(),
+        "stages": [s["agents"] for s in stage_timings],
+        "agent_wall_ms": round(wall_ms, 1),
+        "agent_sequential_ms": round(sequential_ms, 1),
+        "speedup": round(sequential_ms / wall_ms, 2) if wall_ms else 1.0
+    }
+
 # ============================================================================
 # NODES
 # ============================================================================
@@ -38,17 +165,12 @@ def coordinator_node(state: BlackboardState) -> Dict[str, Any]:
     
     if workflow_step == WorkflowStep.INITIAL:
         intent = coordinator.classify_intent(user_query)
-        workflow = coordinator.plan_workflow(intent)
-        
-        return {
-            "active_agents": workflow,
-            "workflow_step": WorkflowStep.AGENT_EXECUTION,
-            "next_agent": workflow[0] if workflow else None,
-            "user_goal": intent.get("intent_type", "")
-        }
+        return _initial_plan(intent)
     
     elif workflow_step == WorkflowStep.NEGOTIATION:
         negotiation_result = coordinator.manage_negotiation(state)
+        if negotiation_result.get("next_agent"):
+            negotiation_result["current_stage"] = [negotiation_result["next_agent"]]
         return negotiation_result
     
     else:
@@ -59,9 +181,11 @@ def coordinator_node(state: BlackboardState) -> Dict[str, Any]:
         
         remaining = [a for a in active_agents if a not in executed_agents]
         if remaining:
-            # More agents to execute
+            # More agents to execute - schedule the next stage
+            stage = _next_stage(state.get("parallel_stages", []), remaining)
             return {
-                "next_agent": remaining[0],
+                "next_agent": stage[0],
+                "current_stage": stage,
                 "workflow_step": WorkflowStep.AGENT_EXECUTION
             }
         else:
@@ -77,71 +201,112 @@ def coordinator_node(state: BlackboardState) -> Dict[str, Any]:
                     "workflow_step": WorkflowStep.SYNTHESIS
                 }
 
-def programs_node(state: BlackboardState) -> Dict[str, Any]:
-    """Programs agent execution."""
-    output = programs_agent.execute(state)
-    
-    agent_outputs = state.get("agent_outputs", {})
-    agent_outputs["programs_requirements"] = output
-    
-    plan_options = []
-    if output.plan_options:
-        plan_options = output.plan_options
+async def acoordinator_node(state: BlackboardState) -> Dict[str, Any]:
+    """Async coordinator node (only intent classification calls the LLM)."""
+    if state.get("workflow_step", WorkflowStep.INITIAL) == WorkflowStep.INITIAL:
+        intent = await coordinator.aclassify_intent(state.get("user_query", ""))
+        return _initial_plan(intent)
+    return coordinator_node(state)
+
+def _initial_plan(intent: Dict[str, Any]) -> Dict[str, Any]:
+    """Plan the workflow and its stages for a freshly classified intent."""
+    workflow = coordinator.plan_workflow(intent)
+    stages = coordinator.plan_stages(intent, workflow, parallel=is_parallel_execution_enabled())
+    first_stage = stages[0] if stages else []
     
     return {
-        "agent_outputs": agent_outputs,
-        "plan_options": plan_options,
-        "risks": state.get("risks", []) + output.risks,
-        "constraints": state.get("constraints", []) + output.constraints
+        "active_agents": workflow,
+        "parallel_stages": stages,
+        "current_stage": first_stage,
+        "workflow_step": WorkflowStep.AGENT_EXECUTION,
+        "next_agent": first_stage[0] if first_stage else None,
+        "user_goal": intent.get("intent_type", "")
     }
 
+def programs_node(state: BlackboardState) -> Dict[str, Any]:
+    """Programs agent execution."""
+    return _single_agent_update("programs_requirements", *_run_agent("programs_requirements", state))
+
+async def aprograms_node(state: BlackboardState) -> Dict[str, Any]:
+    """Programs agent execution (async)."""
+    return _single_agent_update("programs_requirements", *await _arun_agent("programs_requirements", state))
+
 def courses_node(state: BlackboardState) -> Dict[str, Any]:
     """Courses agent execution."""
-    output = courses_agent.execute(state)
-    
-    agent_outputs = state.get("agent_outputs", {})
-    agent_outputs["course_scheduling"] = output
-    
-    return {
-        "agent_outputs": agent_outputs,
-        "risks": state.get("risks", []) + output.risks
-    }
+    return _single_agent_update("course_scheduling", *_run_agent("course_scheduling", state))
+
+async def acourses_node(state: BlackboardState) -> Dict[str, Any]:
+    """Courses agent execution (async)."""
+    return _single_agent_update("course_scheduling", *await _arun_agent("course_scheduling", state))
 
 def policy_node(state: BlackboardState) -> Dict[str, Any]:
     """Policy agent execution."""
-    output = policy_agent.execute(state)
+    return _single_agent_update("policy_compliance", *_run_agent("policy_compliance", state))
 
-    agent_outputs = state.get("agent_outputs", {})
-    agent_outputs["policy_compliance"] = output
-
-    return {
-        "agent_outputs": agent_outputs,
-        "risks": state.get("risks", []) + output.risks,
-        "constraints": state.get("constraints", []) + output.constraints
-    }
+async def apolicy_node(state: BlackboardState) -> Dict[str, Any]:
+    """Policy agent execution (async)."""
+    return _single_agent_update("policy_compliance", *await _arun_agent("policy_compliance", state))
 
 def planning_node(state: BlackboardState) -> Dict[str, Any]:
     """Academic planning agent execution."""
-    output = planning_agent.execute(state)
+    return _single_agent_update("academic_planning", *_run_agent("academic_planning", state))
 
-    agent_outputs = state.get("agent_outputs", {})
-    agent_outputs["academic_planning"] = output
+async def aplanning_node(state: BlackboardState) -> Dict[str, Any]:
+    """Academic planning agent execution (async)."""
+    return _single_agent_update("academic_planning", *await _arun_agent("academic_planning", state))
 
-    return {
-        "agent_outputs": agent_outputs,
-        "plan_options": output.plan_options,
-        "risks": state.get("risks", []) + output.risks,
-        "constraints": state.get("constraints", []) + output.constraints
-    }
+def parallel_stage_node(state: BlackboardState) -> Dict[str, Any]:
+    """
+    Fan-out / fan-in execution of the current stage.
 
-def synthesize_node(state: BlackboardState) -> Dict[str, Any]:
-    """Synthesize final answer."""
-    answer = coordinator.synthesize_answer(state)
-    
-    return {
-        "messages": [HumanMessage(content=answer)],
-        "workflow_step": WorkflowStep.COMPLETE
-    }
+    Every agent in the stage reads the same state snapshot and runs in its own
+    worker thread. The per-agent deltas are concatenated in stage order and
+    merged into the blackboard by the BlackboardState reducers.
+    """
+    stage = state.get("current_stage", [])
+    max_workers = max(1, min(len(stage), get_max_parallel_agents()))
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {name: pool.submit(_run_agent, name, state) for name in stage}
+        results = {name: future.result() for name, future in futures.items()}
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    return _stage_update(stage, results, wall_ms)
+
+async def aparallel_stage_node(state: BlackboardState) -> Dict[str, Any]:
+    """
+    Async fan-out / fan-in: the stage's agents run as concurrent coroutines
+    on the event loop, at most MAX_PARALLEL_AGENTS at a time.
+    """
+    stage = state.get("current_stage", [])
+    semaphore = asyncio.Semaphore(max(1, get_max_parallel_agents()))
+
+    async def run(name: str) -> Tuple[AgentOutput, float]:
+        async with semaphore:
+            return await _arun_agent(name, state)
+
+    start = time.perf_counter()
+    outputs = await asyncio.gather(*(run(name) for name in stage))
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    return _stage_update(stage, dict(zip(stage, outputs)), wall_ms)
+
+def synthesize_node(state: BlackboardState, config: RunnableConfig = None) -> Dict[str, Any]:
+    """
+    Synthesize final answer.
+
+    If the caller passes ``{"configurable": {"on_token": callback}}`` when
+    invoking/streaming the graph, answer tokens are forwarded to the callback
+    as the LLM generates them.
+    """
+    answer = coordinator.synthesize_answer(state, on_token=_on_token(config))
+    return _synthesis_update(state, answer)
+
+async def asynthesize_node(state: BlackboardState, config: RunnableConfig = None) -> Dict[str, Any]:
+    """Synthesize final answer (async; tokens stream via ``llm.astream``)."""
+    answer = await coordinator.asynthesize_answer(state, on_token=_on_token(config))
+    return _synthesis_update(state, answer)
 
 # ============================================================================
 # ROUTING FUNCTIONS
@@ -151,11 +316,14 @@ def route_after_coordinator(state: BlackboardState) -> str:
     """Route after coordinator decides next step."""
     workflow_step = state.get("workflow_step")
     next_agent = state.get("next_agent")
+    current_stage = state.get("current_stage") or []
 
     if workflow_step == WorkflowStep.SYNTHESIS:
         return "synthesize"
     elif workflow_step == WorkflowStep.USER_INPUT:
         return END
+    elif len(current_stage) > 1:
+        return "parallel_stage"
     elif next_agent == "programs_requirements":
         return "programs"
     elif next_agent == "course_scheduling":
@@ -195,13 +363,14 @@ def route_after_agent(state: BlackboardState) -> str:
 
 workflow = StateGraph(BlackboardState)
 
-# Add nodes
-workflow.add_node("coordinator", coordinator_node)
-workflow.add_node("programs", programs_node)
-workflow.add_node("courses", courses_node)
-workflow.add_node("policy", policy_node)
-workflow.add_node("planning", planning_node)
-workflow.add_node("synthesize", synthesize_node)
+# Add nodes (sync implementation for invoke/stream, async for ainvoke/astream)
+workflow.add_node("coordinator", RunnableLambda(coordinator_node, afunc=acoordinator_node))
+workflow.add_node("programs", RunnableLambda(programs_node, afunc=aprograms_node))
+workflow.add_node("courses", RunnableLambda(courses_node, afunc=acourses_node))
+workflow.add_node("policy", RunnableLambda(policy_node, afunc=apolicy_node))
+workflow.add_node("planning", RunnableLambda(planning_node, afunc=aplanning_node))
+workflow.add_node("parallel_stage", RunnableLambda(parallel_stage_node, afunc=aparallel_stage_node))
+workflow.add_node("synthesize", RunnableLambda(synthesize_node, afunc=asynthesize_node))
 
 # Add edges
 workflow.add_edge(START, "coordinator")
@@ -210,6 +379,7 @@ workflow.add_conditional_edges("programs", route_after_agent)
 workflow.add_conditional_edges("courses", route_after_agent)
 workflow.add_conditional_edges("policy", route_after_agent)
 workflow.add_conditional_edges("planning", route_after_agent)
+workflow.add_conditional_edges("parallel_stage", route_after_agent)
 workflow.add_edge("synthesize", END)
 
 # Compile
@@ -249,4 +419,5 @@ if __name__ == "__main__":
         print(f"\n{agent_name}:")
         print(f"  Answer: {output.answer[:200]}...")
         print(f"  Confidence: {output.confidence}")
+    print(f"\nExecution metrics: {result.get('execution_metrics', {})}")
 
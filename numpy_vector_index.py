@@ -0,0 +1,363 @@
+"""
+NumPy Vector Index
+Exact (brute-force) cosine search over a domain's chunk embeddings, kept as
+one memory-mapped matrix next to the Chroma files:
+
+    numpy_vectors.<version>.bin      n x dim float32 (or int8) rows, L2-normalized
+    numpy_vectors.<version>.scales   n float32 row scales (int8 only)
+    numpy_vectors.json               sidecar: dim, dtype, chunk IDs, texts,
+                                     metadata, and the vector files it belongs to
+
+An export writes a new version of the vector files first and then switches
+to it with one rename of the sidecar, so a reader always pairs a sidecar
+with the matrix it was written for.
+
+Each domain holds a few thousand chunks, so a single matrix-vector product
+is as fast as Chroma's HNSW graph, exact, and needs no SQLite or graph load
+at startup. The matrix is an np.memmap: opening the index reads only the
+sidecar, and forked API workers share the pages.
+
+Chroma stays the store that index builds and incremental updates write to;
+this index is exported from it (stored embeddings, no API calls) and
+re-exported whenever the domain's index manifest changes.
+
+Select it per domain with VECTOR_BACKENDS (config.py), e.g.
+VECTOR_BACKENDS=courses=numpy,policies=numpy. int8 storage
+(NUMPY_INDEX_DTYPE=int8) quarters the matrix size.
+
+Benchmark against Chroma (no API key needed; stored vectors are the queries):
+
+    python numpy_vector_index.py courses
+"""
+import glob
+import hashlib
+import json
+import os
+import uuid
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.retrievers import BaseRetriever
+
+VECTORS_FILE = "numpy_vectors.bin"
+SCALES_FILE = "numpy_vectors.scales"
+SIDECAR_FILE = "numpy_vectors.json"
+MANIFEST_FILE = "index_manifest.json"
+DTYPES = {"float32": np.float32, "int8": np.int8}
+# Rows widened to float32 per step when searching an int8 matrix
+INT8_BLOCK_ROWS = 1024
+
+
+def _source_signature(db_path: str) -> Optional[str]:
+    """sha256 of the domain's index manifest (changes with every index update)."""
+    path = os.path.join(db_path, MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+# ============================================================================
+# Index
+# ============================================================================
+
+class NumpyVectorIndex:
+    """Memory-mapped, normalized chunk embeddings with exact cosine search."""
+
+    def __init__(self, db_path: str):
+        with open(os.path.join(db_path, SIDECAR_FILE), 'r', encoding='utf-8') as f:
+            sidecar = json.load(f)
+        self.db_path = db_path
+        self.source = sidecar.get("source")
+        self.dtype = sidecar["dtype"]
+        self.ids: List[str] = sidecar["ids"]
+        self.chunks: List[Tuple[str, dict]] = [tuple(chunk) for chunk in sidecar["chunks"]]
+        count, dim = len(self.ids), sidecar["dim"]
+        self.dim = dim
+
+        # Sidecars written before versioned exports name no files
+        self.vectors_file = sidecar.get("vectors_file", VECTORS_FILE)
+        self.scales_file = sidecar.get("scales_file", SCALES_FILE)
+
+        if count:
+            vectors_path = os.path.join(db_path, self.vectors_file)
+            expected = count * dim * np.dtype(DTYPES[self.dtype]).itemsize
+            if os.path.getsize(vectors_path) != expected:
+                raise ValueError(f"{vectors_path} does not hold {count} x {dim} {self.dtype} rows")
+            self.vectors = np.memmap(vectors_path, dtype=DTYPES[self.dtype], mode='r', shape=(count, dim))
+        else:
+            self.vectors = np.zeros((0, dim), dtype=DTYPES[self.dtype])
+        self.scales = None
+        if self.dtype == "int8" and count:
+            self.scales = np.fromfile(os.path.join(db_path, self.scales_file), dtype=np.float32)
+            if len(self.scales) != count:
+                raise ValueError(f"{self.scales_file} does not hold {count} row scales")
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _scores(self, queries: np.ndarray) -> np.ndarray:
+        """Cosine similarities, shape (n chunks, n queries)."""
+        queries = _normalize(np.asarray(queries, dtype=np.float32))
+        if self.scales is None:
+            return self.vectors @ queries.T
+        # int8 @ float32 has no BLAS kernel; widen a block of rows at a time
+        scores = np.empty((len(self.ids), len(queries)), dtype=np.float32)
+        for start in range(0, len(self.ids), INT8_BLOCK_ROWS):
+            block = self.vectors[start:start + INT8_BLOCK_ROWS].astype(np.float32)
+            scores[start:start + INT8_BLOCK_ROWS] = block @ queries.T
+        return scores * self.scales[:, None]
+
+    @staticmethod
+    def _top(column: np.ndarray, k: int) -> np.ndarray:
+        if k >= len(column):
+            return np.argsort(-column)
+        top = np.argpartition(-column, k - 1)[:k]
+        return top[np.argsort(-column[top])]
+
+    def search(self, query: Sequence[float], k: int = 5) -> List[Tuple[int, float]]:
+        """(chunk position, cosine similarity) of the k nearest chunks."""
+        return self.search_batch([query], k)[0]
+
+    def search_batch(self, queries: Sequence[Sequence[float]], k: int = 5) -> List[List[Tuple[int, float]]]:
+        """Nearest chunks for several query vectors with one matrix product."""
+        if not len(self.ids) or not len(queries):
+            return [[] for _ in queries]
+        scores = self._scores(np.atleast_2d(np.asarray(queries, dtype=np.float32)))
+        results = []
+        for j in range(scores.shape[1]):
+            column = scores[:, j]
+            results.append([(int(i), float(column[i])) for i in self._top(column, k)])
+        return results
+
+    def document(self, position: int) -> Document:
+        text, metadata = self.chunks[position]
+        return Document(page_content=text, metadata=dict(metadata))
+
+
+def export_numpy_index(db_path: str, vectorstore, dtype: str = "float32") -> NumpyVectorIndex:
+    """Write the index files from the embeddings already stored in a Chroma collection."""
+    if dtype not in DTYPES:
+        raise ValueError(f"Unknown numpy index dtype: {dtype} (expected one of {list(DTYPES)})")
+    data = vectorstore.get(include=["embeddings", "documents", "metadatas"])
+    ids = list(data["ids"])
+    embeddings = data["embeddings"]
+    matrix = _normalize(np.asarray(embeddings, dtype=np.float32)) if len(ids) else np.zeros((0, 0), np.float32)
+    dim = int(matrix.shape[1]) if len(ids) else 0
+
+    # New vector files never overwrite the ones a current sidecar names
+    version = uuid.uuid4().hex[:12]
+    stem, ext = os.path.splitext(VECTORS_FILE)
+    vectors_file = f"{stem}.{version}{ext}"
+    scales_file = f"{stem}.{version}{os.path.splitext(SCALES_FILE)[1]}"
+    if dtype == "int8":
+        # Per-row scale so every row uses the full int8 range
+        scales = np.maximum(np.abs(matrix).max(axis=1), 1e-12) / 127.0 if len(ids) else np.zeros(0, np.float32)
+        quantized = np.round(matrix / scales[:, None]).astype(np.int8) if len(ids) else matrix.astype(np.int8)
+        quantized.tofile(os.path.join(db_path, vectors_file))
+        scales.astype(np.float32).tofile(os.path.join(db_path, scales_file))
+    else:
+        matrix.tofile(os.path.join(db_path, vectors_file))
+
+    sidecar_path = os.path.join(db_path, SIDECAR_FILE)
+    previous = _sidecar_files(sidecar_path)
+    sidecar = {
+        "source": _source_signature(db_path),
+        "dtype": dtype,
+        "dim": dim,
+        "vectors_file": vectors_file,
+        "scales_file": scales_file if dtype == "int8" else None,
+        "ids": ids,
+        "chunks": [[text or "", metadata or {}] for text, metadata in zip(data["documents"], data["metadatas"])]
+    }
+    tmp_path = f"{sidecar_path}.tmp-{os.getpid()}"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(sidecar, f, ensure_ascii=False)
+    # The switch: one rename
+    os.replace(tmp_path, sidecar_path)
+
+    # Keep the previous version for readers that just read the old sidecar;
+    # older ones go (indexes opened earlier keep their files mapped until closed)
+    keep = {vectors_file, scales_file} | previous
+    for pattern in (f"{stem}*{ext}", f"{stem}*{os.path.splitext(SCALES_FILE)[1]}"):
+        for path in glob.glob(os.path.join(db_path, pattern)):
+            if os.path.basename(path) not in keep:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+    return NumpyVectorIndex(db_path)
+
+
+def _sidecar_files(sidecar_path: str) -> set:
+    """Vector files named by the sidecar currently in place (empty if unreadable)."""
+    try:
+        with open(sidecar_path, 'r', encoding='utf-8') as f:
+            sidecar = json.load(f)
+    except (OSError, ValueError):
+        return set()
+    return {sidecar.get("vectors_file", VECTORS_FILE), sidecar.get("scales_file") or SCALES_FILE}
+
+
+def open_numpy_index(db_path: str, dtype: str = "float32", chroma_factory=None) -> NumpyVectorIndex:
+    """
+    Open a domain's numpy index, (re)exporting it from Chroma first when it
+    is missing, stale (manifest changed) or stored with another dtype.
+
+    chroma_factory() must return the domain's Chroma store; it is only
+    called when an export is needed.
+    """
+    try:
+        if os.path.exists(os.path.join(db_path, SIDECAR_FILE)):
+            index = NumpyVectorIndex(db_path)
+            if index.source == _source_signature(db_path) and index.dtype == dtype:
+                return index
+    except (OSError, ValueError, KeyError) as e:
+        print(f"⚠️  Ignoring unreadable numpy index in {db_path}: {e}")
+    if chroma_factory is None:
+        raise FileNotFoundError(f"No current numpy index in {db_path}")
+    index = export_numpy_index(db_path, chroma_factory(), dtype)
+    print(f"📦 Exported {len(index)} chunk vectors ({dtype}) to {os.path.join(db_path, index.vectors_file)}")
+    return index
+
+
+# ============================================================================
+# Vector store / retriever interface
+# ============================================================================
+
+class NumpyVectorRetriever(BaseRetriever):
+    """Top-k chunks by exact cosine similarity from a NumpyVectorIndex."""
+
+    index: Any
+    embeddings: Any
+    k: int = 5
+
+    def _documents(self, hits: List[Tuple[int, float]]) -> List[Document]:
+        return [self.index.document(position) for position, _ in hits]
+
+    def _get_relevant_documents(self, query: str, *,
+                                run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        return self._documents(self.index.search(self.embeddings.embed_query(query), self.k))
+
+    async def _aget_relevant_documents(self, query: str, *,
+                                       run_manager: AsyncCallbackManagerForRetrieverRun) -> List[Document]:
+        vector = await self.embeddings.aembed_query(query)
+        return self._documents(self.index.search(vector, self.k))
+
+    def batch_search(self, queries: List[str]) -> List[List[Document]]:
+        """Several queries: one embedding request and one matrix product."""
+        if not queries:
+            return []
+        vectors = self.embeddings.embed_documents(queries)
+        return [self._documents(hits) for hits in self.index.search_batch(vectors, self.k)]
+
+
+class NumpyVectorStore:
+    """
+    The part of the Chroma vector store API that get_retriever uses
+    (as_retriever and get), served from a NumpyVectorIndex.
+    """
+
+    def __init__(self, index: NumpyVectorIndex, embeddings):
+        self.index = index
+        self.embeddings = embeddings
+
+    def as_retriever(self, search_kwargs: Dict[str, Any] = None) -> NumpyVectorRetriever:
+        k = (search_kwargs or {}).get("k", 4)
+        return NumpyVectorRetriever(index=self.index, embeddings=self.embeddings, k=k)
+
+    def get(self, include: List[str] = None) -> Dict[str, list]:
+        return {
+            "ids": list(self.index.ids),
+            "documents": [text for text, _ in self.index.chunks],
+            "metadatas": [metadata for _, metadata in self.index.chunks]
+        }
+
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+
+def _rss_mb() -> float:
+    """Resident set size of this process (Linux; 0 elsewhere)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2 ** 20
+    except (OSError, ValueError):
+        return 0.0
+
+
+def benchmark(domain: str = "courses", k: int = 5, queries: int = 200, batch: int = 16):
+    """Startup, memory, query latency and top-k agreement: Chroma vs numpy (float32 / int8)."""
+    import shutil
+    import tempfile
+    import time
+    from langchain_community.vectorstores import Chroma
+    from rag_engine_improved import get_db_path, QUERY_EMBEDDINGS
+
+    db_path = get_db_path(domain)
+    print(f"Benchmarking domain '{domain}' at {db_path}")
+
+    rss = _rss_mb()
+    start = time.perf_counter()
+    chroma = Chroma(persist_directory=db_path, embedding_function=QUERY_EMBEDDINGS)
+    stored = chroma.get(include=["embeddings"])
+    chroma_open = (time.perf_counter() - start) * 1000
+    chroma_rss = _rss_mb() - rss
+
+    rng = np.random.default_rng(0)
+    sample = rng.choice(len(stored["ids"]), size=min(queries, len(stored["ids"])), replace=False)
+    probes = np.asarray(stored["embeddings"], dtype=np.float32)[sample]
+    # Perturb so a probe is not trivially its own nearest neighbour
+    probes = probes + rng.normal(0, 0.01, probes.shape).astype(np.float32)
+
+    def timed(run):
+        timings, results = [], []
+        for probe in probes:
+            begin = time.perf_counter()
+            results.append(run(probe))
+            timings.append((time.perf_counter() - begin) * 1000)
+        timings.sort()
+        return results, timings[len(timings) // 2], timings[int(len(timings) * 0.95)]
+
+    chroma_ids, c50, c95 = timed(
+        lambda v: [d.page_content for d in chroma.similarity_search_by_vector(v.tolist(), k=k)]
+    )
+    print(f"   chroma          open {chroma_open:7.1f} ms  rss +{chroma_rss:6.1f} MB  "
+          f"p50 {c50:6.2f} ms  p95 {c95:6.2f} ms")
+
+    scratch = tempfile.mkdtemp()
+    try:
+        for dtype in DTYPES:
+            export_numpy_index(scratch, chroma, dtype)
+            rss = _rss_mb()
+            start = time.perf_counter()
+            index = NumpyVectorIndex(scratch)
+            opened = (time.perf_counter() - start) * 1000
+            numpy_texts, n50, n95 = timed(lambda v: [index.chunks[i][0] for i, _ in index.search(v, k)])
+            agreement = np.mean([len(set(a) & set(b)) / k for a, b in zip(numpy_texts, chroma_ids)])
+
+            begin = time.perf_counter()
+            for i in range(0, len(probes), batch):
+                index.search_batch(probes[i:i + batch], k)
+            per_query = (time.perf_counter() - begin) * 1000 / len(probes)
+            files = [index.vectors_file] + ([index.scales_file] if index.scales is not None else [])
+            size_mb = sum(os.path.getsize(os.path.join(scratch, name)) for name in files) / 2 ** 20
+            print(f"   numpy {dtype:8s}  open {opened:7.1f} ms  rss +{_rss_mb() - rss:6.1f} MB  "
+                  f"p50 {n50:6.2f} ms  p95 {n95:6.2f} ms  batched {per_query:5.2f} ms/query  "
+                  f"matrix {size_mb:5.1f} MB  top-{k} overlap with chroma {agreement:.2f}")
+            del index
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    import sys
+    benchmark(sys.argv[1] if len(sys.argv) > 1 else "courses")
@@ -12,7 +12,8 @@ import json
 import os
 import re
 from typing import Dict, List, Set, Optional, Tuple
-from collections import defaultdict
+
+from schedule_repository import build_offering_patterns, get_schedule_repository, term_key
 
 
 # ============================================================================
@@ -20,40 +21,8 @@ from collections import defaultdict
 # ============================================================================
 
 def load_course_schedules() -> Dict[str, dict]:
-    """Load all available course schedules."""
-    schedules = {}
-
-    # Check multiple possible locations
-    search_dirs = [
-        "./data/schedules",
-        "./data/courses/Schedule",
-        "./data/courses/schedule"
-    ]
-
-    for schedule_dir in search_dirs:
-        if not os.path.exists(schedule_dir):
-            continue
-
-        for filename in os.listdir(schedule_dir):
-            if not filename.endswith('.json'):
-                continue
-
-            filepath = os.path.join(schedule_dir, filename)
-
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-
-                # Extract term identifier
-                if "semester" in data:
-                    term = data["semester"]
-                    key = f"{term.get('year', '')}_{term.get('term', '')}".lower()
-                    schedules[key] = data
-
-            except Exception as e:
-                print(f"Warning: Could not load {filename}: {e}")
-
-    return schedules
+    """Load all available course schedules, keyed "2026_spring" (cached, see schedule_repository.py)."""
+    return get_schedule_repository().schedules_by_key()
 
 
 def load_program_requirements(program_name: str) -> Optional[dict]:
@@ -126,80 +95,27 @@ def load_sample_curriculum(program_name: str) -> Optional[List[dict]]:
 # Course Offering Analysis
 # ============================================================================
 
-def analyze_course_offerings(schedules: Dict[str, dict]) -> Dict[str, dict]:
-    """Analyze when courses are typically offered."""
-
-    offering_patterns = defaultdict(lambda: {
-        "fall": False,
-        "spring": False,
-        "semesters_offered": [],
-        "instructors": set(),
-        "sections": []
-    })
-
-    for schedule_key, schedule_data in schedules.items():
-        term = schedule_data.get("semester", {})
-        term_name = term.get("term", "").lower()
-        year = term.get("year", "")
-
-        for offering in schedule_data.get("offerings", []):
-            course_code = offering.get("course_code", "")
-
-            if not course_code:
-                continue
-
-            # Mark semester type
-            if "fall" in term_name:
-                offering_patterns[course_code]["fall"] = True
-            elif "spring" in term_name:
-                offering_patterns[course_code]["spring"] = True
-
-            # Record specific semester
-            offering_patterns[course_code]["semesters_offered"].append(
-                f"{term_name.title()} {year}"
-            )
-
-            # Collect instructors
-            for section in offering.get("sections", []):
-                instructor = section.get("instructor", "")
-                if instructor:
-                    offering_patterns[course_code]["instructors"].add(instructor)
-
-    # Convert sets to lists for JSON serialization
-    result = {}
-    for course_code, data in offering_patterns.items():
-        result[course_code] = {
-            "fall": data["fall"],
-            "spring": data["spring"],
-            "frequency": _determine_frequency(data["fall"], data["spring"]),
-            "semesters_offered": data["semesters_offered"],
-            "typical_instructors": list(data["instructors"])[:3]
-        }
-
-    return result
-
-
-def _determine_frequency(fall: bool, spring: bool) -> str:
-    """Determine offering frequency."""
-    if fall and spring:
-        return "every_semester"
-    elif fall:
-        return "fall_only"
-    elif spring:
-        return "spring_only"
-    else:
-        return "unknown"
-
+def analyze_course_offerings(schedules: Dict[str, dict] = None) -> Dict[str, dict]:
+    """
+    Analyze when courses are typically offered.
 
-def get_course_availability(course_code: str, semester: str,
-                            schedules: Dict[str, dict]) -> bool:
-    """Check if a course is available in a specific semester."""
+    Without arguments the prebuilt index of the shared schedule repository
+    is returned instead of re-scanning the schedules.
+    """
+    if schedules is None:
+        return get_schedule_repository().offering_patterns()
+    return build_offering_patterns(schedules)
 
-    # semester format: "2026_spring" or "fall_2025"
-    semester_key = semester.lower().replace(" ", "_")
 
-    if semester_key in schedules:
-        schedule = schedules[semester_key]
+def get_course_availability(course_code: str, semester: str,
+                            schedules: Dict[str, dict] = None) -> bool:
+    """Check if a course is available in a specific semester ("2026_spring", "Spring 2026", ...)."""
+    if schedules is None:
+        return get_schedule_repository().is_offered(course_code, semester)
+
+    key = term_key(semester)
+    schedule = schedules.get(f"{key[0]}_{key[1]}") if key else None
+    if schedule:
         for offering in schedule.get("offerings", []):
             if offering.get("course_code") == course_code:
                 return True
@@ -234,8 +150,18 @@ def extract_prerequisites(course_description: str) -> List[str]:
 
 
 def check_prerequisites_met(course_code: str, completed_courses: List[str],
-                            prereq_map: Dict[str, List[str]]) -> Tuple[bool, List[str]]:
-    """Check if prerequisites are met for a course."""
+                            prereq_map: Optional[Dict[str, List[str]]] = None) -> Tuple[bool, List[str]]:
+    """
+    Check if prerequisites are met for a course.
+
+    Without a prereq_map the compiled catalog graph (prereq_graph.py) is
+    used, which understands and/or structure, grade minimums and equivalents.
+    """
+
+    if prereq_map is None:
+        from prereq_graph import get_prereq_graph
+        result = get_prereq_graph().check(course_code, completed_courses)
+        return result.prereqs_met, result.missing
 
     required = prereq_map.get(course_code, [])
 
@@ -313,17 +239,37 @@ def generate_semester_sequence(start_term: str, num_semesters: int) -> List[str]
 
 
 def validate_plan(plan: Dict, requirements: Dict) -> Tuple[bool, List[str]]:
-    """Validate a plan against degree requirements."""
-
+    """
+    Validate a plan against degree requirements.
+
+    Args:
+        plan: {"semesters": [{"term", "courses"}], "completed_courses": [...]}
+        requirements: Requirement JSON as returned by load_program_requirements
+
+    Returns:
+        (is_valid, issues) - unmet requirements after the whole plan, plus
+        courses scheduled before their prerequisites
+    """
+    from degree_audit import audit_program
+    from degree_requirements import compile_program
+    from prereq_graph import get_prereq_graph, normalize_completed
+
+    graph = get_prereq_graph()
+    taken = dict(normalize_completed(plan.get("completed_courses", [])))
     issues = []
 
-    # Extract all courses in plan
-    all_courses = set()
+    # Prerequisite order: each semester may only use earlier semesters
     for semester in plan.get("semesters", []):
-        all_courses.update(semester.get("courses", []))
-
-    # Check core requirements
-    # This is simplified - you'd need to check against actual requirement structure
+        courses = [c for c in semester.get("courses", []) if re.fullmatch(r"[0-9A-Z]{2}-\d{3}", c)]
+        for code in courses:
+            result = graph.check(code, taken, concurrent=courses)
+            if not result.prereqs_met or result.missing_coreqs:
+                issues.append(f"{semester.get('term', 'Semester')}: {result.summary()}")
+        taken.update({code: None for code in courses})
+
+    # Degree requirements after the whole plan
+    audit = audit_program(compile_program(requirements), taken, graph)
+    issues.extend(f"Unmet requirement - {line}" for line in audit.remaining_requirements)
 
     return len(issues) == 0, issues
 
@@ -0,0 +1,582 @@
+"""
+Prerequisite Graph
+Compiles the "prereqs.text" strings of every course JSON into a
+deterministic prerequisite DAG, so agents no longer ask the LLM whether a
+student may take a course.
+
+Course files carry prerequisites such as:
+    "(15-150 [] at least C) and ((15-251 [] at least C) or (21-228 [] at least C))"
+
+Each expression is parsed into a boolean tree and compiled to disjunctive
+normal form (OR of AND-clauses). Every clause is stored as one bitmask per
+minimum grade, over a global course index, so checking a course against a
+student is a handful of integer AND operations:
+
+    graph = get_prereq_graph()
+    student = graph.student_state({"15-122": "B", "21-127": "A"})
+    graph.can_take("15-213", student)           # True
+    graph.check("15-251", student).missing      # cheapest set still needed
+
+Also compiled: co-requisites, anti-requisites, equivalent courses (taking
+18-213 counts as 15-213), and transitive closures (all prerequisites,
+prerequisites that cannot be avoided, dependents, minimum semester level).
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Letter grades that pass, ranked for "at least X" minimums
+GRADE_RANK = {"A": 4, "B": 3, "C": 2, "D": 1}
+# Passing grades without a letter (pass/fail, satisfactory, transfer credit)
+PASS_GRADES = {"P", "S", "T", "AP", "TR"}
+MIN_RANK = 1
+
+COURSE_CODE = r"[0-9A-Z]{2}-\d{3}"
+_TOKEN_RE = re.compile(
+    rf"\s*(?:(?P<lparen>\()|(?P<rparen>\))|(?P<op>and|or)\b|"
+    rf"(?P<course>{COURSE_CODE})\s*(?:\[[^\]]*\])?\s*(?:at least\s+(?P<grade>[A-D]))?)",
+    re.IGNORECASE
+)
+
+# Expression tree nodes: ("course", code, min_rank) | ("and", [nodes]) | ("or", [nodes])
+Node = Tuple
+# One DNF clause: frozenset of (code, min_rank)
+Clause = frozenset
+
+
+class PrereqParseError(ValueError):
+    """Raised when a prerequisite expression cannot be parsed."""
+
+
+# ============================================================================
+# Parsing
+# ============================================================================
+
+def parse_prereq_text(text: str) -> Optional[Node]:
+    """
+    Parse a prereqs.text string into an expression tree.
+
+    "and" binds tighter than "or" (the catalog parenthesizes mixed
+    expressions anyway). Returns None for an empty expression.
+    """
+    tokens = _tokenize(text or "")
+    if not tokens:
+        return None
+
+    pos = 0
+
+    def peek():
+        return tokens[pos] if pos < len(tokens) else None
+
+    def parse_or():
+        nonlocal pos
+        children = [parse_and()]
+        while peek() == ("op", "or"):
+            pos += 1
+            children.append(parse_and())
+        return children[0] if len(children) == 1 else ("or", children)
+
+    def parse_and():
+        nonlocal pos
+        children = [parse_atom()]
+        while peek() == ("op", "and"):
+            pos += 1
+            children.append(parse_atom())
+        return children[0] if len(children) == 1 else ("and", children)
+
+    def parse_atom():
+        nonlocal pos
+        token = peek()
+        if token is None:
+            raise PrereqParseError(f"Unexpected end of expression: {text!r}")
+        pos += 1
+        if token[0] == "course":
+            return token
+        if token == ("lparen",):
+            node = parse_or()
+            if peek() != ("rparen",):
+                raise PrereqParseError(f"Missing ')' in {text!r}")
+            pos += 1
+            return node
+        raise PrereqParseError(f"Unexpected {token[-1]!r} in {text!r}")
+
+    tree = parse_or()
+    if pos != len(tokens):
+        raise PrereqParseError(f"Trailing tokens in {text!r}")
+    return tree
+
+
+def _tokenize(text: str) -> List[tuple]:
+    tokens = []
+    pos = 0
+    text = text.strip()
+    while pos < len(text):
+        match = _TOKEN_RE.match(text, pos)
+        if not match or match.end() == pos:
+            raise PrereqParseError(f"Cannot parse {text[pos:]!r} in {text!r}")
+        pos = match.end()
+        if match.group("lparen"):
+            tokens.append(("lparen",))
+        elif match.group("rparen"):
+            tokens.append(("rparen",))
+        elif match.group("op"):
+            tokens.append(("op", match.group("op").lower()))
+        elif match.group("course"):
+            grade = (match.group("grade") or "D").upper()
+            tokens.append(("course", match.group("course").upper(), GRADE_RANK[grade]))
+        while pos < len(text) and text[pos].isspace():
+            pos += 1
+    return tokens
+
+
+def to_dnf(node: Optional[Node]) -> List[Clause]:
+    """Expand an expression tree into minimal AND-clauses (empty list = no prereqs)."""
+    if node is None:
+        return []
+    clauses = _expand(node)
+
+    # Absorption: a clause that contains another clause is redundant
+    minimal = []
+    for clause in sorted(set(clauses), key=len):
+        if not any(kept <= clause for kept in minimal):
+            minimal.append(clause)
+    return minimal
+
+
+def _expand(node: Node) -> List[Clause]:
+    if node[0] == "course":
+        return [frozenset([(node[1], node[2])])]
+    if node[0] == "or":
+        return [clause for child in node[1] for clause in _expand(child)]
+    clauses = [frozenset()]
+    for child in node[1]:
+        clauses = [left | right for left in clauses for right in _expand(child)]
+    return clauses
+
+
+def format_tree(node: Optional[Node]) -> str:
+    """Render an expression tree back to readable text."""
+    if node is None:
+        return "None"
+    if node[0] == "course":
+        grade = next(g for g, rank in GRADE_RANK.items() if rank == node[2])
+        return node[1] if node[2] == MIN_RANK else f"{node[1]} (min {grade})"
+    joiner = f" {node[0]} "
+    return joiner.join(
+        f"({format_tree(child)})" if child[0] != "course" else format_tree(child)
+        for child in node[1]
+    )
+
+
+# ============================================================================
+# Student state
+# ============================================================================
+
+@dataclass
+class StudentState:
+    """
+    Completed courses compiled to bitmasks: masks[rank] holds every course
+    passed with at least that grade rank (after equivalence credit).
+    Courses the graph has no bit for keep their best rank in ``other``.
+    """
+    completed: Dict[str, Optional[str]]
+    masks: Dict[int, int]
+    other: Dict[str, int] = field(default_factory=dict)
+
+
+@dataclass
+class PrereqCheck:
+    """Result of checking one course for one student."""
+    course_code: str
+    can_take: bool
+    prereqs_met: bool
+    prereq_text: str = ""
+    missing: List[str] = field(default_factory=list)       # cheapest clause still needed
+    missing_coreqs: List[str] = field(default_factory=list)
+    anti_req_conflicts: List[str] = field(default_factory=list)
+    already_completed: bool = False
+
+    def summary(self) -> str:
+        """One-line, human-readable verdict."""
+        if self.already_completed:
+            return f"{self.course_code}: already completed"
+        if self.can_take:
+            return f"{self.course_code}: prerequisites satisfied"
+        reasons = []
+        if not self.prereqs_met:
+            reasons.append(f"missing prerequisites {', '.join(self.missing) or '(unknown)'}")
+        if self.missing_coreqs:
+            reasons.append(f"one of co-requisites {', '.join(self.missing_coreqs)} must be taken first or concurrently")
+        if self.anti_req_conflicts:
+            reasons.append(f"anti-requisite already taken: {', '.join(self.anti_req_conflicts)}")
+        return f"{self.course_code}: cannot take yet - {'; '.join(reasons)}"
+
+
+def normalize_completed(completed) -> Dict[str, Optional[str]]:
+    """
+    Accept completed courses as codes, {code: grade}, or profile records
+    ({"course_code"/"code": ..., "grade": ...}) and return {code: grade}.
+    """
+    if not completed:
+        return {}
+    if isinstance(completed, dict):
+        return {str(code).upper(): grade for code, grade in completed.items()}
+
+    result = {}
+    for item in completed:
+        if isinstance(item, str):
+            result[item.upper()] = None
+        elif isinstance(item, dict):
+            code = item.get("course_code") or item.get("code")
+            if code:
+                result[str(code).upper()] = item.get("grade")
+        elif hasattr(item, "course_code"):
+            result[item.course_code.upper()] = getattr(item, "grade", None)
+    return result
+
+
+def completed_from_profile(profile: Optional[dict]) -> Dict[str, Optional[str]]:
+    """Completed courses of a student profile dict (CLI or API shape)."""
+    if not profile:
+        return {}
+    return normalize_completed(
+        profile.get("completed_courses") or profile.get("completed_course_codes") or []
+    )
+
+
+def _grade_rank(grade: Optional[str]) -> int:
+    """Rank of a grade (0 = not passed). Unknown grades count as passed."""
+    if grade is None or grade == "":
+        return max(GRADE_RANK.values())
+    grade = str(grade).strip().upper()
+    letter = grade[:1]
+    if letter in GRADE_RANK:
+        return GRADE_RANK[letter]
+    if grade in PASS_GRADES:
+        return MIN_RANK
+    return 0
+
+
+# ============================================================================
+# Graph
+# ============================================================================
+
+class PrereqGraph:
+    """Prerequisite DAG compiled from the course catalog."""
+
+    def __init__(self, courses: Dict[str, dict]):
+        self.courses = courses
+        self.index: Dict[str, int] = {}
+        self.trees: Dict[str, Optional[Node]] = {}
+        self.clauses: Dict[str, List[Clause]] = {}
+        self.parse_errors: Dict[str, str] = {}
+        self.coreqs: Dict[str, Set[str]] = {}
+        self.anti_reqs: Dict[str, Set[str]] = {}
+        self.credited_by: Dict[str, Set[str]] = {}
+        self._clause_masks: Dict[str, List[Tuple[Tuple[int, int], ...]]] = {}
+        self._coreq_masks: Dict[str, int] = {}
+        self._anti_masks: Dict[str, int] = {}
+
+        for code, data in courses.items():
+            self._compile_course(code, data)
+        self._compile_masks()
+        self._compile_closures()
+
+    # ------------------------------------------------------------------
+    # Compilation
+    # ------------------------------------------------------------------
+
+    def _bit(self, code: str) -> int:
+        """A course's bit, allocated on first use (compilation only)."""
+        if code not in self.index:
+            self.index[code] = len(self.index)
+        return 1 << self.index[code]
+
+    def _known_bit(self, code: str) -> int:
+        """A course's bit, or 0 for a course the graph never compiled.
+
+        Queries use this instead of _bit: the graph is shared between request
+        threads and must not change after compilation.
+        """
+        position = self.index.get(code)
+        return 0 if position is None else 1 << position
+
+    def _known_mask(self, codes: Iterable[str]) -> int:
+        mask = 0
+        for code in codes:
+            mask |= self._known_bit(code)
+        return mask
+
+    def _passed(self, code: str, student: StudentState, rank: int = MIN_RANK) -> bool:
+        bit = self._known_bit(code)
+        if bit:
+            return bool(student.masks[rank] & bit)
+        return student.other.get(code, 0) >= rank
+
+    def _compile_course(self, code: str, data: dict):
+        self._bit(code)
+        prereqs = data.get("prereqs") or {}
+        text = prereqs.get("text", "") if isinstance(prereqs, dict) else str(prereqs)
+        try:
+            tree = parse_prereq_text(text)
+        except PrereqParseError as e:
+            # Fall back to "all mentioned courses" rather than no prerequisites
+            self.parse_errors[code] = str(e)
+            codes = sorted(set(re.findall(COURSE_CODE, text)))
+            tree = ("and", [("course", c, MIN_RANK) for c in codes]) if codes else None
+        self.trees[code] = tree
+        self.clauses[code] = to_dnf(tree)
+
+        self.coreqs[code] = {item["code"] for item in data.get("co_reqs") or [] if item.get("code")}
+        self.anti_reqs[code] = {item["code"] for item in data.get("anti_reqs") or [] if item.get("code")}
+        for item in data.get("equiv") or []:
+            other = item.get("code")
+            if other and other != code:
+                self.credited_by.setdefault(other, set()).add(code)
+                self.credited_by.setdefault(code, set()).add(other)
+
+    def _mask(self, codes: Iterable[str]) -> int:
+        mask = 0
+        for code in codes:
+            mask |= self._bit(code)
+        return mask
+
+    def _compile_masks(self):
+        for code, clauses in self.clauses.items():
+            compiled = []
+            for clause in clauses:
+                by_rank: Dict[int, int] = {}
+                for req, rank in clause:
+                    by_rank[rank] = by_rank.get(rank, 0) | self._bit(req)
+                compiled.append(tuple(sorted(by_rank.items())))
+            self._clause_masks[code] = compiled
+            self._coreq_masks[code] = self._mask(self.coreqs[code])
+            self._anti_masks[code] = self._mask(self.anti_reqs[code])
+
+    def _compile_closures(self):
+        """Transitive prerequisites, unavoidable prerequisites, dependents, levels."""
+        self.direct: Dict[str, Set[str]] = {
+            code: {req for clause in clauses for req, _ in clause}
+            for code, clauses in self.clauses.items()
+        }
+        self.unavoidable_direct: Dict[str, Set[str]] = {
+            code: ({req for req, _ in clauses[0]}.intersection(*({r for r, _ in c} for c in clauses[1:]))
+                   if clauses else set())
+            for code, clauses in self.clauses.items()
+        }
+
+        self.closure = {code: self._reach(code, self.direct) for code in self.direct}
+        self.unavoidable = {code: self._reach(code, self.unavoidable_direct) for code in self.direct}
+
+        self.dependents: Dict[str, Set[str]] = {}
+        for code, reqs in self.closure.items():
+            for req in reqs:
+                self.dependents.setdefault(req, set()).add(code)
+
+        self.levels: Dict[str, int] = {}
+        for code in self.clauses:
+            self._level(code, set())
+
+    @staticmethod
+    def _reach(start: str, edges: Dict[str, Set[str]]) -> Set[str]:
+        seen = set()
+        stack = list(edges.get(start, ()))
+        while stack:
+            code = stack.pop()
+            if code in seen or code == start:
+                continue
+            seen.add(code)
+            stack.extend(edges.get(code, ()))
+        return seen
+
+    def _level(self, code: str, visiting: Set[str]) -> int:
+        """Fewest earlier semesters needed before a course (cycles count as 0)."""
+        if code in self.levels:
+            return self.levels[code]
+        clauses = self.clauses.get(code)
+        if not clauses or code in visiting:
+            return 0
+        visiting.add(code)
+        level = min(
+            1 + max(self._level(req, visiting) for req, _ in clause)
+            for clause in clauses
+        )
+        visiting.discard(code)
+        self.levels[code] = level
+        return level
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def student_state(self, completed) -> StudentState:
+        """Compile a student's completed courses (reuse it across many queries)."""
+        if isinstance(completed, StudentState):
+            return completed
+        grades = normalize_completed(completed)
+
+        best: Dict[str, int] = {}
+        for code, grade in grades.items():
+            rank = _grade_rank(grade)
+            if rank <= 0:
+                continue
+            for credited in {code} | self.credited_by.get(code, set()):
+                best[credited] = max(best.get(credited, 0), rank)
+
+        masks = {rank: 0 for rank in GRADE_RANK.values()}
+        other = {}
+        for code, rank in best.items():
+            bit = self._known_bit(code)
+            if not bit:
+                # No prerequisite mentions it; only has_passed() can ask about it
+                other[code] = rank
+                continue
+            for r in range(MIN_RANK, rank + 1):
+                masks[r] |= bit
+        return StudentState(completed=grades, masks=masks, other=other)
+
+    def prereqs_met(self, code: str, student) -> bool:
+        """Whether a student satisfies a course's prerequisite expression."""
+        student = self.student_state(student)
+        clauses = self._clause_masks.get(code)
+        if not clauses:
+            return True
+        masks = student.masks
+        return any(
+            all(mask & masks[rank] == mask for rank, mask in clause)
+            for clause in clauses
+        )
+
+    def can_take(self, code: str, student, concurrent: Iterable[str] = ()) -> bool:
+        """
+        Whether a student may register for a course: prerequisites met,
+        one of the listed co-requisites completed or taken concurrently
+        (catalog co-requisite lists are alternatives), no anti-requisite taken.
+        """
+        student = self.student_state(student)
+        if not self.prereqs_met(code, student):
+            return False
+        passed = student.masks[MIN_RANK]
+        coreq_mask = self._coreq_masks.get(code, 0)
+        if coreq_mask and not coreq_mask & (passed | self._known_mask(concurrent)):
+            return False
+        return not (self._anti_masks.get(code, 0) & passed)
+
+    def check(self, code: str, student, concurrent: Iterable[str] = ()) -> PrereqCheck:
+        """Detailed verdict for one course, including what is still missing."""
+        code = code.upper()
+        student = self.student_state(student)
+        prereqs_met = self.prereqs_met(code, student)
+
+        missing = []
+        if not prereqs_met:
+            # The clause that needs the fewest additional courses
+            def still_needed(clause):
+                return sorted(req for req, rank in clause if not self._passed(req, student, rank))
+            missing = min((still_needed(clause) for clause in self.clauses[code]), key=len)
+
+        concurrent = {c.upper() for c in concurrent}
+        coreqs = self.coreqs.get(code, set())
+        coreq_met = not coreqs or any(self._passed(req, student) or req in concurrent for req in coreqs)
+        missing_coreqs = [] if coreq_met else sorted(coreqs)
+        anti_conflicts = sorted(
+            req for req in self.anti_reqs.get(code, set()) if self._passed(req, student)
+        )
+
+        return PrereqCheck(
+            course_code=code,
+            can_take=prereqs_met and not missing_coreqs and not anti_conflicts,
+            prereqs_met=prereqs_met,
+            prereq_text=format_tree(self.trees.get(code)),
+            missing=missing,
+            missing_coreqs=missing_coreqs,
+            anti_req_conflicts=anti_conflicts,
+            already_completed=self._passed(code, student)
+        )
+
+    def has_passed(self, code: str, student, min_grade: Optional[str] = None) -> bool:
+        """Whether a student has credit for a course (directly or via an equivalent)."""
+        student = self.student_state(student)
+        rank = _grade_rank(min_grade) if min_grade else MIN_RANK
+        return self._passed(code, student, max(rank, MIN_RANK))
+
+    def eligible_courses(self, student, candidates: Optional[Iterable[str]] = None) -> List[str]:
+        """Courses (default: the whole catalog) a student can take now and has not completed."""
+        student = self.student_state(student)
+        return sorted(
+            code for code in (candidates if candidates is not None else self.courses)
+            if not self._passed(code, student) and self.can_take(code, student)
+        )
+
+    def direct_prerequisites(self, code: str) -> Set[str]:
+        """Every course that appears in a course's own prerequisite expression."""
+        return set(self.direct.get(code, set()))
+
+    def all_prerequisites(self, code: str) -> Set[str]:
+        """Transitive closure: every course that can appear below this one."""
+        return set(self.closure.get(code, set()))
+
+    def unavoidable_prerequisites(self, code: str) -> Set[str]:
+        """Transitive prerequisites present in every way of qualifying."""
+        return set(self.unavoidable.get(code, set()))
+
+    def all_dependents(self, code: str) -> Set[str]:
+        """Courses whose prerequisite tree mentions this course (transitively)."""
+        return set(self.dependents.get(code, set()))
+
+    def level(self, code: str) -> int:
+        """Minimum number of semesters of prerequisites before a course."""
+        return self.levels.get(code, 0)
+
+    def describe(self, code: str) -> Dict:
+        """Structured summary of a course's requisites (for agent prompts)."""
+        return {
+            "course_code": code,
+            "prerequisites": format_tree(self.trees.get(code)),
+            "prerequisite_options": [
+                sorted(req for req, _ in clause) for clause in self.clauses.get(code, [])
+            ],
+            "corequisites": sorted(self.coreqs.get(code, set())),
+            "anti_requisites": sorted(self.anti_reqs.get(code, set())),
+            "unavoidable_prerequisites": sorted(self.unavoidable_prerequisites(code)),
+            "min_semesters_of_prereqs": self.level(code)
+        }
+
+
+# ============================================================================
+# Shared instance
+# ============================================================================
+
+_graph: Optional[PrereqGraph] = None
+_graph_source: Optional[dict] = None
+
+
+def get_prereq_graph() -> PrereqGraph:
+    """
+    Graph over the course catalog loaded by course_tools (built on first use).
+
+    Rebuilt automatically when the catalog dict is swapped by a hot reload.
+    """
+    global _graph, _graph_source
+    from course_tools import DB
+    catalog = DB["courses"]
+    if _graph is None or _graph_source is not catalog:
+        _graph = PrereqGraph(catalog)
+        _graph_source = catalog
+    return _graph
+
+
+if __name__ == "__main__":
+    import time
+
+    start = time.perf_counter()
+    graph = get_prereq_graph()
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f"Compiled {len(graph.clauses)} courses in {elapsed:.0f} ms "
+          f"({len(graph.parse_errors)} parse fallbacks)")
+
+    student = graph.student_state({"15-112": "A", "15-122": "B", "21-127": "C"})
+    for code in ["15-213", "15-251", "15-150", "15-440"]:
+        print("  " + graph.check(code, student).summary())
+    print(f"  15-440 unavoidable prerequisites: {sorted(graph.unavoidable_prerequisites('15-440'))}")
+    print(f"  {len(graph.eligible_courses(student))} courses eligible now")
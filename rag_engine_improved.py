@@ -4,8 +4,11 @@ Each agent gets its own focused knowledge base (vector database).
 """
 import os
 import json
-from typing import List, Optional, Dict
-from langchain_community.document_loaders import DirectoryLoader, TextLoader
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional, Dict
+from langchain_community.document_loaders import TextLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_openai import OpenAIEmbeddings
 from langchain_community.vectorstores import Chroma
@@ -26,15 +29,45 @@ except ImportError:
 PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
 DATA_PATH = os.path.join(PROJECT_ROOT, "data")
 BASE_DB_PATH = os.path.join(PROJECT_ROOT, "chroma_db")
+# Below this many files ingestion runs in-process (pool startup costs more)
+MIN_PARALLEL_INGEST_FILES = 64
 
-# Configure HTTP client with SSL verification disabled and longer timeout for embeddings
-import httpx
-http_client = httpx.Client(verify=False, timeout=180.0)  # 3 minutes
+# Embeddings share the process-wide HTTP connection pool (see llm_clients.py)
+from llm_clients import get_http_client, get_async_http_client
+from config import (
+    get_llm_request_timeout, is_embedding_cache_enabled, get_embedding_cache_path,
+    is_hybrid_retrieval_enabled, get_hybrid_fetch_k, get_rrf_k, is_retrieval_cache_enabled,
+    get_vector_backend, get_numpy_index_dtype, get_ingest_workers, get_ingest_batch_size
+)
+from lexical_index import BM25Index, HybridRetriever
+from retrieval_cache import CachedQueryEmbeddings, CachedRetriever, invalidate_domain
+from llm_record_replay import wrap_query_embeddings
 EMBEDDING_MODEL = OpenAIEmbeddings(
-    http_client=http_client,
-    request_timeout=180.0
+    http_client=get_http_client(),
+    http_async_client=get_async_http_client(),
+    request_timeout=get_llm_request_timeout()
 )
 
+# Retrievers embed queries through an in-memory cache (see retrieval_cache.py);
+# under LLM_CACHE_MODE=record/replay query embeddings are also recorded/replayed
+_query_model = wrap_query_embeddings(EMBEDDING_MODEL)
+QUERY_EMBEDDINGS = CachedQueryEmbeddings(_query_model) if is_retrieval_cache_enabled() else _query_model
+
+# Index builds embed chunks through a persistent content-addressed cache
+# (see embedding_cache.py), so unchanged chunks are never embedded twice.
+_index_embeddings = None
+
+def get_index_embeddings():
+    """Embedding model used for index builds (cache-backed when enabled)."""
+    global _index_embeddings
+    if _index_embeddings is None:
+        if is_embedding_cache_enabled():
+            from embedding_cache import CachedEmbeddings
+            _index_embeddings = CachedEmbeddings(EMBEDDING_MODEL, get_embedding_cache_path())
+        else:
+            _index_embeddings = EMBEDDING_MODEL
+    return _index_embeddings
+
 # Domain mapping: Domain name → Data folders
 # NEW STRUCTURE: Each agent has its own folder for easier data management
 DOMAIN_PATHS = {
@@ -70,11 +103,27 @@ DOMAIN_PATHS = {
 # ============================================================================
 
 def get_db_path(domain: Optional[str] = None) -> str:
-    """Get vector database path for a domain."""
+    """
+    Get vector database path for a domain.
+    
+    After a hot reload (see data_reload.py) this is the active snapshot
+    directory named in "<base path>.current"; otherwise the base path.
+    """
     if domain:
-        return f"{BASE_DB_PATH}_{domain}"
+        base_path = get_base_db_path(domain)
+        pointer = base_path + ".current"
+        if os.path.exists(pointer):
+            with open(pointer, 'r', encoding='utf-8') as f:
+                snapshot = os.path.join(os.path.dirname(base_path), f.read().strip())
+            if os.path.isdir(snapshot):
+                return snapshot
+        return base_path
     return BASE_DB_PATH
 
+def get_base_db_path(domain: str) -> str:
+    """Base vector database path for a domain (ignores reload snapshots)."""
+    return f"{BASE_DB_PATH}_{domain}"
+
 def extract_course_codes(text: str) -> List[str]:
     """Extract course codes (e.g., 15-213, 67-250) from text."""
     import re
@@ -204,36 +253,202 @@ def generate_document_summary(data: any, file_name: str, file_type: str) -> str:
     
     return " | ".join(summaries)
 
+def json_to_text(data) -> str:
+    """Convert parsed JSON data to readable text for RAG."""
+    if isinstance(data, list):
+        text_parts = []
+        for item in data:
+            if isinstance(item, dict):
+                parts = []
+                for key, value in item.items():
+                    if isinstance(value, (list, dict)):
+                        value = json.dumps(value, ensure_ascii=False)
+                    parts.append(f"{key}: {value}")
+                text_parts.append("\n".join(parts))
+        return "\n\n".join(text_parts)
+    elif isinstance(data, dict):
+        parts = []
+        for key, value in data.items():
+            if isinstance(value, (list, dict)):
+                value = json.dumps(value, ensure_ascii=False)
+            parts.append(f"{key}: {value}")
+        return "\n".join(parts)
+    else:
+        return str(data)
+
 def load_json_as_text(file_path: str) -> str:
     """Convert JSON file to readable text for RAG."""
     try:
         with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        if isinstance(data, list):
-            text_parts = []
-            for item in data:
-                if isinstance(item, dict):
-                    parts = []
-                    for key, value in item.items():
-                        if isinstance(value, (list, dict)):
-                            value = json.dumps(value, ensure_ascii=False)
-                        parts.append(f"{key}: {value}")
-                    text_parts.append("\n".join(parts))
-            return "\n\n".join(text_parts)
-        elif isinstance(data, dict):
-            parts = []
-            for key, value in data.items():
-                if isinstance(value, (list, dict)):
-                    value = json.dumps(value, ensure_ascii=False)
-                parts.append(f"{key}: {value}")
-            return "\n".join(parts)
-        else:
-            return str(data)
+            return json_to_text(json.load(f))
     except Exception as e:
         print(f"Warning: Could not load JSON {file_path}: {e}")
         return ""
 
+def _add_markdown_metadata(doc: Document, domain: str) -> Document:
+    """Add metadata and a contextual prefix to a loaded markdown document."""
+    # Generate metadata
+    content_type = infer_content_type(doc.metadata['source'], doc.page_content)
+    program = infer_program(doc.metadata['source'], doc.page_content)
+    courses = extract_course_codes(doc.page_content)
+    summary = generate_document_summary(doc.page_content, doc.metadata['source'], 'markdown')
+    
+    # Update metadata (convert list to string for Chroma compatibility)
+    doc.metadata['domain'] = domain
+    doc.metadata['file_type'] = 'markdown'
+    doc.metadata['content_type'] = content_type
+    doc.metadata['program'] = program if program else ''
+    doc.metadata['courses_mentioned'] = ', '.join(courses) if courses else ''
+    doc.metadata['summary'] = summary
+    
+    path_parts = doc.metadata.get('source', '').split(os.sep)
+    if len(path_parts) > 1:
+        doc.metadata['category'] = path_parts[-2]
+    
+    # Add contextual prefix to content
+    file_name = os.path.basename(doc.metadata['source'])
+    context_prefix = f"""[DOCUMENT CONTEXT]
+File: {file_name}
+Type: {content_type}"""
+    
+    if program:
+        context_prefix += f"\nProgram: {program}"
+    
+    if courses:
+        context_prefix += f"\nMentions courses: {', '.join(courses[:5])}"
+        if len(courses) > 5:
+            context_prefix += f" (+{len(courses)-5} more)"
+    
+    context_prefix += f"\nSummary: {summary}\n\n[DOCUMENT CONTENT]\n"
+    
+    # Prepend context to content
+    doc.page_content = context_prefix + doc.page_content
+    return doc
+
+def _load_json_document(json_file: str, domain: str) -> Optional[Document]:
+    """Load one JSON file as a Document with metadata (None if empty)."""
+    # Parse once; the text and the summary both come from the parsed data
+    with open(json_file, 'r', encoding='utf-8') as f:
+        json_data = json.load(f)
+    
+    text_content = json_to_text(json_data)
+    
+    if not text_content:
+        return None
+    
+    # Generate metadata
+    content_type = infer_content_type(json_file, text_content)
+    program = infer_program(json_file, text_content)
+    courses = extract_course_codes(text_content)
+    summary = generate_document_summary(json_data, json_file, 'json')
+    
+    # Build contextual prefix
+    file_name = os.path.basename(json_file)
+    context_prefix = f"""[DOCUMENT CONTEXT]
+File: {file_name}
+Type: {content_type}"""
+    
+    if program:
+        context_prefix += f"\nProgram: {program}"
+    
+    if courses:
+        context_prefix += f"\nMentions courses: {', '.join(courses[:5])}"
+        if len(courses) > 5:
+            context_prefix += f" (+{len(courses)-5} more)"
+    
+    context_prefix += f"\nSummary: {summary}\n\n[DOCUMENT CONTENT]\n"
+    
+    # Create document with metadata (convert list to string for Chroma compatibility)
+    return Document(
+        page_content=context_prefix + text_content,
+        metadata={
+            'source': json_file,
+            'domain': domain,
+            'file_type': 'json',
+            'content_type': content_type,
+            'program': program if program else '',
+            'courses_mentioned': ', '.join(courses) if courses else '',
+            'summary': summary,
+            'category': os.path.basename(os.path.dirname(json_file))
+        }
+    )
+
+def load_file_documents(file_path: str, domain: str = "general") -> List[Document]:
+    """Load a single .md or .json file with metadata."""
+    if file_path.endswith('.md'):
+        docs = TextLoader(file_path, encoding='utf-8').load()
+        return [_add_markdown_metadata(doc, domain) for doc in docs]
+    if file_path.endswith('.json'):
+        doc = _load_json_document(file_path, domain)
+        return [doc] if doc else []
+    return []
+
+def list_source_files(data_path: str) -> List[str]:
+    """All .md and .json files under a path (sorted)."""
+    files = []
+    for root, dirs, names in os.walk(data_path):
+        for name in names:
+            if name.endswith(('.md', '.json')):
+                files.append(os.path.join(root, name))
+    return sorted(files)
+
+def _load_files(file_paths: List[str], domain: str) -> List[List[Document]]:
+    """Load a group of files (runs in an ingestion worker); one list per file."""
+    results = []
+    for file_path in file_paths:
+        try:
+            results.append(load_file_documents(file_path, domain=domain))
+        except Exception as e:
+            print(f"Error processing {file_path}: {e}")
+            results.append([])
+    return results
+
+def iter_documents_from_path(data_path: str, domain: str = "general",
+                             batch_size: Optional[int] = None,
+                             workers: Optional[int] = None) -> Iterator[List[Document]]:
+    """
+    Stream a path's documents in batches of up to batch_size files.
+    
+    Files are parsed (once each) in a process pool; the next batch is
+    already being loaded while the caller processes the current one, and
+    at most two batches are held in memory. All chunks of a file are in the
+    same batch. Small trees are loaded in-process.
+    """
+    batch_size = batch_size or get_ingest_batch_size()
+    workers = workers or get_ingest_workers()
+    files = list_source_files(data_path)
+    batches = [files[i:i + batch_size] for i in range(0, len(files), batch_size)]
+    # Files per worker task: enough to amortize the inter-process round trip
+    per_task = max(1, min(32, batch_size // max(workers, 1)))
+    
+    def flatten(per_file: List[List[Document]]) -> List[Document]:
+        return [doc for docs in per_file for doc in docs]
+    
+    if workers <= 1 or len(files) < MIN_PARALLEL_INGEST_FILES:
+        for batch in batches:
+            yield flatten(_load_files(batch, domain))
+        return
+    
+    # fork lets workers reuse the already imported loaders (see degree_audit.audit_batch),
+    # but forking a process with other threads running (the API's hot reload) can
+    # copy a lock some thread holds; workers then start fresh from a forkserver
+    start_methods = multiprocessing.get_all_start_methods()
+    if threading.active_count() > 1:
+        method = "forkserver" if "forkserver" in start_methods else "spawn"
+    else:
+        method = "fork" if "fork" in start_methods else None
+    context = multiprocessing.get_context(method)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        def submit(batch):
+            return [pool.submit(_load_files, batch[i:i + per_task], domain)
+                    for i in range(0, len(batch), per_task)]
+        
+        pending = submit(batches[0]) if batches else None
+        for next_batch in batches[1:] + [None]:
+            upcoming = submit(next_batch) if next_batch else None
+            yield flatten([docs for future in pending for docs in future.result()])
+            pending = upcoming
+
 def load_documents_from_path(data_path: str, domain: str = "general") -> List[Document]:
     """Load documents from a path, handling both .md and .json files with metadata."""
     documents = []
@@ -242,137 +457,258 @@ def load_documents_from_path(data_path: str, domain: str = "general") -> List[Do
         print(f"Warning: Path {data_path} does not exist")
         return documents
     
-    # Load markdown files
-    try:
-        md_loader = DirectoryLoader(
-            data_path,
-            glob="**/*.md",
-            loader_cls=TextLoader,
-            loader_kwargs={'encoding': 'utf-8'},
-            recursive=True
-        )
-        md_docs = md_loader.load()
-        
-        # Add metadata and contextual prefix
-        for doc in md_docs:
-            # Generate metadata
-            content_type = infer_content_type(doc.metadata['source'], doc.page_content)
-            program = infer_program(doc.metadata['source'], doc.page_content)
-            courses = extract_course_codes(doc.page_content)
-            summary = generate_document_summary(doc.page_content, doc.metadata['source'], 'markdown')
-            
-            # Update metadata (convert list to string for Chroma compatibility)
-            doc.metadata['domain'] = domain
-            doc.metadata['file_type'] = 'markdown'
-            doc.metadata['content_type'] = content_type
-            doc.metadata['program'] = program if program else ''
-            doc.metadata['courses_mentioned'] = ', '.join(courses) if courses else ''
-            doc.metadata['summary'] = summary
-            
-            path_parts = doc.metadata.get('source', '').split(os.sep)
-            if len(path_parts) > 1:
-                doc.metadata['category'] = path_parts[-2]
-            
-            # Add contextual prefix to content
-            file_name = os.path.basename(doc.metadata['source'])
-            context_prefix = f"""[DOCUMENT CONTEXT]
-File: {file_name}
-Type: {content_type}"""
-            
-            if program:
-                context_prefix += f"\nProgram: {program}"
-            
-            if courses:
-                context_prefix += f"\nMentions courses: {', '.join(courses[:5])}"
-                if len(courses) > 5:
-                    context_prefix += f" (+{len(courses)-5} more)"
-            
-            context_prefix += f"\nSummary: {summary}\n\n[DOCUMENT CONTENT]\n"
-            
-            # Prepend context to content
-            doc.page_content = context_prefix + doc.page_content
-        
-        documents.extend(md_docs)
-        print(f"   Loaded {len(md_docs)} markdown files with metadata")
-    except Exception as e:
-        print(f"Error loading markdown files: {e}")
-    
-    # Load JSON files
-    try:
-        json_files = []
-        for root, dirs, files in os.walk(data_path):
-            for file in files:
-                if file.endswith('.json'):
-                    json_files.append(os.path.join(root, file))
-        
-        for json_file in json_files:
-            try:
-                # Load JSON to analyze it
-                with open(json_file, 'r', encoding='utf-8') as f:
-                    json_data = json.load(f)
-                
-                text_content = load_json_as_text(json_file)
-                
-                if text_content:
-                    # Generate metadata
-                    content_type = infer_content_type(json_file, text_content)
-                    program = infer_program(json_file, text_content)
-                    courses = extract_course_codes(text_content)
-                    summary = generate_document_summary(json_data, json_file, 'json')
-                    
-                    # Build contextual prefix
-                    file_name = os.path.basename(json_file)
-                    context_prefix = f"""[DOCUMENT CONTEXT]
-File: {file_name}
-Type: {content_type}"""
-                    
-                    if program:
-                        context_prefix += f"\nProgram: {program}"
-                    
-                    if courses:
-                        context_prefix += f"\nMentions courses: {', '.join(courses[:5])}"
-                        if len(courses) > 5:
-                            context_prefix += f" (+{len(courses)-5} more)"
-                    
-                    context_prefix += f"\nSummary: {summary}\n\n[DOCUMENT CONTENT]\n"
-                    
-                    # Create document with metadata (convert list to string for Chroma compatibility)
-                    doc = Document(
-                        page_content=context_prefix + text_content,
-                        metadata={
-                            'source': json_file,
-                            'domain': domain,
-                            'file_type': 'json',
-                            'content_type': content_type,
-                            'program': program if program else '',
-                            'courses_mentioned': ', '.join(courses) if courses else '',
-                            'summary': summary,
-                            'category': os.path.basename(os.path.dirname(json_file))
-                        }
-                    )
-                    documents.append(doc)
-            except Exception as e:
-                print(f"Error processing JSON {json_file}: {e}")
-        
-        print(f"   Loaded {len(json_files)} JSON files with metadata")
-    except Exception as e:
-        print(f"Error loading JSON files: {e}")
+    for batch in iter_documents_from_path(data_path, domain=domain):
+        documents.extend(batch)
     
+    md_count = sum(1 for doc in documents if doc.metadata.get('file_type') == 'markdown')
+    print(f"   Loaded {md_count} markdown files with metadata")
+    print(f"   Loaded {len(documents) - md_count} JSON files with metadata")
     return documents
 
-def load_domain_documents(domain: str) -> List[Document]:
-    """Load all documents for a specific domain."""
+def iter_domain_documents(domain: str) -> Iterator[List[Document]]:
+    """Stream all documents of a domain in batches (see iter_documents_from_path)."""
     if domain not in DOMAIN_PATHS:
         raise ValueError(f"Unknown domain: {domain}. Available: {list(DOMAIN_PATHS.keys())}")
     
-    all_docs = []
-    
     for relative_path in DOMAIN_PATHS[domain]:
         full_path = os.path.join(DATA_PATH, relative_path)
-        docs = load_documents_from_path(full_path, domain=domain)
-        all_docs.extend(docs)
+        if not os.path.exists(full_path):
+            print(f"Warning: Path {full_path} does not exist")
+            continue
+        yield from iter_documents_from_path(full_path, domain=domain)
+
+def load_domain_documents(domain: str) -> List[Document]:
+    """Load all documents for a specific domain."""
+    return [doc for batch in iter_domain_documents(domain) for doc in batch]
+
+# ============================================================================
+# INDEX MANIFEST (incremental updates)
+# ============================================================================
+# Each domain DB keeps index_manifest.json next to the Chroma files:
+#   {"files": {"<path relative to DATA_PATH>": {"hash": "<sha256>", "chunk_ids": [...]}}}
+# Chunk IDs are "<relative path>#<n>", so a file's chunks can be replaced or
+# deleted without touching the rest of the index.
+
+MANIFEST_FILE = "index_manifest.json"
+
+def get_manifest_path(domain: str, db_path: Optional[str] = None) -> str:
+    """Path of the manifest for a domain index."""
+    return os.path.join(db_path or get_db_path(domain), MANIFEST_FILE)
+
+def load_index_manifest(domain: str, db_path: Optional[str] = None) -> Optional[Dict]:
+    """Load a domain's manifest (None if the index has none yet)."""
+    path = get_manifest_path(domain, db_path)
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def save_index_manifest(domain: str, manifest: Dict, db_path: Optional[str] = None):
+    """Write a domain's manifest atomically."""
+    path = get_manifest_path(domain, db_path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+def file_content_hash(file_path: str) -> str:
+    """sha256 of a source file's bytes."""
+    import hashlib
+    with open(file_path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def list_domain_files(domain: str) -> List[str]:
+    """All indexable (.md / .json) source files of a domain."""
+    files = []
+    for relative_path in DOMAIN_PATHS[domain]:
+        files.extend(list_source_files(os.path.join(DATA_PATH, relative_path)))
+    return sorted(files)
+
+def _relative_source(file_path: str) -> str:
+    return os.path.relpath(file_path, DATA_PATH).replace(os.sep, '/')
+
+def split_documents(documents: List[Document]) -> List[Document]:
+    """Split documents into retrieval chunks."""
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=1000,
+        chunk_overlap=100,
+        separators=["\n\n", "\n", ". ", " ", ""]
+    )
+    return splitter.split_documents(documents)
+
+def _chunk_ids(chunks: List[Document]) -> List[str]:
+    """Stable chunk IDs: "<relative source path>#<n>" in source order."""
+    counters = {}
+    ids = []
+    for chunk in chunks:
+        source = _relative_source(chunk.metadata['source'])
+        n = counters.get(source, 0)
+        counters[source] = n + 1
+        ids.append(f"{source}#{n}")
+    return ids
+
+def _manifest_for(chunks: List[Document], ids: List[str]) -> Dict:
+    """Build manifest entries for chunks of freshly indexed files."""
+    files = {}
+    for chunk, chunk_id in zip(chunks, ids):
+        source = chunk.metadata['source']
+        entry = files.setdefault(_relative_source(source), {
+            "hash": file_content_hash(source),
+            "chunk_ids": []
+        })
+        entry["chunk_ids"].append(chunk_id)
+    return files
+
+def _diff_manifest(indexed: Dict, hashes: Dict[str, str]):
+    """Split source files into (added, changed, removed, unchanged count)."""
+    removed = [rel for rel in indexed if rel not in hashes]
+    added, changed, unchanged = [], [], 0
+    for rel, digest in hashes.items():
+        if rel not in indexed:
+            added.append(rel)
+        elif indexed[rel].get("hash") != digest:
+            changed.append(rel)
+        else:
+            unchanged += 1
+    return added, changed, removed, unchanged
+
+def domain_index_is_current(domain: str) -> bool:
+    """Whether the active index matches the domain's source files."""
+    manifest = load_index_manifest(domain)
+    if manifest is None:
+        return False
+    hashes = {_relative_source(path): file_content_hash(path) for path in list_domain_files(domain)}
+    added, changed, removed, _ = _diff_manifest(manifest.get("files", {}), hashes)
+    return not (added or changed or removed)
+
+def update_domain_index(domain: str, db_path: Optional[str] = None) -> Dict[str, int]:
+    """
+    Incrementally update a domain index from its manifest.
+    
+    Re-embeds chunks only for added or changed files and deletes the chunks
+    of removed files. Falls back to a full build if the index or its manifest
+    does not exist yet.
+    
+    Args:
+        domain: Domain name
+        db_path: Index directory to update (defaults to the active one)
     
-    return all_docs
+    Returns:
+        Counts of added, changed, removed and unchanged files
+    """
+    db_path = db_path or get_db_path(domain)
+    manifest = load_index_manifest(domain, db_path)
+    
+    if manifest is None or not os.path.exists(db_path):
+        print(f"   No manifest for domain '{domain}' - running a full build")
+        if os.path.exists(db_path):
+            import shutil
+            shutil.rmtree(db_path)
+        _build_domain_vectorstore(domain, db_path)
+        built = load_index_manifest(domain, db_path) or {"files": {}}
+        return {"added": len(built["files"]), "changed": 0, "removed": 0, "unchanged": 0}
+    
+    indexed = manifest.get("files", {})
+    current = {_relative_source(path): path for path in list_domain_files(domain)}
+    hashes = {rel: file_content_hash(path) for rel, path in current.items()}
+    added, changed, removed, unchanged = _diff_manifest(indexed, hashes)
+    
+    counts = {"added": len(added), "changed": len(changed), "removed": len(removed), "unchanged": unchanged}
+    if not (added or changed or removed):
+        print(f"✅ Domain '{domain}' index is up to date ({unchanged} files)")
+        return counts
+    
+    vectorstore = Chroma(persist_directory=db_path, embedding_function=get_index_embeddings())
+    
+    # Drop chunks of removed and changed files
+    stale_ids = [cid for rel in removed + changed for cid in indexed[rel].get("chunk_ids", [])]
+    if stale_ids:
+        vectorstore.delete(ids=stale_ids)
+    for rel in removed:
+        del indexed[rel]
+    
+    # Re-index added and changed files
+    documents = []
+    for rel in added + changed:
+        try:
+            documents.extend(load_file_documents(current[rel], domain=domain))
+        except Exception as e:
+            # Leave the file out of the manifest so the next update retries it
+            print(f"Error loading {current[rel]}: {e}")
+            indexed.pop(rel, None)
+            continue
+        indexed[rel] = {"hash": hashes[rel], "chunk_ids": []}
+    
+    chunks = split_documents(documents)
+    ids = _chunk_ids(chunks) if chunks else []
+    if chunks:
+        vectorstore.add_documents(chunks, ids=ids)
+        for chunk, chunk_id in zip(chunks, ids):
+            indexed[_relative_source(chunk.metadata['source'])]["chunk_ids"].append(chunk_id)
+    
+    # Same changes in the BM25 index (rebuilt from Chroma if it is missing)
+    lexical = BM25Index.load(db_path)
+    if lexical is None:
+        lexical = BM25Index.from_vectorstore(vectorstore)
+    else:
+        lexical.update(BM25Index.from_documents(chunks, ids).chunks, removed=stale_ids)
+    lexical.save(db_path)
+    
+    manifest["files"] = indexed
+    save_index_manifest(domain, manifest, db_path)
+    invalidate_domain(domain)
+    
+    print(f"✅ Domain '{domain}' index updated: {counts['added']} added, {counts['changed']} changed, "
+          f"{counts['removed']} removed, {counts['unchanged']} unchanged ({len(chunks)} chunks embedded)")
+    return counts
+
+# ============================================================================
+# INDEX SNAPSHOTS (hot reload)
+# ============================================================================
+# A reload never writes to the index that running requests are reading.
+# It copies the active index to "<base path>.snapshot-<stamp>", updates the
+# copy, and then points "<base path>.current" at it. A fresh directory is
+# also required because Chroma caches one client per persist directory.
+
+SNAPSHOT_MARKER = ".snapshot-"
+
+def stage_domain_snapshot(domain: str) -> str:
+    """Copy the active index to a new snapshot directory and update the copy."""
+    import shutil
+    import time
+    active_path = get_db_path(domain)
+    snapshot_path = f"{get_base_db_path(domain)}{SNAPSHOT_MARKER}{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}"
+    if os.path.isdir(snapshot_path):
+        shutil.rmtree(snapshot_path)
+    if os.path.isdir(active_path):
+        shutil.copytree(active_path, snapshot_path)
+    update_domain_index(domain, db_path=snapshot_path)
+    return snapshot_path
+
+def activate_domain_snapshot(domain: str, snapshot_path: str):
+    """Make a staged snapshot the active index for a domain (atomic)."""
+    pointer = get_base_db_path(domain) + ".current"
+    tmp_path = pointer + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(os.path.basename(snapshot_path))
+    os.replace(tmp_path, pointer)
+
+def prune_domain_snapshots(domain: str, keep: List[str]):
+    """Delete snapshot directories of a domain that are not in keep."""
+    import glob
+    import shutil
+    keep = {os.path.abspath(path) for path in keep}
+    for path in glob.glob(f"{get_base_db_path(domain)}{SNAPSHOT_MARKER}*"):
+        if os.path.isdir(path) and os.path.abspath(path) not in keep:
+            shutil.rmtree(path, ignore_errors=True)
+
+def reset_domain_snapshots(domain: str):
+    """Drop the snapshot pointer and all snapshots (back to the base path)."""
+    pointer = get_base_db_path(domain) + ".current"
+    if os.path.exists(pointer):
+        os.remove(pointer)
+    prune_domain_snapshots(domain, keep=[])
 
 # ============================================================================
 # MAIN RETRIEVER FUNCTION
@@ -382,6 +718,10 @@ def get_retriever(domain: Optional[str] = None, k: int = 5):
     """
     Get retriever for a specific domain.
     
+    With hybrid retrieval enabled (config.py) this is a HybridRetriever that
+    fuses vector search with the domain's BM25 index; otherwise the plain
+    Chroma retriever.
+    
     Args:
         domain: Domain name ("programs", "courses", "policies")
         k: Number of documents to retrieve
@@ -394,61 +734,130 @@ def get_retriever(domain: Optional[str] = None, k: int = 5):
     # Check if database exists
     if os.path.exists(db_path) and os.listdir(db_path):
         print(f"📚 Loading domain '{domain}' database from {db_path}")
-        vectorstore = Chroma(
+        chroma = lambda: Chroma(
             persist_directory=db_path,
-            embedding_function=EMBEDDING_MODEL
+            embedding_function=QUERY_EMBEDDINGS
         )
-        return vectorstore.as_retriever(search_kwargs={"k": k})
+        return _as_retriever(_serving_store(domain, db_path, chroma), domain, db_path, k)
     
     # Build new database
-    print(f"🔨 Building domain '{domain}' database...")
-    
     if domain not in DOMAIN_PATHS:
         print(f"⚠️  Unknown domain: {domain}")
         return Chroma(embedding_function=EMBEDDING_MODEL).as_retriever(search_kwargs={"k": k})
     
-    # Load domain-specific documents
-    documents = load_domain_documents(domain)
+    vectorstore = _build_domain_vectorstore(domain, db_path)
+    return _as_retriever(_serving_store(domain, db_path, lambda: vectorstore), domain, db_path, k)
+
+def _serving_store(domain: str, db_path: str, chroma):
+    """
+    Store that answers a domain's vector queries: the Chroma store returned
+    by chroma(), or the numpy index exported from it when the domain's
+    backend is "numpy" (config.py).
+    """
+    if get_vector_backend(domain) != "numpy":
+        return chroma()
+    from numpy_vector_index import NumpyVectorStore, open_numpy_index
+    index = open_numpy_index(db_path, get_numpy_index_dtype(), chroma_factory=chroma)
+    return NumpyVectorStore(index, QUERY_EMBEDDINGS)
+
+def _as_retriever(vectorstore, domain: str, db_path: str, k: int):
+    """Vector or hybrid retriever over a domain store, behind the result cache."""
+    retriever = _search_retriever(vectorstore, db_path, k)
+    if not is_retrieval_cache_enabled():
+        return retriever
+    return CachedRetriever(retriever=retriever, domain=domain, index_path=db_path, k=k)
+
+def _search_retriever(vectorstore, db_path: str, k: int):
+    """Plain vector retriever, or the hybrid one over vectorstore + BM25."""
+    if not is_hybrid_retrieval_enabled():
+        return vectorstore.as_retriever(search_kwargs={"k": k})
     
-    if not documents:
-        print(f"⚠️  No documents found for domain '{domain}'")
-        return Chroma(embedding_function=EMBEDDING_MODEL).as_retriever(search_kwargs={"k": k})
+    lexical = BM25Index.load(db_path)
+    if lexical is None:
+        # Index built before hybrid retrieval existed: index the stored chunks
+        lexical = BM25Index.from_vectorstore(vectorstore)
+        if len(lexical):
+            lexical.save(db_path)
+            print(f"   Built BM25 index ({len(lexical)} chunks)")
+    
+    fetch_k = max(k, get_hybrid_fetch_k())
+    return HybridRetriever(
+        vector_retriever=vectorstore.as_retriever(search_kwargs={"k": fetch_k}),
+        lexical_index=lexical,
+        k=k,
+        fetch_k=fetch_k,
+        rrf_k=get_rrf_k()
+    )
+
+def _build_domain_vectorstore(domain: str, db_path: str):
+    """
+    Build a domain's vector store from scratch and write its manifest.
     
-    print(f"   Total documents: {len(documents)}")
+    Documents arrive in batches from the ingestion pool and each batch is
+    split and embedded before the next one is taken, so memory stays flat
+    while parsing overlaps with embedding.
+    """
+    print(f"🔨 Building domain '{domain}' database...")
     
-    # Split documents
-    splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=100,
-        separators=["\n\n", "\n", ". ", " ", ""]
-    )
-    chunks = splitter.split_documents(documents)
+    # Embeddings served from the cache where possible
+    embeddings = get_index_embeddings()
+    if hasattr(embeddings, "reset_stats"):
+        embeddings.reset_stats()
+    
+    vectorstore = None
+    manifest_files, lexical_chunks = {}, {}
+    document_count = 0
+    for documents in iter_domain_documents(domain):
+        chunks = split_documents(documents)
+        if not chunks:
+            continue
+        ids = _chunk_ids(chunks)
+        if vectorstore is None:
+            vectorstore = Chroma(persist_directory=db_path, embedding_function=embeddings)
+        vectorstore.add_documents(chunks, ids=ids)
+        manifest_files.update(_manifest_for(chunks, ids))
+        lexical_chunks.update(BM25Index.chunk_entries(chunks, ids))
+        document_count += len(documents)
+    
+    if vectorstore is None:
+        print(f"⚠️  No documents found for domain '{domain}'")
+        return Chroma(embedding_function=EMBEDDING_MODEL)
     
-    print(f"   Total chunks: {len(chunks)}")
+    print(f"   Total documents: {document_count}")
+    print(f"   Total chunks: {len(lexical_chunks)}")
+    if hasattr(embeddings, "print_stats"):
+        embeddings.print_stats(f"Embedding cache ({domain})")
     
-    # Create vector store
-    vectorstore = Chroma.from_documents(
-        documents=chunks,
-        embedding=EMBEDDING_MODEL,
-        persist_directory=db_path
-    )
+    save_index_manifest(domain, {"files": manifest_files}, db_path)
+    BM25Index(lexical_chunks).save(db_path)
+    invalidate_domain(domain)
     
     print(f"✅ Domain '{domain}' database created at {db_path}")
     
-    return vectorstore.as_retriever(search_kwargs={"k": k})
+    return vectorstore
 
 # ============================================================================
 # UTILITY FUNCTIONS
 # ============================================================================
 
 def build_domain_index(domain: str, force_rebuild: bool = False):
-    """Build vector database for a specific domain."""
+    """
+    Build or refresh the vector database for a specific domain.
+    
+    An existing index is updated incrementally from its manifest (only added,
+    changed and removed files are touched). force_rebuild deletes the index
+    and rebuilds it from scratch (chunk embeddings still come from the cache).
+    """
     db_path = get_db_path(domain)
     
     if os.path.exists(db_path) and os.listdir(db_path) and not force_rebuild:
-        print(f"✅ Domain '{domain}' database already exists")
+        update_domain_index(domain)
         return
     
+    if force_rebuild:
+        reset_domain_snapshots(domain)
+        db_path = get_db_path(domain)
+    
     if force_rebuild and os.path.exists(db_path):
         import shutil
         shutil.rmtree(db_path)
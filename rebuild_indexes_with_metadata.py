@@ -32,6 +32,7 @@ def confirm_rebuild(domain: str = None):
     print("  ✓ Will help agents understand document sources better")
     print("  ✓ May take several minutes to complete")
     print("  ✓ Cannot be undone (old indexes will be deleted)")
+    print("  ✓ Reuses cached embeddings for unchanged chunks (embedding_cache/)")
     
     response = input("\nDo you want to proceed? (yes/no): ").strip().lower()
     return response in ['yes', 'y']
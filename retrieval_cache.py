@@ -0,0 +1,204 @@
+"""
+Retrieval Caches
+Two in-memory caches in front of the domain retrievers:
+
+1. Query embeddings: query text -> vector, so a repeated query (e.g. the
+   policy agent's fixed critique query) is embedded once
+2. Retrieval results: (domain, index path, normalized query, k) -> documents,
+   so repeated questions skip the vector store and BM25 entirely
+
+Both are LRU caches with a size bound and a TTL (config.py). Result entries
+are keyed by the index directory they came from and dropped for a domain
+when its index is rebuilt or hot-reloaded (invalidate_domain), so a cached
+answer never outlives the index that produced it. The same hook clears the
+semantic answer cache for that domain.
+
+Hit/miss counters are reported by cache_stats() (GET /api/v1/admin/retrieval-cache).
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForRetrieverRun, CallbackManagerForRetrieverRun
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from langchain_core.retrievers import BaseRetriever
+
+from config import get_query_embedding_cache_limits, get_retrieval_cache_limits
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after ttl seconds."""
+
+    def __init__(self, maxsize: int, ttl: float, clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if self._clock() - stored_at <= self.ttl:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.expirations += 1
+            self.misses += 1
+            return None
+
+    def put(self, key: Hashable, value: Any):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (self._clock(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def discard(self, predicate: Callable[[Hashable], bool]) -> int:
+        """Remove every entry whose key matches; returns the number removed."""
+        with self._lock:
+            stale = [key for key in self._data if predicate(key)]
+            for key in stale:
+                del self._data[key]
+            return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations
+            }
+
+
+_embedding_cache = TTLCache(*get_query_embedding_cache_limits())
+_result_cache = TTLCache(*get_retrieval_cache_limits())
+
+
+def normalize_query(query: str) -> str:
+    """Case, whitespace and trailing punctuation do not change a retrieval."""
+    return re.sub(r"\s+", " ", query).strip().rstrip("?!. ").lower()
+
+
+class CachedQueryEmbeddings(Embeddings):
+    """Embeddings wrapper that caches embed_query; documents pass straight through."""
+
+    def __init__(self, embeddings: Embeddings, cache: TTLCache = None):
+        self.embeddings = embeddings
+        self.cache = cache or _embedding_cache
+        self.model_name = getattr(embeddings, "model", embeddings.__class__.__name__)
+
+    def _key(self, text: str):
+        # Exact text (whitespace aside): the vector depends on case and wording
+        return self.model_name, " ".join(text.split())
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return self.embeddings.embed_documents(texts)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+        vector = self.cache.get(key)
+        if vector is None:
+            vector = self.embeddings.embed_query(text)
+            self.cache.put(key, vector)
+        return vector
+
+    async def aembed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+        vector = self.cache.get(key)
+        if vector is None:
+            vector = await self.embeddings.aembed_query(text)
+            self.cache.put(key, vector)
+        return vector
+
+
+class CachedRetriever(BaseRetriever):
+    """Serves repeated (normalized) queries of one domain index from the result cache."""
+
+    retriever: BaseRetriever
+    domain: str
+    index_path: str
+    k: int = 5
+
+    @property
+    def lexical_index(self):
+        """The wrapped retriever's BM25 index, if any (course-code lookups)."""
+        return getattr(self.retriever, "lexical_index", None)
+
+    def _key(self, query: str):
+        return self.domain, self.index_path, normalize_query(query), self.k
+
+    @staticmethod
+    def _copy(docs: List[Document]) -> List[Document]:
+        # Callers may edit metadata; cached documents stay untouched
+        return [Document(page_content=doc.page_content, metadata=dict(doc.metadata)) for doc in docs]
+
+    def _get_relevant_documents(self, query: str, *,
+                                run_manager: CallbackManagerForRetrieverRun) -> List[Document]:
+        key = self._key(query)
+        docs = _result_cache.get(key)
+        if docs is None:
+            docs = self.retriever.invoke(query, config={"callbacks": run_manager.get_child()})
+            _result_cache.put(key, self._copy(docs))
+            return docs
+        return self._copy(docs)
+
+    async def _aget_relevant_documents(self, query: str, *,
+                                       run_manager: AsyncCallbackManagerForRetrieverRun) -> List[Document]:
+        key = self._key(query)
+        docs = _result_cache.get(key)
+        if docs is None:
+            docs = await self.retriever.ainvoke(query, config={"callbacks": run_manager.get_child()})
+            _result_cache.put(key, self._copy(docs))
+            return docs
+        return self._copy(docs)
+
+
+def invalidate_domain(domain: str) -> int:
+    """
+    Drop cached retrieval results of a domain (after its index changed),
+    and the cached answers built from them (answer_cache.py).
+    """
+    removed = _result_cache.discard(lambda key: key[0] == domain)
+    if removed:
+        print(f"🧹 Dropped {removed} cached retrieval(s) for domain '{domain}'")
+    from answer_cache import invalidate_answers
+    invalidate_answers(domain)
+    return removed
+
+
+def clear_caches():
+    """Empty both caches (counters are kept)."""
+    _embedding_cache.clear()
+    _result_cache.clear()
+
+
+def cache_stats() -> Dict[str, Dict[str, float]]:
+    """Hit/miss/eviction counters of both caches."""
+    return {
+        "query_embeddings": _embedding_cache.stats(),
+        "retrieval_results": _result_cache.stats()
+    }
@@ -0,0 +1,275 @@
+"""
+Schedule Repository
+One process-wide, cached view of the course schedule data:
+- data/schedules/schedule_*.json (and the copies under data/courses/Schedule)
+- data/schedules/course_offering_patterns.json
+
+Terms are loaded once and keyed by (year, "spring"/"fall"); offering
+patterns and instructor indexes are built once per load. Every access checks
+(at most once per CHECK_INTERVAL seconds) the mtimes of the files and reloads
+everything when one changed, so edits to data/ show up without a restart.
+
+Used by planning_tools, the planning agent, the native planner and the
+timetable conflict checker.
+"""
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+SCHEDULE_DIRS = [
+    os.path.join(BASE_DIR, "data", "schedules"),
+    os.path.join(BASE_DIR, "data", "courses", "Schedule"),
+    os.path.join(BASE_DIR, "data", "courses", "schedule"),
+]
+OFFERING_PATTERNS_PATH = os.path.join(BASE_DIR, "data", "schedules", "course_offering_patterns.json")
+# Seconds between file mtime checks
+CHECK_INTERVAL = 1.0
+
+TermKey = Tuple[int, str]   # (2026, "spring")
+
+
+def term_key(term: str) -> Optional[TermKey]:
+    """Parse "Spring 2026", "2026_spring" or "fall_2025" into (year, season)."""
+    parts = term.lower().replace("_", " ").split()
+    season = next((p for p in parts if p in ("fall", "spring", "summer")), None)
+    year = next((int(p) for p in parts if p.isdigit()), None)
+    if season is None or year is None:
+        return None
+    return year, season
+
+
+def term_name(key: TermKey) -> str:
+    """(2026, "spring") -> "Spring 2026"."""
+    return f"{key[1].title()} {key[0]}"
+
+
+def build_offering_patterns(schedules: Dict[str, dict]) -> Dict[str, dict]:
+    """Analyze when courses are offered across the given schedule documents."""
+    patterns = defaultdict(lambda: {
+        "fall": False,
+        "spring": False,
+        "semesters_offered": [],
+        "instructors": set()
+    })
+
+    for schedule_data in schedules.values():
+        term = schedule_data.get("semester", {})
+        season = term.get("term", "").lower()
+        year = term.get("year", "")
+
+        for offering in schedule_data.get("offerings", []):
+            course_code = offering.get("course_code", "")
+            if not course_code:
+                continue
+
+            if "fall" in season:
+                patterns[course_code]["fall"] = True
+            elif "spring" in season:
+                patterns[course_code]["spring"] = True
+            patterns[course_code]["semesters_offered"].append(f"{season.title()} {year}")
+
+            for section in offering.get("sections", []):
+                instructor = section.get("instructor", "")
+                if instructor:
+                    patterns[course_code]["instructors"].add(instructor)
+
+    return {
+        course_code: {
+            "fall": data["fall"],
+            "spring": data["spring"],
+            "frequency": _frequency(data["fall"], data["spring"]),
+            "semesters_offered": data["semesters_offered"],
+            "typical_instructors": sorted(data["instructors"])[:3]
+        }
+        for course_code, data in patterns.items()
+    }
+
+
+def _frequency(fall: bool, spring: bool) -> str:
+    if fall and spring:
+        return "every_semester"
+    if fall:
+        return "fall_only"
+    if spring:
+        return "spring_only"
+    return "unknown"
+
+
+class ScheduleRepository:
+    """Loads schedule files once and serves terms, offerings and indexes."""
+
+    def __init__(self, schedule_dirs: List[str] = None, patterns_path: str = OFFERING_PATTERNS_PATH):
+        self.schedule_dirs = schedule_dirs or SCHEDULE_DIRS
+        self.patterns_path = patterns_path
+        self._lock = threading.RLock()
+        self._signature = None
+        self._checked_at = 0.0
+        # Bumped on every reload so dependents (e.g. timetables) can rebuild
+        self.version = 0
+
+        self._terms: Dict[TermKey, dict] = {}
+        self._offered: Dict[TermKey, Set[str]] = {}
+        self._patterns: Dict[str, dict] = {}
+        self._published_patterns: Dict[str, dict] = {}
+        self._special_notes: dict = {}
+        self._instructor_courses: Dict[str, Set[str]] = {}
+
+    # ------------------------------------------------------------------
+    # Loading / invalidation
+    # ------------------------------------------------------------------
+
+    def _files(self) -> List[str]:
+        files = []
+        for directory in self.schedule_dirs:
+            if os.path.isdir(directory):
+                files.extend(
+                    os.path.join(directory, name) for name in sorted(os.listdir(directory))
+                    if name.endswith(".json")
+                )
+        return files
+
+    def _current_signature(self) -> tuple:
+        entries = []
+        for path in self._files() + [self.patterns_path]:
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, stat.st_mtime_ns, stat.st_size))
+        return tuple(entries)
+
+    def _ensure_loaded(self):
+        now = time.monotonic()
+        if self._signature is not None and now - self._checked_at < CHECK_INTERVAL:
+            return
+        with self._lock:
+            signature = self._current_signature()
+            self._checked_at = now
+            if signature != self._signature:
+                self._load()
+                self._signature = signature
+
+    def _load(self):
+        terms: Dict[TermKey, dict] = {}
+        for path in self._files():
+            if os.path.abspath(path) == os.path.abspath(self.patterns_path):
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except Exception as e:
+                print(f"Warning: Could not load {os.path.basename(path)}: {e}")
+                continue
+            if not isinstance(data, dict) or "semester" not in data:
+                continue
+            semester = data["semester"]
+            key = term_key(f"{semester.get('term', '')} {semester.get('year', '')}")
+            if key:
+                # Later directories win, as the per-directory loaders used to
+                terms[key] = data
+
+        published, notes = {}, {}
+        try:
+            with open(self.patterns_path, "r", encoding="utf-8") as f:
+                patterns_doc = json.load(f)
+            published = patterns_doc.get("patterns", {})
+            notes = patterns_doc.get("special_notes", {})
+        except (OSError, ValueError) as e:
+            print(f"Warning: Could not load offering patterns: {e}")
+
+        offered = {
+            key: {o.get("course_code") for o in data.get("offerings", []) if o.get("course_code")}
+            for key, data in terms.items()
+        }
+        instructor_courses: Dict[str, Set[str]] = defaultdict(set)
+        for data in terms.values():
+            for offering in data.get("offerings", []):
+                for section in offering.get("sections", []):
+                    if section.get("instructor"):
+                        instructor_courses[section["instructor"]].add(offering.get("course_code"))
+
+        # Indexes are fully built before they replace the old ones
+        self._terms = terms
+        self._offered = offered
+        self._patterns = build_offering_patterns(self.schedules_by_key(terms))
+        self._published_patterns = published
+        self._special_notes = notes
+        self._instructor_courses = dict(instructor_courses)
+        self.version += 1
+        print(f"📅 Loaded {len(terms)} schedule term(s): {', '.join(term_name(k) for k in sorted(terms))}")
+
+    def invalidate(self):
+        """Force a reload on next access."""
+        with self._lock:
+            self._signature = None
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def terms(self) -> Dict[TermKey, dict]:
+        """Raw schedule documents keyed by (year, season)."""
+        self._ensure_loaded()
+        return self._terms
+
+    def get_term(self, term: str) -> Optional[dict]:
+        """Schedule document for "Spring 2026" / "2026_spring" (None if not loaded)."""
+        key = term_key(term)
+        return self.terms().get(key) if key else None
+
+    def latest_term(self) -> Optional[TermKey]:
+        terms = self.terms()
+        order = {"spring": 0, "summer": 1, "fall": 2}
+        return max(terms, key=lambda k: (k[0], order.get(k[1], 0))) if terms else None
+
+    def schedules_by_key(self, terms: Dict[TermKey, dict] = None) -> Dict[str, dict]:
+        """Schedules keyed "2026_spring" (the format load_course_schedules always returned)."""
+        terms = self.terms() if terms is None else terms
+        return {f"{year}_{season}": data for (year, season), data in terms.items()}
+
+    def is_offered(self, course_code: str, term: str) -> bool:
+        """Whether a course has sections in a specific loaded term."""
+        key = term_key(term)
+        self._ensure_loaded()
+        return bool(key) and course_code in self._offered.get(key, set())
+
+    def offering_patterns(self) -> Dict[str, dict]:
+        """Fall/spring pattern, terms and instructors per course, from the loaded schedules."""
+        self._ensure_loaded()
+        return self._patterns
+
+    def published_patterns(self) -> Dict[str, dict]:
+        """Patterns from course_offering_patterns.json (aggregated over past terms)."""
+        self._ensure_loaded()
+        return self._published_patterns
+
+    def special_notes(self) -> dict:
+        self._ensure_loaded()
+        return self._special_notes
+
+    def courses_by_instructor(self, name: str) -> List[str]:
+        """Courses taught by instructors whose name contains `name` (case-insensitive)."""
+        self._ensure_loaded()
+        needle = name.lower()
+        return sorted({
+            code for instructor, codes in self._instructor_courses.items()
+            if needle in instructor.lower() for code in codes
+        })
+
+
+_repository: Optional[ScheduleRepository] = None
+_repository_lock = threading.Lock()
+
+
+def get_schedule_repository() -> ScheduleRepository:
+    """The shared repository (created on first use)."""
+    global _repository
+    if _repository is None:
+        with _repository_lock:
+            if _repository is None:
+                _repository = ScheduleRepository()
+    return _repository
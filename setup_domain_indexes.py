@@ -24,7 +24,7 @@ def main():
     
     if existing_domains:
         print(f"\n⚠️  Found existing databases for: {', '.join(existing_domains)}")
-        response = input("\nRebuild existing indexes? (y/n): ").strip().lower()
+        response = input("\nRebuild existing indexes from scratch? (y = full rebuild, n = incremental update): ").strip().lower()
         force_rebuild = (response == 'y')
     else:
         print("\nNo existing databases found. Building new indexes...")
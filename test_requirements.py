@@ -0,0 +1,131 @@
+"""
+Test script for the Prerequisite Graph and Degree Requirement Trees
+
+Checks prereq_graph.py and degree_requirements.py against known catalog
+expressions and program files (no LLM or API key needed).
+"""
+
+from prereq_graph import (
+    get_prereq_graph, parse_prereq_text, to_dnf, format_tree, _grade_rank, GRADE_RANK
+)
+from degree_requirements import find_program
+
+
+def clause_codes(clauses):
+    """DNF clauses as sorted lists of course codes (grades dropped)."""
+    return sorted(sorted(code for code, _ in clause) for clause in clauses)
+
+
+def check(label: str, condition: bool):
+    print(f"  {'✓' if condition else '✗'} {label}")
+    assert condition, label
+
+
+def test_expression_parsing():
+    """Parsing, DNF expansion, absorption and grade minimums (no catalog)."""
+    print("=" * 80)
+    print("PREREQUISITE EXPRESSIONS")
+    print("=" * 80)
+
+    # 15-251's catalog expression: (A or B) and (C or D or E) -> 6 clauses
+    text = ("((15-122 [] at least C) or (15-150 [] at least C)) and "
+            "((21-128 [] at least C) or (15-151 [] at least C) or (21-127 [] at least C))")
+    clauses = to_dnf(parse_prereq_text(text))
+    check("mixed and/or expands to 6 clauses", len(clauses) == 6)
+    check("every clause pairs a programming course with a math course", all(
+        len(clause) == 2 and {code for code, _ in clause} & {"15-122", "15-150"} for clause in clauses
+    ))
+    check("'at least C' becomes a C minimum", all(rank == GRADE_RANK["C"] for c in clauses for _, rank in c))
+
+    # "and" binds tighter than "or"
+    check("and binds tighter than or",
+          clause_codes(to_dnf(parse_prereq_text("15-112 and 15-122 or 15-150"))) == [["15-112", "15-122"], ["15-150"]])
+
+    # A clause containing another clause is redundant
+    check("absorption drops redundant clauses",
+          clause_codes(to_dnf(parse_prereq_text("15-112 or (15-112 and 21-127)"))) == [["15-112"]])
+
+    check("no minimum grade means D", to_dnf(parse_prereq_text("21-122")) == [frozenset({("21-122", 1)})])
+    check("empty expression has no prerequisites", parse_prereq_text("") is None and to_dnf(None) == [])
+    print(f"    tree: {format_tree(parse_prereq_text(text))}")
+
+    # Grade ranks
+    check("B+ ranks as B", _grade_rank("B+") == GRADE_RANK["B"])
+    check("P counts as a pass", _grade_rank("P") > 0)
+    check("R and W do not pass", _grade_rank("R") == 0 and _grade_rank("W") == 0)
+    check("unknown grade counts as passed", _grade_rank(None) == max(GRADE_RANK.values()))
+
+
+def test_catalog_prerequisites():
+    """Compiled catalog courses: co-requisite alternatives, mixed expressions, equivalents."""
+    print("\n" + "=" * 80)
+    print("CATALOG PREREQUISITES")
+    print("=" * 80)
+    graph = get_prereq_graph()
+    check(f"catalog compiled without parse errors ({len(graph.parse_errors)})", not graph.parse_errors)
+
+    # 15-122: 15-112 (at least C), co-requisite one of 21-127 / 21-128 / 15-151
+    check("15-122 co-requisites are 21-127, 21-128, 15-151",
+          graph.coreqs["15-122"] == {"21-127", "21-128", "15-151"})
+    result = graph.check("15-122", {"15-112": "B"})
+    check("15-122 without a co-requisite cannot be taken", not result.can_take and result.prereqs_met)
+    check("all co-requisite alternatives are listed as missing",
+          result.missing_coreqs == ["15-151", "21-127", "21-128"])
+    check("any one co-requisite taken concurrently is enough",
+          graph.can_take("15-122", {"15-112": "B"}, concurrent=["21-127"]))
+    check("a completed co-requisite is enough", graph.can_take("15-122", {"15-112": "A", "21-128": "B"}))
+    result = graph.check("15-122", {"15-112": "D", "21-127": "A"})
+    check("15-112 with a D does not meet 'at least C'", not result.prereqs_met and result.missing == ["15-112"])
+
+    # 15-251: (15-122 or 15-150) and (21-128 or 15-151 or 21-127)
+    check("15-251 met by 15-122 + 21-127", graph.prereqs_met("15-251", {"15-122": "C", "21-127": "B"}))
+    check("15-251 met by 15-150 + 15-151", graph.prereqs_met("15-251", {"15-150": "A", "15-151": "B"}))
+    result = graph.check("15-251", {"15-150": "A"})
+    check("15-251 with only 15-150 misses one math course",
+          len(result.missing) == 1 and result.missing[0] in {"21-127", "21-128", "15-151"})
+
+    # 15-213: equivalent courses give credit, anti-requisites block
+    check("18-213 gives credit for 15-213", graph.has_passed("15-213", {"18-213": "B"}))
+    result = graph.check("15-213", {"15-122": "B", "18-213": "B"})
+    check("18-213 is an anti-requisite of 15-213", "18-213" in result.anti_req_conflicts and not result.can_take)
+
+    check("15-213 needs 15-112 transitively", "15-112" in graph.all_prerequisites("15-213"))
+    check("15-213 comes after 15-122", graph.level("15-213") > graph.level("15-122"))
+
+
+def test_program_requirements():
+    """Requirement-shape compilation and program lookup."""
+    print("\n" + "=" * 80)
+    print("DEGREE REQUIREMENTS")
+    print("=" * 80)
+    cs = find_program("CS")
+    check(f"CS major found ({cs.title if cs else None})", cs is not None and cs.kind == "major")
+    check("CS requires 360 units", cs.total_units == 360.0)
+
+    # option_1 / option_2 siblings are alternatives
+    node = next(n for n in cs.root.walk() if n.name == "two_sci_eng_same_dept")
+    check("option_N siblings compile to 'any' of 1",
+          node.kind == "any" and node.count == 1 and [c.name for c in node.children] == ["option_1", "option_2"])
+    pool = node.children[0]
+    check("option_1 is a subject-code pool", pool.kind == "pool" and "09" in pool.subjects)
+    check("pool excludes listed courses", pool.matches("09-217", 12) and not pool.matches("09-103", 10))
+
+    economics = find_program("Economics", minor=True)
+    check(f"Economics minor found ({economics.title if economics else None})",
+          economics is not None and economics.kind == "minor")
+    quantitative = next(n for n in economics.root.children if n.name == "quantitative_analysis_requirements")
+    check("'choose one' requirement compiles to 'any'", quantitative.kind == "any" and quantitative.count == 1)
+
+    # Names must match a whole program, not a substring of a file name
+    check("'A' matches no minor", find_program("A", minor=True) is None)
+    check("'Science' matches no major", find_program("Science") is None)
+    check("'economics minor' finds the minor", find_program("economics minor", minor=True) is economics)
+
+
+if __name__ == "__main__":
+    test_expression_parsing()
+    test_catalog_prerequisites()
+    test_program_requirements()
+    print("\n" + "=" * 80)
+    print("TEST COMPLETE")
+    print("=" * 80 + "\n")
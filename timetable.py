@@ -0,0 +1,294 @@
+"""
+Section Timetables and Conflict Checking
+Builds a per-term interval index over the section meeting times of the
+schedule files (via schedule_repository.py) and finds conflict-free section
+combinations for a set of courses.
+
+A course is registered as one section per component: numbered sections are
+lectures and lettered sections are recitations/labs (CMU convention), so
+15-122 needs lecture "3" plus one of its lettered sections. Courses with
+only one kind of section need just one of them.
+
+Search: courses are assigned most-constrained first (fewest section
+options), and after each choice the options of the remaining courses that
+clash with it are filtered out; a branch stops as soon as some course has no
+option left.
+"""
+import bisect
+import json
+from dataclasses import dataclass, field
+from itertools import product
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from blackboard.schema import Risk
+from schedule_repository import get_schedule_repository, term_key, term_name
+
+# Upper bound on combinations returned by find_schedules
+DEFAULT_SCHEDULE_LIMIT = 20
+
+
+@dataclass(frozen=True)
+class Meeting:
+    day: str
+    start: int   # minutes after midnight
+    end: int
+
+    def overlaps(self, other: "Meeting") -> bool:
+        return self.day == other.day and self.start < other.end and other.start < self.end
+
+
+@dataclass(frozen=True)
+class Section:
+    course_code: str
+    section: str
+    component: str           # "lecture" | "section"
+    meetings: Tuple[Meeting, ...]
+    instructor: str = ""
+    location: str = ""
+
+    def conflicts_with(self, other: "Section") -> bool:
+        return any(a.overlaps(b) for a in self.meetings for b in other.meetings)
+
+    def describe(self) -> str:
+        if not self.meetings:
+            return f"{self.course_code} {self.section} (time TBA)"
+        days = "/".join(m.day for m in self.meetings)
+        first = self.meetings[0]
+        return f"{self.course_code} {self.section} {days} {_format_time(first.start)}-{_format_time(first.end)}"
+
+
+def _parse_time(value: Optional[str]) -> Optional[int]:
+    """"14:30" -> 870 (None when missing or malformed)."""
+    try:
+        hours, minutes = str(value).split(":")[:2]
+        return int(hours) * 60 + int(minutes)
+    except (AttributeError, ValueError):
+        return None
+
+
+def _format_time(minutes: int) -> str:
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+# ============================================================================
+# Term timetable
+# ============================================================================
+
+class TermTimetable:
+    """All sections of one term plus a per-day interval index of their meetings."""
+
+    def __init__(self, term: str, offerings: List[dict]):
+        self.term = term
+        self.sections: Dict[str, List[Section]] = {}
+        # day -> meetings sorted by start time, with the section they belong to
+        self._starts: Dict[str, List[int]] = {}
+        self._entries: Dict[str, List[Tuple[Meeting, Section]]] = {}
+        # Longest meeting per day bounds how far back an overlap can start
+        self._longest: Dict[str, int] = {}
+
+        for offering in offerings:
+            code = offering.get("course_code")
+            if not code:
+                continue
+            for raw in offering.get("sections", []):
+                section = self._parse_section(code, raw)
+                self.sections.setdefault(code, []).append(section)
+
+        entries = [(m, s) for sections in self.sections.values() for s in sections for m in s.meetings]
+        entries.sort(key=lambda e: (e[0].day, e[0].start))
+        for meeting, section in entries:
+            self._entries.setdefault(meeting.day, []).append((meeting, section))
+            self._longest[meeting.day] = max(self._longest.get(meeting.day, 0), meeting.end - meeting.start)
+        self._starts = {day: [m.start for m, _ in items] for day, items in self._entries.items()}
+        self._clashes: Dict[Section, frozenset] = {}
+
+    @staticmethod
+    def _parse_section(code: str, raw: dict) -> Section:
+        name = str(raw.get("section", ""))
+        start, end = _parse_time(raw.get("start_time")), _parse_time(raw.get("end_time"))
+        meetings = ()
+        if start is not None and end is not None:
+            meetings = tuple(Meeting(day, start, end) for day in raw.get("days") or [])
+        return Section(
+            course_code=code,
+            section=name,
+            component="lecture" if name.isdigit() else "section",
+            meetings=meetings,
+            instructor=raw.get("instructor") or "",
+            location=str(raw.get("location") or "")
+        )
+
+    def overlapping(self, day: str, start: int, end: int) -> List[Section]:
+        """Sections with a meeting on `day` overlapping [start, end)."""
+        starts = self._starts.get(day, [])
+        lo = bisect.bisect_left(starts, start - self._longest.get(day, 0))
+        hi = bisect.bisect_left(starts, end)
+        return [s for m, s in self._entries[day][lo:hi] if m.end > start] if starts else []
+
+    def clashing(self, section: Section) -> frozenset:
+        """Every other section with a meeting overlapping this one (memoized)."""
+        if section not in self._clashes:
+            self._clashes[section] = frozenset(
+                other for m in section.meetings
+                for other in self.overlapping(m.day, m.start, m.end) if other != section
+            )
+        return self._clashes[section]
+
+    def options(self, code: str) -> List[Tuple[Section, ...]]:
+        """Registrable section sets for a course (one per component, no internal clash)."""
+        by_component: Dict[str, List[Section]] = {}
+        for section in self.sections.get(code, []):
+            by_component.setdefault(section.component, []).append(section)
+        combos = product(*by_component.values()) if by_component else []
+        return [combo for combo in combos if not self.options_clash(combo, combo)]
+
+    def options_clash(self, a: Tuple[Section, ...], b: Tuple[Section, ...]) -> bool:
+        """Whether any section of one option overlaps any section of the other."""
+        return any(y in self.clashing(x) for x in a for y in b)
+
+
+# ============================================================================
+# Conflict search
+# ============================================================================
+
+@dataclass
+class ConflictReport:
+    """Result of checking a set of courses against one term's timetable."""
+    term: str
+    courses: List[str]
+    schedules: List[Dict[str, List[str]]] = field(default_factory=list)   # code -> section names
+    conflicts: List[Tuple[str, str]] = field(default_factory=list)        # pairs that always clash
+    not_offered: List[str] = field(default_factory=list)
+    truncated: bool = False
+
+    @property
+    def conflict_free(self) -> bool:
+        return bool(self.schedules)
+
+    @property
+    def risks(self) -> List[Risk]:
+        risks = [
+            Risk(type="time_conflict", severity="high",
+                 description=f"{self.term}: every section of {a} overlaps every section of {b}")
+            for a, b in self.conflicts
+        ]
+        offered = [c for c in self.courses if c not in self.not_offered]
+        if not self.schedules and not self.conflicts and len(offered) > 1:
+            risks.append(Risk(
+                type="time_conflict", severity="high",
+                description=f"{self.term}: no conflict-free combination of sections for {', '.join(offered)}"
+            ))
+        return risks
+
+    def to_dict(self) -> dict:
+        return {
+            "term": self.term,
+            "conflict_free": self.conflict_free,
+            "example_schedules": self.schedules[:3],
+            "unavoidable_conflicts": [f"{a} / {b}" for a, b in self.conflicts],
+            "not_offered_this_term": self.not_offered
+        }
+
+
+def find_schedules(timetable: TermTimetable, codes: Sequence[str],
+                   limit: int = DEFAULT_SCHEDULE_LIMIT) -> ConflictReport:
+    """Enumerate (up to `limit`) conflict-free section combinations for the courses."""
+    codes = list(dict.fromkeys(c.upper() for c in codes))
+    report = ConflictReport(term=timetable.term, courses=codes)
+    domains = {}
+    for code in codes:
+        options = timetable.options(code)
+        if options:
+            domains[code] = options
+        else:
+            report.not_offered.append(code)
+
+    # Pairs that clash in every option combination
+    offered = list(domains)
+    for i, a in enumerate(offered):
+        for b in offered[i + 1:]:
+            if all(timetable.options_clash(x, y) for x in domains[a] for y in domains[b]):
+                report.conflicts.append((a, b))
+    if report.conflicts or not domains:
+        return report
+
+    def search(assigned: Dict[str, Tuple[Section, ...]], remaining: Dict[str, list]) -> bool:
+        if not remaining:
+            report.schedules.append({
+                code: [s.section for s in option] for code, option in sorted(assigned.items())
+            })
+            return len(report.schedules) < limit
+        code = min(remaining, key=lambda c: len(remaining[c]))
+        rest = {c: opts for c, opts in remaining.items() if c != code}
+        for option in remaining[code]:
+            pruned = {c: [o for o in opts if not timetable.options_clash(option, o)] for c, opts in rest.items()}
+            if any(not opts for opts in pruned.values()):
+                continue
+            assigned[code] = option
+            keep_going = search(assigned, pruned)
+            del assigned[code]
+            if not keep_going:
+                report.truncated = True
+                return False
+        return True
+
+    search({}, domains)
+    return report
+
+
+# ============================================================================
+# Loading
+# ============================================================================
+
+_timetables: Dict[str, TermTimetable] = {}
+_timetables_version = None
+
+
+def load_timetables() -> Dict[str, TermTimetable]:
+    """Timetables keyed by "Spring 2026" style term names (rebuilt when the schedules change)."""
+    global _timetables, _timetables_version
+    repository = get_schedule_repository()
+    terms = repository.terms()
+    if _timetables_version != repository.version:
+        _timetables = {
+            term_name(key): TermTimetable(term_name(key), data.get("offerings", []))
+            for key, data in terms.items()
+        }
+        _timetables_version = repository.version
+    return _timetables
+
+
+def get_timetable(term: Optional[str] = None) -> Optional[TermTimetable]:
+    """Timetable of a term ("Spring 2026"), or the latest term when term is None."""
+    timetables = load_timetables()
+    if term is None:
+        latest = get_schedule_repository().latest_term()
+        return timetables.get(term_name(latest)) if latest else None
+    key = term_key(term)
+    return timetables.get(term_name(key)) if key else None
+
+
+def check_time_conflicts(codes: Sequence[str], term: Optional[str] = None,
+                         limit: int = DEFAULT_SCHEDULE_LIMIT) -> Optional[ConflictReport]:
+    """Conflict report for courses in a term (None if there is no schedule for it)."""
+    timetable = get_timetable(term)
+    if timetable is None:
+        return None
+    return find_schedules(timetable, codes, limit=limit)
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+
+    courses = sys.argv[1:] or ["15-122", "15-251", "67-272", "76-101", "21-241"]
+    start = time.perf_counter()
+    result = check_time_conflicts(courses)
+    elapsed = (time.perf_counter() - start) * 1000
+    if result is None:
+        print("No schedule data found")
+    else:
+        print(f"{result.term}: {len(result.schedules)} conflict-free combination(s) in {elapsed:.1f} ms")
+        print(json.dumps(result.to_dict(), indent=2))
+        for risk in result.risks:
+            print(f"⚠️  {risk.description}")
@@ -0,0 +1,108 @@
+"""
+Vector Store Registry
+Process-wide owner of the domain retrievers (Chroma store + BM25 index +
+result cache, see rag_engine_improved.get_retriever).
+
+Each domain is opened once, on first use, and shared by every agent of
+that domain. ProgramsRequirementsAgent and AcademicPlanningAgent both read
+"programs", so they share one store. Creating an agent opens nothing;
+importing multi_agent.py no longer loads three databases before the first
+request.
+
+A hot reload (data_reload.py) opens the new snapshot off the request path
+and swaps it in with one assignment, so requests already holding the old
+retriever finish against it.
+
+Per-domain load times are kept in stats() (GET /api/v1/admin/vector-stores).
+"""
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from rag_engine_improved import get_db_path, get_retriever
+
+
+class VectorStoreRegistry:
+    """Opens each (domain, k) retriever once, lazily, and serves it to all agents."""
+
+    def __init__(self):
+        self._retrievers: Dict[Tuple[str, int], Any] = {}
+        self._stats: Dict[str, dict] = {}
+        self._lock = threading.Lock()
+        # One lock per domain: concurrent first requests open the store once,
+        # without blocking requests for other domains
+        self._domain_locks: Dict[str, threading.Lock] = {}
+
+    def _domain_lock(self, domain: str) -> threading.Lock:
+        with self._lock:
+            return self._domain_locks.setdefault(domain, threading.Lock())
+
+    def _open(self, domain: str, k: int):
+        start = time.perf_counter()
+        retriever = get_retriever(domain=domain, k=k)
+        elapsed = (time.perf_counter() - start) * 1000
+        self._stats[domain] = {
+            "db_path": get_db_path(domain),
+            "load_ms": round(elapsed, 1),
+            "loaded_at": datetime.utcnow().isoformat()
+        }
+        print(f"⏱️  Domain '{domain}' retriever ready in {elapsed:.0f} ms")
+        return retriever
+
+    def get(self, domain: str, k: int = 5):
+        """The shared retriever for a domain (opened on first call)."""
+        key = (domain, k)
+        retriever = self._retrievers.get(key)
+        if retriever is None:
+            with self._domain_lock(domain):
+                retriever = self._retrievers.get(key)
+                if retriever is None:
+                    retriever = self._open(domain, k)
+                    self._retrievers[key] = retriever
+        return retriever
+
+    def reload(self, domain: str) -> bool:
+        """
+        Reopen a domain's retrievers on its active index (after a hot reload).
+
+        Returns False when the domain was never opened; it will open the
+        active snapshot on first use anyway.
+        """
+        with self._domain_lock(domain):
+            keys = [key for key in self._retrievers if key[0] == domain]
+            for key in keys:
+                self._retrievers[key] = self._open(domain, key[1])
+        return bool(keys)
+
+    def is_loaded(self, domain: str) -> bool:
+        return any(key[0] == domain for key in self._retrievers)
+
+    def stats(self) -> Dict[str, dict]:
+        """Load time and index path of every opened domain."""
+        return {domain: dict(stats) for domain, stats in self._stats.items()}
+
+
+_registry: Optional[VectorStoreRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_vector_store_registry() -> VectorStoreRegistry:
+    """The shared registry (created on first use)."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = VectorStoreRegistry()
+    return _registry
+
+
+if __name__ == "__main__":
+    # Open every domain once and report load latencies
+    from rag_engine_improved import DOMAIN_PATHS
+
+    registry = get_vector_store_registry()
+    for name in DOMAIN_PATHS:
+        registry.get(name)
+    for name, info in registry.stats().items():
+        print(f"   {name:10s} {info['load_ms']:8.1f} ms  {info['db_path']}")